@@ -1,8 +1,33 @@
+import pandas as pd
 import streamlit as st
+from football_weather import metrics
 
 # Main page setup
 st.set_page_config(layout="wide")
 
+# Hidden diagnostics view: /?diagnostics=1 (not in the sidebar)
+if st.query_params.get('diagnostics'):
+    st.title("Diagnostics")
+    if not metrics.ENABLED:
+        st.info("Metrics are off. Start the app with FW_METRICS=1 to record stage timings.")
+        st.stop()
+    st.button("Refresh")
+    stages = pd.DataFrame(metrics.summary())
+    st.subheader(f"Stage latency (latest {metrics.WINDOW} runs per stage)")
+    if len(stages):
+        st.dataframe(stages.set_index('stage').style.format({
+            'total_s': '{:.2f}', 'p50_ms': '{:.1f}', 'p90_ms': '{:.1f}', 'p99_ms': '{:.1f}', 'max_ms': '{:.1f}',
+            'rows': lambda x: '' if pd.isna(x) else f"{x:.0f}",
+        }))
+    else:
+        st.write("No stages recorded yet. Open one of the map pages.")
+    st.subheader("Cache hit rates")
+    caches = pd.DataFrame(metrics.cache_rates()).T
+    caches['hit_rate'] = (caches['hit_rate'] * 100).map(lambda x: f"{x:.0f}%")
+    st.table(caches)
+    st.caption(f"Prometheus text file: {metrics.METRICS_FILE} (every {metrics.FLUSH_SECONDS:.0f}s)")
+    st.stop()
+
 # Title for the main page
 st.title("Football Weather Dashboard")
 
@@ -0,0 +1,5 @@
+"""Shared data loading and signal computation for the football weather dashboard.
+
+Nothing in this package imports streamlit, so it can be used from the page
+scripts as well as from batch jobs.
+"""
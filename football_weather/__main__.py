@@ -0,0 +1,5 @@
+import sys
+
+from football_weather.cli import main
+
+sys.exit(main())
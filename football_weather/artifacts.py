@@ -0,0 +1,309 @@
+"""Classified slates computed once per snapshot and shared by every session.
+
+    python -m football_weather.artifacts produce --interval 15
+    python -m football_weather.artifacts produce --once
+    python -m football_weather.artifacts show
+
+A producer watches the snapshots. When any slate key changes (see
+pipeline.*_slate_key: snapshot contents, backtest workbook, the weekday
+wind threshold), it builds the NFL, CFB and combined slates once. It then
+publishes them as a new version: a directory ``<root>/v000042/`` holding
+one feather file per slate and a manifest. The version directory is
+written under a temporary name and renamed, then ``<root>/CURRENT`` is
+replaced atomically, so a reader sees either the old version or the new
+one and never a partial one. Producers number, rename and point CURRENT
+under an exclusive lock on ``<root>/.lock``, so several can share a root. Published versions are never modified. The
+newest few are kept.
+
+Pages call ``slate(kind)``, which returns the newest published version. It
+is loaded once per process and shared by all sessions, so a viewer costs a
+file stat, not a pipeline run. The producer runs as a daemon thread of the
+Streamlit process, started on first use. With FW_PRODUCER=external it runs
+as a separate process (the ``produce`` command above) and pages only read.
+Sessions never wait on a rebuild; only the very first request, before
+anything is published, waits for the first version.
+
+With FW_SNAPSHOTS set (directories/globs separated by os.pathsep), the slates
+cover every snapshot found there instead of the live files, one row per game
+per snapshot (see snapshots.py), and are republished when any file changes.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from football_weather import loaders, metrics, pipeline, snapshots
+
+logger = logging.getLogger(__name__)
+
+KINDS = ['nfl', 'cfb', 'combined']
+ROOT = os.environ.get('FW_ARTIFACTS', 'artifacts')
+# 'thread' (default): produce in this process; 'external': only read
+PRODUCER = os.environ.get('FW_PRODUCER', 'thread')
+INTERVAL = float(os.environ.get('FW_PRODUCER_INTERVAL', '5'))
+KEEP_VERSIONS = 3
+# Build from every snapshot under these directories/globs instead of the live files
+SOURCES = [source for source in os.environ.get('FW_SNAPSHOTS', '').split(os.pathsep) if source]
+CURRENT = 'CURRENT'
+MANIFEST = 'manifest.json'
+# Held while a producer numbers and publishes a version
+LOCK = '.lock'
+
+_lock = threading.Lock()
+_published = threading.Condition(_lock)
+# Loaded version: (CURRENT signature, version name, {kind: frame})
+_loaded = None
+_producer = None
+_last_error = None
+# slate() calls served by the loaded version (hits) or by loading a new one
+_stats = {'hits': 0, 'misses': 0}
+
+
+def slate_keys(nfl_path=pipeline.NFL_SNAPSHOT, cfb_path=pipeline.CFB_SNAPSHOT, backtest_path=pipeline.CFB_BACKTEST,
+               sources=None):
+    """JSON-able keys of the three slates for the snapshots on disk now."""
+    sources = SOURCES if sources is None else sources
+    if sources:
+        # Each snapshot is classified as of its own time, so only the files matter
+        files = [[path, loaders.snapshot_id(path)] for path in snapshots.expand(sources)]
+        key = [files, loaders.snapshot_id(backtest_path)]
+        return json.loads(json.dumps({kind: key for kind in KINDS}))
+    keys = {
+        'nfl': pipeline.nfl_slate_key(nfl_path),
+        'cfb': pipeline.cfb_slate_key(cfb_path, backtest_path),
+        'combined': pipeline.combined_slate_key(nfl_path, cfb_path),
+    }
+    return json.loads(json.dumps(keys))
+
+
+def build(nfl_path=pipeline.NFL_SNAPSHOT, cfb_path=pipeline.CFB_SNAPSHOT, backtest_path=pipeline.CFB_BACKTEST,
+          sources=None):
+    """The three classified slates."""
+    sources = SOURCES if sources is None else sources
+    if sources:
+        df = snapshots.load(sources)
+        return {
+            'nfl': snapshots.nfl_slate(df),
+            'cfb': snapshots.cfb_slate(df, backtest_path),
+            'combined': snapshots.combined_slate(df),
+        }
+    return {
+        'nfl': pipeline.load_nfl_slate(nfl_path),
+        'cfb': pipeline.load_cfb_slate(cfb_path, backtest_path),
+        'combined': pipeline.load_combined_slate(nfl_path, cfb_path),
+    }
+
+
+def _versions(root):
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if name.startswith('v') and name[1:].isdigit())
+
+
+def current_manifest(root=ROOT):
+    """Manifest of the published version, or None before the first."""
+    try:
+        with open(os.path.join(root, CURRENT)) as f:
+            version = f.read().strip()
+        with open(os.path.join(root, version, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def _publish_lock(root):
+    """Hold ``<root>/.lock`` exclusively, so producers take version numbers one at a time."""
+    import fcntl
+
+    with open(os.path.join(root, LOCK), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def publish(slates, keys, root=ROOT, seconds=None):
+    """Write ``slates`` as the next version and make it current; returns its name."""
+    import pyarrow as pa
+    from pyarrow import feather
+
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=root, prefix='.staging-', suffix='.tmp')
+    try:
+        for kind, df in slates.items():
+            table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+            # Uncompressed so readers memory-map it instead of decoding
+            feather.write_feather(table, os.path.join(staging, f"{kind}.arrow"), compression='uncompressed')
+
+        # Numbering, rename and CURRENT under one lock: concurrent producers
+        # would otherwise pick the same number, or point CURRENT backwards
+        with _publish_lock(root):
+            existing = _versions(root)
+            number = int(existing[-1][1:]) + 1 if existing else 1
+            version = f"v{number:06d}"
+            with open(os.path.join(staging, MANIFEST), 'w') as f:
+                json.dump({
+                    'version': version,
+                    'created': datetime.now().isoformat(),
+                    'keys': keys,
+                    'rows': {kind: len(df) for kind, df in slates.items()},
+                    'build_seconds': seconds,
+                }, f, indent=2)
+            os.rename(staging, os.path.join(root, version))
+
+            pointer = os.path.join(root, f".{CURRENT}.{os.getpid()}.tmp")
+            with open(pointer, 'w') as f:
+                f.write(version)
+            os.replace(pointer, os.path.join(root, CURRENT))
+
+            for stale in _versions(root)[:-KEEP_VERSIONS]:
+                # Readers hold their frames in memory, so old versions can go
+                shutil.rmtree(os.path.join(root, stale), ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return version
+
+
+def produce_once(root=ROOT, **paths):
+    """Publish a new version if the slate keys changed; returns its name, or None."""
+    keys = slate_keys(**paths)
+    manifest = current_manifest(root)
+    if manifest is not None and manifest['keys'] == keys:
+        return None
+    start = time.perf_counter()
+    with metrics.stage('slate.build') as timed:
+        slates = build(**paths)
+        timed.count(sum(len(df) for df in slates.values()))
+    seconds = round(time.perf_counter() - start, 3)
+    with metrics.stage('slate.publish'):
+        version = publish(slates, keys, root, seconds)
+    logger.info("published %s (%s) in %.2fs", version,
+                ', '.join(f"{kind} {len(df)}" for kind, df in slates.items()), seconds)
+    return version
+
+
+def produce(root=ROOT, interval=INTERVAL, once=False, **paths):
+    """Keep the published slates current, checking every ``interval`` seconds."""
+    global _last_error
+    while True:
+        try:
+            produce_once(root, **paths)
+            _last_error = None
+        except Exception as e:
+            # Keep serving the last good version
+            _last_error = e
+            logger.exception("could not produce slates")
+        with _published:
+            _published.notify_all()
+        metrics.flush()
+        if once:
+            return
+        time.sleep(interval)
+
+
+def _ensure_producer(root):
+    global _producer
+    with _lock:
+        if _producer is None or not _producer.is_alive():
+            _producer = threading.Thread(target=produce, args=(root,), name='slate-producer', daemon=True)
+            _producer.start()
+
+
+def _signature(root):
+    try:
+        stat = os.stat(os.path.join(root, CURRENT))
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+
+def _load(root, signature):
+    from pyarrow import feather
+
+    with open(os.path.join(root, CURRENT)) as f:
+        version = f.read().strip()
+    frames = {
+        kind: feather.read_table(os.path.join(root, version, f"{kind}.arrow"), memory_map=True).to_pandas()
+        for kind in KINDS
+    }
+    return signature, version, frames
+
+
+def slate(kind, root=ROOT, timeout=120):
+    """(version, frame) of the newest published ``kind`` slate.
+
+    The frame is shared by every session: treat it as read-only (a shallow
+    copy is returned, so adding columns does not leak between sessions).
+    """
+    global _loaded
+    if PRODUCER == 'thread':
+        _ensure_producer(root)
+    signature = _signature(root)
+    if signature is None:
+        # Nothing published yet: wait for the producer's first version
+        deadline = time.monotonic() + timeout
+        with _published:
+            while (signature := _signature(root)) is None:
+                if _last_error is not None:
+                    raise _last_error
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"no slates published under {root} after {timeout}s")
+                _published.wait(1.0)
+
+    loaded = _loaded
+    if loaded is None or loaded[0] != signature:
+        with metrics.stage('slate.load'):
+            loaded = _load(root, signature)
+        with _lock:
+            _loaded = loaded
+            _stats['misses'] += 1
+    else:
+        with _lock:
+            _stats['hits'] += 1
+    return loaded[1], loaded[2][kind].copy(deep=False)
+
+
+def load_stats():
+    """Hit/miss counters of slate() against the loaded version."""
+    with _lock:
+        return dict(_stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m football_weather.artifacts', description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    produce_cmd = commands.add_parser('produce', help="publish a new version whenever the snapshots change")
+    produce_cmd.add_argument('--root', default=ROOT)
+    produce_cmd.add_argument('--interval', type=float, default=INTERVAL, help="seconds between checks")
+    produce_cmd.add_argument('--once', action='store_true', help="check once and exit")
+    produce_cmd.add_argument('--nfl', default=pipeline.NFL_SNAPSHOT)
+    produce_cmd.add_argument('--cfb', default=pipeline.CFB_SNAPSHOT)
+    produce_cmd.add_argument('--backtest', default=pipeline.CFB_BACKTEST)
+    produce_cmd.add_argument('--snapshots', nargs='*', default=None,
+                             help="build from every snapshot in these directories/globs (default: FW_SNAPSHOTS)")
+    show_cmd = commands.add_parser('show', help="print the current manifest")
+    show_cmd.add_argument('--root', default=ROOT)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    if args.command == 'show':
+        manifest = current_manifest(args.root)
+        print(json.dumps(manifest, indent=2) if manifest else f"nothing published under {args.root}")
+        return 0
+    produce(args.root, args.interval, args.once, nfl_path=args.nfl, cfb_path=args.cfb, backtest_path=args.backtest,
+            sources=args.snapshots)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
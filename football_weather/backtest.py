@@ -0,0 +1,144 @@
+"""Batched lookup of games against the ``Backtesting`` bucket table.
+
+Each backtest row is a bucket of closed ranges on forecast temp, forecast
+wind and absolute opening spread, plus a CLV direction. A game takes the
+Sample/Margin/ROI/Signal of the *first* bucket (in sheet order) it falls in.
+
+Rather than scanning the table once per game, every axis is cut into the
+elementary intervals formed by its bucket bounds. All values inside one
+elementary interval fall in exactly the same buckets, so each interval stores
+a packed bitmask of bucket membership. A game's match is then the first set
+bit of the AND of its four masks, found with a ``searchsorted`` per axis.
+"""
+import numpy as np
+import pandas as pd
+
+RESULT_COLUMNS = ['Sample', 'Margin', 'ROI', 'Signal']
+
+# Open-ended bounds are left blank in the sheet
+FILL_BOUNDS = {'Wind Below': 100, 'Spread_l': 0, 'Temp Above': 0}
+
+# Keep each chunk's gathered bitmasks around this size
+_CHUNK_BYTES = 32 << 20
+
+# Position of the most significant set bit, counted from the left, for every byte value
+_LEADING_BIT = np.array([8] + [7 - int(np.log2(v)) for v in range(1, 256)], dtype=np.int64)
+
+
+def get_clv(open_value, current_value):
+    """'Positive' where the total moved down from open, else 'Negative'."""
+    open_value = np.asarray(open_value, dtype=float)
+    current_value = np.asarray(current_value, dtype=float)
+    return np.where(open_value > current_value, 'Positive', 'Negative')
+
+
+class AxisIndex:
+    """Elementary-interval bitmasks for closed ``[low, high]`` ranges on one axis."""
+
+    def __init__(self, low, high):
+        bounds = np.concatenate([low, high])
+        self.bounds = np.unique(bounds[~np.isnan(bounds)])
+
+        # Regions are (-inf, b0), [b0], (b0, b1), [b1], ..., [bk], (bk, inf);
+        # one representative value from each decides its bucket membership.
+        b = self.bounds
+        reps = np.empty(2 * len(b) + 1)
+        if len(b):
+            reps[1::2] = b
+            reps[2:-1:2] = np.nextafter(b[:-1], b[1:])
+            reps[0] = np.nextafter(b[0], -np.inf)
+            reps[-1] = np.nextafter(b[-1], np.inf)
+        else:
+            reps[0] = 0.0
+        member = (low[None, :] <= reps[:, None]) & (high[None, :] >= reps[:, None])
+        # Trailing all-empty region for NaN values, which never match
+        member = np.vstack([member, np.zeros((1, len(low)), dtype=bool)])
+        self.masks = np.packbits(member, axis=1)
+
+    def regions(self, values):
+        b = self.bounds
+        pos = np.searchsorted(b, values, side='left')
+        if len(b):
+            on_bound = (pos < len(b)) & (b[np.minimum(pos, len(b) - 1)] == values)
+        else:
+            on_bound = np.zeros(len(values), dtype=bool)
+        region = 2 * pos + on_bound
+        region[np.isnan(values)] = len(self.masks) - 1
+        return region
+
+
+def _first_set_bit(masks):
+    nonzero = masks != 0
+    found = nonzero.any(axis=1)
+    byte = nonzero.argmax(axis=1)
+    bit = _LEADING_BIT[masks[np.arange(len(masks)), byte]]
+    return np.where(found, byte * 8 + bit, -1)
+
+
+class BacktestMatcher:
+    """Matches whole slates against a ``Backtesting`` table.
+
+    The table is normalized and indexed once; ``match`` can then be called for
+    any number of slates.
+    """
+
+    def __init__(self, df_bt):
+        df_bt = df_bt.reset_index(drop=True).fillna(FILL_BOUNDS)
+
+        def column(name):
+            return pd.to_numeric(df_bt[name], errors='coerce').to_numpy(dtype=float)
+
+        self._axes = [
+            AxisIndex(column('Temp Above'), column('Temp Below')),
+            AxisIndex(column('Wind Above'), column('Wind Below')),
+            AxisIndex(column('Spread_l'), column('Spread_h')),
+        ]
+        clv = df_bt['CLV from Open']
+        # Row 0 is for negative CLV games, row 1 for positive
+        self._clv_masks = np.packbits(
+            np.vstack([(clv == 'Negative').to_numpy(), (clv == 'Positive').to_numpy()]), axis=1
+        )
+        self._results = df_bt[RESULT_COLUMNS]
+
+    def match_indices(self, temp, wind, spread, clv_positive):
+        """Row position of the first matching bucket for each game, -1 where none."""
+        values = [np.asarray(v, dtype=float) for v in (temp, wind, spread)]
+        regions = [axis.regions(v) for axis, v in zip(self._axes, values)]
+
+        # Games that land in the same regions on every axis share a result,
+        # so only resolve each distinct combination once.
+        key = np.asarray(clv_positive, dtype=np.int64)
+        for axis, region in zip(self._axes, regions):
+            key = key * len(axis.masks) + region
+        unique_keys, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        regions = [region[first] for region in regions]
+        clv_rows = np.asarray(clv_positive, dtype=np.int64)[first]
+
+        matched = np.empty(len(unique_keys), dtype=np.int64)
+        chunk = max(1, _CHUNK_BYTES // max(1, self._clv_masks.shape[1]))
+        for start in range(0, len(unique_keys), chunk):
+            sl = slice(start, start + chunk)
+            masks = self._clv_masks[clv_rows[sl]]
+            for axis, region in zip(self._axes, regions):
+                masks &= axis.masks[region[sl]]
+            matched[sl] = _first_set_bit(masks)
+        return matched[inverse]
+
+    def match(self, df):
+        """Sample/Margin/ROI/Signal of each game's first matching bucket (NaN if none)."""
+        if not len(self._results):
+            return pd.DataFrame(np.nan, index=df.index, columns=RESULT_COLUMNS)
+        clv = get_clv(df['Fd_open'], df['FD_now'])
+        idx = self.match_indices(
+            df['temp_fg'],
+            df['wind_fg'],
+            np.abs(pd.to_numeric(df['Open'], errors='coerce').to_numpy(dtype=float)),
+            clv == 'Positive',
+        )
+        found = idx >= 0
+        rows = self._results.iloc[np.where(found, idx, 0)]
+        return pd.DataFrame(
+            {name: pd.Series(rows[name].to_numpy(), index=df.index).where(found) for name in RESULT_COLUMNS},
+            index=df.index,
+        )
+
@@ -0,0 +1,254 @@
+"""Rebuild the ``Backtesting`` sheet from historical game results.
+
+    python -m football_weather.backtest_build history/*.csv --out backtesting.parquet
+    python -m football_weather.backtest_build history.parquet --grid cfb_weather_backtest.xlsx --out cfb_weather_backtest.xlsx
+
+A history file has one row per game with the CFB snapshot forecast columns
+(``temp_fg``, ``wind_fg``, ``Open``, ``Fd_open``, ``FD_now``) plus the final
+combined score in ``Final``. The bucket grid (bounds, CLV direction and
+Signal numbers) is taken from an existing sheet and every bucket's
+Wins/Losses/Push/Sample/Margin/ROI and ``+ CLV``/``CLV %`` are recomputed from
+the games inside it. Buckets are closed ranges with the same blank-bound
+defaults BacktestMatcher uses; a blank CLV direction takes every game.
+
+The bet is the under at the current total (``FD_now``) at -110: a win when
+``Final`` is below it, a push when equal. Margin is the mean of FD_now - Final.
+
+Games in the same elementary interval of every axis (see backtest.py) fall
+in exactly the same buckets, so they are first summed into one row per
+distinct interval combination; a full history collapses to a few thousand
+rows. Bucket membership and the per-bucket sums are then one matrix product,
+with the grid split into shards run on a process pool.
+"""
+import argparse
+import logging
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from football_weather import loaders
+from football_weather.backtest import FILL_BOUNDS, AxisIndex, get_clv
+from football_weather.classify import numeric_column
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COLUMNS = ['temp_fg', 'wind_fg', 'Open', 'Fd_open', 'FD_now', 'Final']
+GRID_COLUMNS = [
+    'Sport', 'Wind Above', 'Wind Below', 'Temp Above', 'Temp Below', 'Spread_l', 'Spread_h',
+    'CLV from Open', 'Signal',
+]
+# (low, high) bound columns, in the order of the game value arrays
+_AXES = [('Temp Above', 'Temp Below'), ('Wind Above', 'Wind Below'), ('Spread_l', 'Spread_h')]
+
+# Games per membership matrix, so a chunk x shard float matrix stays small
+_CHUNK_GAMES = 1 << 16
+
+# Game arrays for the pool workers, shipped once per worker by _init_worker
+_games = None
+
+
+def game_arrays(history):
+    """Per-game axis values, CLV direction and outcomes of a results frame."""
+    missing = [name for name in HISTORY_COLUMNS if name not in history.columns]
+    if missing:
+        raise ValueError(f"history is missing columns: {', '.join(missing)}")
+    line = numeric_column(history, 'FD_now')
+    final = numeric_column(history, 'Final')
+    # Ungraded games (no line or no final score) count nowhere
+    graded = ~np.isnan(line) & ~np.isnan(final)
+    line, final = line[graded], final[graded]
+    clv_positive = get_clv(numeric_column(history, 'Fd_open'), numeric_column(history, 'FD_now'))[graded] == 'Positive'
+    return {
+        'values': np.stack([
+            numeric_column(history, 'temp_fg')[graded],
+            numeric_column(history, 'wind_fg')[graded],
+            np.abs(numeric_column(history, 'Open'))[graded],
+        ]),
+        'clv_positive': clv_positive,
+        # Columns summed per bucket: wins, losses, pushes, margin, positive CLV
+        'outcomes': np.stack([final < line, final > line, final == line, line - final, clv_positive], axis=1).astype(float),
+    }
+
+
+def grid_arrays(grid):
+    """Bound arrays (filled like BacktestMatcher) and CLV filters of a bucket grid."""
+    filled = grid.fillna(FILL_BOUNDS)
+    bounds = np.stack([
+        np.stack([
+            pd.to_numeric(filled[low], errors='coerce').to_numpy(dtype=float),
+            pd.to_numeric(filled[high], errors='coerce').to_numpy(dtype=float),
+        ])
+        for low, high in _AXES
+    ])
+    clv = grid['CLV from Open']
+    return {
+        'bounds': bounds,
+        'take_positive': (clv != 'Negative').to_numpy(dtype=bool),
+        'take_negative': (clv != 'Positive').to_numpy(dtype=bool),
+    }
+
+
+def collapse(games, grid):
+    """Sum games sharing every axis interval (and CLV direction) into one row each."""
+    key = games['clv_positive'].astype(np.int64)
+    for axis in range(len(_AXES)):
+        index = AxisIndex(*grid['bounds'][axis])
+        key = key * len(index.masks) + index.regions(games['values'][axis])
+    _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    outcomes = np.stack(
+        [np.bincount(inverse, weights=column) for column in games['outcomes'].T], axis=1
+    ) if len(inverse) else games['outcomes']
+    return {
+        'values': games['values'][:, first],
+        'clv_positive': games['clv_positive'][first],
+        'outcomes': outcomes,
+    }
+
+
+def bucket_sums(games, grid):
+    """(n_buckets, 5) sums of the outcome columns over the games in each bucket."""
+    bounds = grid['bounds']
+    sums = np.zeros((bounds.shape[2], games['outcomes'].shape[1]))
+    for start in range(0, len(games['clv_positive']), _CHUNK_GAMES):
+        sl = slice(start, start + _CHUNK_GAMES)
+        clv_positive = games['clv_positive'][sl, None]
+        inside = np.where(clv_positive, grid['take_positive'], grid['take_negative'])
+        for axis in range(len(_AXES)):
+            values = games['values'][axis, sl, None]
+            inside &= (bounds[axis, 0] <= values) & (values <= bounds[axis, 1])
+        sums += inside.T.astype(float) @ games['outcomes'][sl]
+    return sums
+
+
+def _init_worker(games):
+    global _games
+    _games = games
+
+
+def _shard_sums(grid):
+    return bucket_sums(_games, grid)
+
+
+def _shard(grid, index):
+    return {name: values[..., index] for name, values in grid.items()}
+
+
+def build(history, grid, workers=None, shards_per_worker=2):
+    """The ``grid`` Backtesting table with every bucket's results recomputed from ``history``.
+
+    ``workers`` processes (default: one per CPU) each take shards of buckets;
+    ``workers=1`` runs in this process.
+    """
+    grid = grid[GRID_COLUMNS].reset_index(drop=True)
+    arrays = grid_arrays(grid)
+    games = collapse(game_arrays(history), arrays)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(grid) < 2:
+        sums = bucket_sums(games, arrays)
+    else:
+        shards = np.array_split(np.arange(len(grid)), min(len(grid), workers * shards_per_worker))
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(games,)) as pool:
+            parts = pool.map(_shard_sums, [_shard(arrays, index) for index in shards])
+            sums = np.concatenate(list(parts))
+
+    wins, losses, push, margin, positive_clv = sums.T
+    sample = wins + losses + push
+    with np.errstate(invalid='ignore', divide='ignore'):
+        df = grid.assign(
+            Wins=wins,
+            Losses=losses,
+            Push=push,
+            Sample=sample,
+            Margin=np.round(margin / sample, 2),
+            ROI=np.round((wins * 100 / 110 - losses) / sample, 3),
+            # Like the hand-kept sheet, only the all-games rows carry CLV counts
+            **{'+ CLV': np.where(grid['CLV from Open'].isna(), positive_clv, np.nan)},
+        )
+    df['CLV %'] = df['+ CLV'] / df['Sample']
+    return df[GRID_COLUMNS[:-1] + ['Wins', 'Losses', 'Push', 'Sample', 'Margin', 'ROI', '+ CLV', 'CLV %', 'Signal']]
+
+
+def read_history(paths):
+    """All history files (csv, xlsx or parquet) concatenated."""
+    frames = []
+    for path in paths:
+        if path.endswith('.parquet'):
+            frames.append(pd.read_parquet(path))
+        elif path.endswith('.xlsx'):
+            frames.append(loaders.read_excel(path))
+        else:
+            frames.append(loaders.read_csv(path))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _file_mode(path):
+    """Permission bits to give the file written to ``path``: its current ones, else the umask's default."""
+    if os.path.exists(path):
+        return stat.S_IMODE(os.stat(path).st_mode)
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def write_backtesting(df, path, sheet_name='Backtesting', backup=True):
+    """Write the table to ``path``; workbooks keep their other sheets (Stadiums).
+
+    The file is replaced atomically, so pages never read a half-written workbook,
+    and keeps its permissions. With ``backup`` the replaced file is kept as
+    ``<path>.bak``.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=os.path.splitext(path)[1])
+    os.close(fd)
+    try:
+        if path.endswith('.parquet'):
+            df.to_parquet(tmp, index=False)
+        elif path.endswith('.csv'):
+            df.to_csv(tmp, index=False)
+        elif os.path.exists(path):
+            shutil.copyfile(path, tmp)
+            with pd.ExcelWriter(tmp, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
+                df.to_excel(writer, index=False, sheet_name=sheet_name)
+        else:
+            df.to_excel(tmp, index=False, sheet_name=sheet_name)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(tmp, _file_mode(path))
+        if backup and os.path.exists(path):
+            shutil.copy2(path, f"{path}.bak")
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m football_weather.backtest_build', description=__doc__.split('\n')[0])
+    parser.add_argument('history', nargs='+', help="csv/xlsx/parquet files of graded games")
+    parser.add_argument('--grid', default='cfb_weather_backtest.xlsx', help="workbook whose Backtesting sheet defines the buckets")
+    parser.add_argument('--out', required=True,
+                        help="xlsx (sheet replaced, other sheets kept), csv or parquet; a replaced file is kept as .bak")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    start = time.perf_counter()
+    history = read_history(args.history)
+    grid = loaders.read_excel(args.grid, sheet_name='Backtesting')
+    df = build(history, grid, args.workers)
+    path = write_backtesting(df, args.out)
+    logger.info("%d games x %d buckets -> %s in %.2fs", len(history), len(df), path, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
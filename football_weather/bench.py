@@ -0,0 +1,141 @@
+"""Per-stage benchmarks of the signal pipeline on synthetic slates.
+
+    python -m football_weather.bench --sizes 100 10000 100000
+    python -m football_weather.bench --sizes 100 10000 --save-baseline
+    python -m football_weather.bench --sizes 100 10000 --tolerance 0.3
+
+Stages are timed separately (best of ``--repeat``): snapshot load (xlsx,
+sidecar, csv), stadium merge, backtest match, classification, backtest
+table rebuild and figure build. With a baseline file present, any stage slower than baseline by more
+than ``--tolerance`` (and ``--min-delta-ms``) is reported as a regression and
+the exit code is 1.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from football_weather import backtest_build, loaders, pipeline, sidecar, signals, synth
+from football_weather.backtest import BacktestMatcher
+from football_weather.classify import classify_cfb, classify_nfl
+
+DEFAULT_BASELINE = 'bench_baseline.json'
+
+
+def _best(fn, repeat, warmup=True):
+    # The untimed first call pays for lazy imports and cold caches
+    if warmup:
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _plotly_available():
+    try:
+        import plotly  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run(n_games, n_buckets=120, repeat=3, max_xlsx_games=20000, max_figure_games=100000, seed=0):
+    """Seconds per stage for one slate size."""
+    teams = synth.stadiums(seed=seed)
+    stadiums = teams[synth.STADIUM_COLUMNS]
+    df_bt = synth.backtest_table(n_buckets, seed)
+    raw_cfb = synth.cfb_slate(n_games, seed, teams)
+    raw_nfl = synth.nfl_slate(n_games, seed)
+    cfb = sidecar.split_game_loc(raw_cfb.copy())
+    nfl = sidecar.split_game_loc(raw_nfl.copy())
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        nfl_path = os.path.join(tmp, 'nfl_weather.csv')
+        raw_nfl.to_csv(nfl_path, index=False)
+        results['load_csv'] = _best(lambda: loaders.parse_source(nfl_path), repeat)
+
+        # Writing big workbooks takes far longer than the stage being timed
+        if n_games <= max_xlsx_games:
+            cfb_path = os.path.join(tmp, 'cfb_weather.xlsx')
+            raw_cfb.to_excel(cfb_path, index=False)
+            results['load_xlsx'] = _best(lambda: loaders.parse_source(cfb_path), 1, warmup=False)
+            digest = loaders.snapshot_id(cfb_path)
+            sidecar.write_sidecar(loaders.parse_source(cfb_path), cfb_path, digest)
+            results['load_sidecar'] = _best(lambda: sidecar.read_sidecar(cfb_path, digest), repeat)
+
+    results['stadium_merge'] = _best(lambda: pipeline.join_stadiums(cfb, stadiums), repeat)
+    joined = pipeline.join_stadiums(cfb, stadiums)
+    results['backtest_match'] = _best(lambda: BacktestMatcher(df_bt).match(joined), repeat)
+    results['classify_cfb'] = _best(lambda: classify_cfb(joined), repeat)
+    results['classify_nfl'] = _best(lambda: classify_nfl(nfl), repeat)
+    results['combined_signals'] = _best(lambda: signals.matched_games(signals.unify(nfl, cfb)), repeat)
+    history = synth.results(n_games, seed, teams)
+    results['backtest_build'] = _best(lambda: backtest_build.build(history, df_bt, workers=1), repeat)
+
+    if _plotly_available() and n_games <= max_figure_games:
+        from football_weather import figures
+        slate = pipeline.build_cfb_slate(cfb, stadiums, df_bt)
+        results['figure_build'] = _best(lambda: figures.cfb_figure(slate), repeat)
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta=0.002):
+    """(key, current, baseline) for every stage slower than baseline * (1 + tolerance).
+
+    Slowdowns under ``min_delta`` seconds are timer noise and are ignored.
+    """
+    return [
+        (key, seconds, baseline[key])
+        for key, seconds in results.items()
+        if key in baseline
+        and seconds > baseline[key] * (1 + tolerance)
+        and seconds - baseline[key] > min_delta
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m football_weather.bench', description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000])
+    parser.add_argument('--buckets', type=int, default=120, help="backtest table rows")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-xlsx-games', type=int, default=20000, help="skip the xlsx load stages above this size")
+    parser.add_argument('--max-figure-games', type=int, default=100000, help="skip the figure stage above this size")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for size in args.sizes:
+        stages = run(size, args.buckets, args.repeat, args.max_xlsx_games, args.max_figure_games)
+        for stage, seconds in stages.items():
+            results[f"{stage}@{size}"] = seconds
+            print(f"{size:>9} games  {stage:<18} {seconds * 1000:10.2f} ms")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms / 1000)
+    for key, seconds, before in regressions:
+        print(f"REGRESSION {key}: {before * 1000:.2f} ms -> {seconds * 1000:.2f} ms ({seconds / before:.2f}x)")
+    if not regressions:
+        print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
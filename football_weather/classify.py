@@ -0,0 +1,200 @@
+"""Columnar impact classification for the NFL and CFB maps.
+
+The rules are written as boolean masks over whole columns and resolved with
+``np.select`` in priority order, so a slate is classified in one pass instead
+of one Python call per row. The ``*_conditions`` functions take anything that
+can be indexed by column name (a DataFrame, or a dict of equally shaped
+arrays) and return the masks in priority order.
+
+The CFB cutoffs live in a ``CfbThresholds``; ``DEFAULT_CFB_THRESHOLDS`` holds
+the hand-tuned values and ``load_cfb_thresholds`` reads a set chosen by
+``python -m football_weather.optimize``.
+"""
+import json
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from football_weather import clock
+
+# NFL: (impact level, dot color, dot size) per condition, in priority order
+NFL_LEVELS = [
+    ('Low Impact', 'blue', 15),
+    ('Mid Impact', 'orange', 25),
+    ('High Impact', 'purple', 40),
+]
+NFL_DEFAULT = ('No Impact', 'green', 7)
+
+# CFB Low Impact wind threshold by weekday of the forecast (0 = Monday, 6 = Sunday)
+LOW_IMPACT_WIND_THRESHOLDS = {
+    0: 11.14,  # Monday
+    1: 11.14,  # Tuesday
+    2: 10.10,  # Wednesday
+    3: 10.10,  # Thursday
+    4: 9.31,   # Friday
+    5: 8.79,   # Saturday
+    6: 11.93,  # Sunday
+}
+DEFAULT_LOW_IMPACT_WIND_THRESHOLD = 10
+# Mid, High and Very High Impact all need this much wind above the Low Impact threshold
+WIND_STEP = 7.5
+
+# Every cutoff the CFB rules use. low_wind is the Low Impact wind threshold
+# indexed by weekday; cold_temp/cool_temp are the "below" temperatures of the
+# Very High and High/Mid/Low wind signals; close_spread/wide_spread the
+# absolute opening spreads of Very High/High and of Mid/Low.
+CfbThresholds = namedtuple(
+    'CfbThresholds', ['low_wind', 'wind_step', 'cold_temp', 'cool_temp', 'close_spread', 'wide_spread']
+)
+DEFAULT_CFB_THRESHOLDS = CfbThresholds(
+    low_wind=tuple(LOW_IMPACT_WIND_THRESHOLDS.get(day, DEFAULT_LOW_IMPACT_WIND_THRESHOLD) for day in range(7)),
+    wind_step=WIND_STEP,
+    cold_temp=50,
+    cool_temp=65,
+    close_spread=10.5,
+    wide_spread=20.5,
+)
+
+# CFB signals in priority order, matching cfb_conditions
+CFB_SIGNALS = ['Very High Impact', 'High Impact', 'Mid Impact', 'Low Impact']
+CFB_DEFAULT = 'No Impact'
+CFB_COLORS = {
+    'Very High Impact': 'darkred',
+    'High Impact': 'purple',
+    'Mid Impact': 'orange',
+    'Low Impact': 'blue',
+    'No Impact': 'green',
+}
+CFB_SIZES = {
+    'Low Impact': 15,
+    'Mid Impact': 25,
+    'High Impact': 40,
+    'Very High Impact': 50,
+    'No Impact': 7,
+}
+
+# Dot opacity by the stadium's wind_impact label; anything else is fully opaque
+WIND_IMPACT_OPACITY = {'high': 1.0, 'low': 0.15, 'med': 0.5}
+
+
+def numeric_column(data, name):
+    """Column ``name`` of ``data`` as a float array, with missing/non-numeric values as NaN.
+
+    float32 columns (see schema.compact) are returned as they are, and small
+    integers as float32, so compact frames are not widened to float64.
+    """
+    values = data[name]
+    if isinstance(values, pd.Series):
+        if values.dtype == np.float32:
+            return values.to_numpy()
+        if values.dtype.kind in 'iu' and values.dtype.itemsize <= 2:
+            return values.to_numpy(dtype=np.float32)
+        return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    return np.asarray(values, dtype=float)
+
+
+def nfl_conditions(data):
+    rain, wind, temp = (numeric_column(data, name) for name in ('rain_fg', 'wind_fg', 'temp_fg'))
+    return [
+        (rain > 2) | ((wind > 8) & (wind < 15) & (temp < 60)),
+        (wind > 15) & (temp < 60),
+        (wind > 15) & (temp >= 32) & (temp <= 45),
+    ]
+
+
+def low_impact_wind_threshold(today=None, thresholds=None):
+    """Low Impact wind threshold for the weekday of ``today`` (default: ``clock.now()``).
+
+    ``today`` may also be a Series or array of datetimes, for one threshold per
+    row (NaN where the time is missing, so no wind signal fires).
+    """
+    low_wind = (thresholds or DEFAULT_CFB_THRESHOLDS).low_wind
+    if today is None:
+        today = clock.now()
+    if isinstance(today, (pd.Series, pd.Index, np.ndarray, list)):
+        weekday = pd.Series(pd.to_datetime(today, errors='coerce')).dt.weekday
+        return weekday.map(dict(enumerate(low_wind))).to_numpy(dtype=float, na_value=np.nan)
+    return low_wind[today.weekday()]
+
+
+def load_cfb_thresholds(path, min_sample=0):
+    """The highest-ROI threshold set with at least ``min_sample`` games from an optimizer file."""
+    with open(path) as f:
+        frontier = json.load(f)['frontier']
+    candidates = [entry for entry in frontier if entry['sample'] >= min_sample]
+    if not candidates:
+        raise ValueError(f"no threshold set in {path} has {min_sample} or more games")
+    values = max(candidates, key=lambda entry: entry['roi'])['thresholds']
+    return CfbThresholds(**dict(values, low_wind=tuple(values['low_wind'])))
+
+
+def _heat(data, temp):
+    return (temp > 80) & (numeric_column(data, 'home_temp') < 57) & (numeric_column(data, 'away_temp') < 57)
+
+
+def cfb_conditions(data, low_wind_thresh, thresholds=None):
+    """CFB signal masks; ``low_wind_thresh`` may be an array broadcasting against the columns."""
+    t = thresholds or DEFAULT_CFB_THRESHOLDS
+    wind, temp, spread, travel_alt, rain = (
+        numeric_column(data, name) for name in ('wind_fg', 'temp_fg', 'Open', 'travel_alt', 'rain_fg')
+    )
+
+    mid_wind_thresh = high_wind_thresh = very_high_wind_thresh = low_wind_thresh + t.wind_step
+    close_spread = (spread >= -t.close_spread) & (spread <= t.close_spread)
+    wide_spread = (spread >= -t.wide_spread) & (spread <= t.wide_spread)
+    cool = temp < t.cool_temp
+
+    return [
+        (wind > very_high_wind_thresh) & (temp < t.cold_temp) & close_spread,
+        (wind > high_wind_thresh) & cool & close_spread,
+        (((wind > mid_wind_thresh) & cool) | ((travel_alt > 800) & (temp > 75))) & wide_spread,
+        (((wind > low_wind_thresh) & cool) | (rain > 2) | _heat(data, temp)) & wide_spread,
+    ]
+
+
+def wind_impact_opacity(wind_impact, ignore_case=False):
+    # Look up each distinct label once, then spread by code (categoricals are not expanded)
+    codes, labels = pd.factorize(pd.Series(wind_impact), use_na_sentinel=True)
+    labels = pd.Series(np.asarray(labels, dtype=object))
+    if ignore_case:
+        labels = labels.astype('string').str.lower()
+    opacity = labels.map(WIND_IMPACT_OPACITY).fillna(1.0).to_numpy(dtype=float)
+    return np.append(opacity, 1.0)[codes]
+
+
+def classify_nfl(df):
+    """impact_level, dot_color, dot_size and dot_opacity for an NFL slate."""
+    choice = np.select(nfl_conditions(df), np.arange(len(NFL_LEVELS)), default=len(NFL_LEVELS))
+    levels, colors, sizes = (np.array(values) for values in zip(*NFL_LEVELS, NFL_DEFAULT))
+    return pd.DataFrame({
+        'impact_level': levels[choice],
+        'dot_color': colors[choice],
+        'dot_size': sizes[choice],
+        'dot_opacity': wind_impact_opacity(df['wind_impact']),
+    }, index=df.index)
+
+
+def classify_cfb(df, today=None, thresholds=None):
+    """signal, dot_color and dot_size for a CFB slate as of ``today`` (default: ``clock.now()``).
+
+    ``today`` may be per row (see low_impact_wind_threshold). ``thresholds`` is
+    a CfbThresholds (default: DEFAULT_CFB_THRESHOLDS).
+    """
+    conditions = cfb_conditions(df, low_impact_wind_threshold(today, thresholds), thresholds)
+    signals = np.array(CFB_SIGNALS + [CFB_DEFAULT])
+    signal = signals[np.select(conditions, np.arange(len(CFB_SIGNALS)), default=len(CFB_SIGNALS))]
+
+    # Low Impact dots are colored by what triggered them: rain, then heat, else wind
+    low = signal == 'Low Impact'
+    temp = numeric_column(df, 'temp_fg')
+    dot_color = np.select(
+        [low & (numeric_column(df, 'rain_fg') > 2), low & _heat(df, temp)],
+        ['black', 'red'],
+        default=pd.Series(signal).map(CFB_COLORS).to_numpy(),
+    )
+    return pd.DataFrame({
+        'signal': signal,
+        'dot_color': dot_color,
+        'dot_size': pd.Series(signal).map(CFB_SIZES).to_numpy(),
+    }, index=df.index)
@@ -0,0 +1,107 @@
+"""Headless batch processing of snapshots into classified slates.
+
+    python -m football_weather nfl nfl_weather.csv --out results/
+    python -m football_weather cfb cfb_weather.xlsx week*/cfb_weather.xlsx --backtest cfb_weather_backtest.xlsx
+    python -m football_weather combined --nfl nfl_weather.csv --cfb cfb_weather.xlsx --render
+
+Each slate is written to ``<out>/<snapshot name>.<kind>.<format>``. plotly is
+only imported with ``--render``, which also writes the map as html.
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+
+from football_weather import loaders, pipeline
+from football_weather.classify import load_cfb_thresholds
+from football_weather.backtest import BacktestMatcher
+
+logger = logging.getLogger(__name__)
+
+
+def write_slate(df, out_dir, name, kind, fmt='csv'):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{name}.{kind}.{fmt}")
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def render_slate(df, out_dir, name, kind):
+    from football_weather import figures
+
+    builders = {'nfl': figures.nfl_figure, 'cfb': figures.cfb_figure, 'combined': figures.combined_figure}
+    path = os.path.join(out_dir, f"{name}.{kind}.html")
+    builders[kind](df).write_html(path)
+    return path
+
+
+def _snapshot_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _slates(args):
+    """Yield (name, kind, slate) for every snapshot named on the command line."""
+    if args.command == 'nfl':
+        for path in args.snapshots:
+            yield _snapshot_name(path), 'nfl', pipeline.load_nfl_slate(path)
+    elif args.command == 'cfb':
+        stadiums = loaders.read_excel(args.backtest, sheet_name='Stadiums')
+        df_bt = loaders.read_excel(args.backtest, sheet_name='Backtesting')
+        # The backtest table is shared, so index it once for every snapshot
+        matcher = BacktestMatcher(df_bt)
+        thresholds = load_cfb_thresholds(args.thresholds, args.min_sample) if args.thresholds else None
+        for path in args.snapshots:
+            weather = loaders.read_excel(path)
+            slate = pipeline.build_cfb_slate(
+                weather, stadiums, df_bt, today=args.as_of, matcher=matcher, thresholds=thresholds
+            )
+            yield _snapshot_name(path), 'cfb', slate
+    else:
+        name = f"{_snapshot_name(args.cfb)}+{_snapshot_name(args.nfl)}"
+        yield name, 'combined', pipeline.load_combined_slate(args.nfl, args.cfb)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m football_weather', description=__doc__.split('\n')[0])
+    parent = argparse.ArgumentParser(add_help=False)
+    parent.add_argument('--out', default='results', help="output directory (default: results)")
+    parent.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parent.add_argument('--render', action='store_true', help="also write the map as html (needs plotly)")
+
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    nfl = commands.add_parser('nfl', parents=[parent], help="classify NFL snapshots")
+    nfl.add_argument('snapshots', nargs='+')
+
+    cfb = commands.add_parser('cfb', parents=[parent], help="classify CFB snapshots")
+    cfb.add_argument('snapshots', nargs='+')
+    cfb.add_argument('--backtest', default=pipeline.CFB_BACKTEST, help="workbook with Stadiums and Backtesting sheets")
+    cfb.add_argument('--as-of', type=datetime.fromisoformat, default=None,
+                     help="ISO date/time whose weekday sets the wind thresholds (default: now)")
+    cfb.add_argument('--thresholds', default=None, help="optimizer output to classify with (default: built-in cutoffs)")
+    cfb.add_argument('--min-sample', type=int, default=0, help="with --thresholds, best-ROI set with at least this many games")
+
+    combined = commands.add_parser('combined', parents=[parent], help="evaluate the combined NFL + CFB signals")
+    combined.add_argument('--nfl', default=pipeline.NFL_SNAPSHOT)
+    combined.add_argument('--cfb', default=pipeline.CFB_SNAPSHOT)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    for name, kind, slate in _slates(args):
+        path = write_slate(slate, args.out, name, kind, args.format)
+        logger.info("%s: %d games -> %s", name, len(slate), path)
+        if args.render:
+            logger.info("%s: map -> %s", name, render_slate(slate, args.out, name, kind))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""The as-of clock behind every "now" in the package.
+
+CFB classification depends on the current weekday. Code that needs another
+"now" (replays, reproducing what a page showed on a given day) sets it with
+``as_of`` rather than passing dates through every call:
+
+    with clock.as_of('2025-10-08T10:00'):
+        slate = pipeline.load_cfb_slate()
+
+The override is a context variable, so concurrent streamlit sessions each see
+their own. ``FW_AS_OF`` (an ISO date/time) pins the clock for a whole process,
+e.g. to run the dashboard as it was on a past day.
+"""
+import contextvars
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+_as_of = contextvars.ContextVar('football_weather_as_of', default=None)
+
+
+def _parse(when):
+    return datetime.fromisoformat(when) if isinstance(when, str) else when
+
+
+def now():
+    """The as-of time: the innermost ``as_of``, else FW_AS_OF, else the wall clock."""
+    when = _as_of.get()
+    if when is not None:
+        return when
+    pinned = os.environ.get('FW_AS_OF')
+    return _parse(pinned) if pinned else datetime.today()
+
+
+@contextmanager
+def as_of(when):
+    """Make ``now()`` return ``when`` (a datetime or ISO string) inside the block."""
+    token = _as_of.set(_parse(when))
+    try:
+        yield
+    finally:
+        _as_of.reset(token)
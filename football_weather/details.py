@@ -0,0 +1,165 @@
+"""Game detail tables for the "Show game details" drill-down, built once per slate.
+
+Each league's slate is renamed to its display labels and formatted in bulk
+(one vectorized pass per column instead of a lambda per cell) into the
+weather, odds and game info tables. ``GameDetails`` keeps those tables and,
+per game, the row positions it occupies, so a selection is a dict lookup
+plus a small ``iloc``. ``games`` is the sorted list for the selector.
+``for_slate`` caches one GameDetails per published slate version.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from football_weather import metrics
+
+# Display formats: printf pattern applied to every value of the column
+DEGREES = '%.1f°'
+PERCENT = '%.1f%%'
+DECIMAL = '%.1f'
+
+# Per league: raw column -> display label, the tables with their display
+# columns, and whether a game's rows are shown renumbered from 0
+SPECS = {
+    'nfl': {
+        'renames': {
+            'home_temp': 'Home_t',
+            'away_temp': 'Away_t',
+            'away_fg': 'Away tm',
+            'game_loc': 'Game Location',
+            'Total_open': 'Open',
+            'Total_now': 'Current',
+            'Under_open': 'Price',
+            'Under_now': 'Price Now',
+            'Spread_open': 'Open_s',
+            'Spread_now': 'Current_s',
+            'wind_fg': 'Wind',
+            'temp_fg': 'Temp',
+            'rain_fg': 'Rain',
+            'wind_vol': 'Volatility',
+            'wind_diff': 'Relative Wind',
+            'year_built': 'Year',
+            'wind_dir_fg': 'Wind_dir',
+            'orient': 'Orientation',
+            'wind_impact': 'Wind Impact',
+            'weakest_wind_effect': 'Weakest Wind',
+        },
+        'tables': {
+            'Weather Information': ['Wind', 'Temp', 'Rain', 'Impact', 'Volatility', 'Relative Wind', 'Home_t', 'Away_t', 'Year'],
+            'Odds Information': ['Open', 'Price', 'Current', 'Price Now', 'Open_s', 'Current_s', 'Away tm'],
+            'Game Information': ['Orientation', 'Wind Impact', 'Wind_dir', 'Weakest Wind', 'Date', 'Time', 'Game Location'],
+        },
+        'reset_index': True,
+    },
+    'cfb': {
+        'renames': {
+            'home_temp': 'Home_t',
+            'away_temp': 'Away_t',
+            'away_fg': 'Away tm',
+            'game_loc': 'Game Location',
+            'Fd_open': 'Open',
+            'FD_now': 'Current',
+            'Open': 'Open_s',
+            'Current': 'Current_s',
+            'wind_fg': 'Wind',
+            'temp_fg': 'Temp',
+            'rain_fg': 'Rain',
+            'wind_vol': 'Volatility',
+            'wind_diff': 'Relative Wind',
+            'year_built': 'Year',
+            'wind_dir_fg': 'Wind_dir',
+            'orient': 'Orient',
+            'wind_impact': 'Wind_imp',
+            'weakest_wind_effect': 'Weakest_dir',
+        },
+        'tables': {
+            'Weather Information': ['Wind', 'Temp', 'Rain', 'Volatility', 'Relative Wind', 'Home_t', 'Away_t', 'Year'],
+            'Odds Information': ['Open', 'Current', 'Open_s', 'Current_s', 'Away tm'],
+            'Game Information': ['Date', 'Time', 'Orient', 'Wind_dir', 'Wind_imp', 'Weakest_dir', 'Game Location'],
+        },
+        'reset_index': False,
+    },
+}
+FORMATS = {
+    'Home_t': DEGREES, 'Away_t': DEGREES, 'Temp': DEGREES,
+    'Away tm': PERCENT, 'Impact': PERCENT,
+    'Open': DECIMAL, 'Current': DECIMAL, 'Wind': DECIMAL, 'Open_s': DECIMAL, 'Current_s': DECIMAL,
+    'Rain': DECIMAL, 'Relative Wind': DECIMAL,
+}
+# Slates with details kept in memory
+CACHE_SIZE = 8
+
+
+def format_values(values, pattern):
+    """``pattern % value`` for every value at once (non-numbers give "nan", like the f-strings did)."""
+    numbers = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+    return np.char.mod(pattern, numbers).astype(object)
+
+
+def year_labels(values):
+    """Whole-year labels ("1957"), blank where unknown."""
+    years = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+    known = np.isfinite(years)
+    labels = np.full(len(years), '', dtype=object)
+    labels[known] = np.char.mod('%d', years[known].astype(np.int64))
+    return labels
+
+
+class GameDetails:
+    """Formatted detail tables of one slate, indexed by game."""
+
+    def __init__(self, kind, df):
+        spec = SPECS[kind]
+        shown = df.rename(columns=spec['renames'])
+        columns = {}
+        for name in dict.fromkeys(col for cols in spec['tables'].values() for col in cols):
+            if name == 'Impact':
+                columns[name] = format_values(df['gs_fg'], PERCENT)
+            elif name == 'Year':
+                columns[name] = year_labels(shown[name])
+            elif name in FORMATS:
+                columns[name] = format_values(shown[name], FORMATS[name])
+            else:
+                columns[name] = shown[name].to_numpy()
+        formatted = pd.DataFrame(columns, index=df.index)
+        self.tables = {title: formatted[cols] for title, cols in spec['tables'].items()}
+        self.reset_index = spec['reset_index']
+
+        codes, uniques = pd.factorize(df['Game'].astype(object), sort=True)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self.games = list(uniques)
+        self._rows = {game: order[bounds[i]:bounds[i + 1]] for i, game in enumerate(self.games)}
+
+    def tables_for(self, game):
+        """{title: table} of ``game``'s rows, ready for st.table (empty dict if unknown)."""
+        rows = self._rows.get(game)
+        if rows is None:
+            return {}
+        tables = {title: table.iloc[rows] for title, table in self.tables.items()}
+        if self.reset_index:
+            tables = {title: table.reset_index(drop=True) for title, table in tables.items()}
+        return tables
+
+
+_details = OrderedDict()
+_lock = threading.Lock()
+
+
+def for_slate(kind, version, df):
+    """GameDetails of the ``kind`` slate ``df`` published as ``version``, built once."""
+    key = (kind, version)
+    with _lock:
+        details = _details.get(key)
+        if details is not None:
+            _details.move_to_end(key)
+            return details
+    with metrics.stage(f"details.{kind}", len(df)):
+        details = GameDetails(kind, df)
+    with _lock:
+        _details[key] = details
+        while len(_details) > CACHE_SIZE:
+            _details.popitem(last=False)
+    return details
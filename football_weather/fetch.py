@@ -0,0 +1,519 @@
+"""Concurrent hourly forecast fetcher that writes ``nfl_weather.csv`` snapshots.
+
+    python -m football_weather.fetch run schedule.csv --out nfl_weather.csv --every 900
+    python -m football_weather.fetch stub --port 8765 --latency 0.05
+    python -m football_weather.fetch bench --games 2000 --latency 0.05 --concurrency 32
+    python -m football_weather.fetch cells nfl_weather.csv cfb_weather.xlsx --cell 0.25 --window 3
+
+A schedule is a csv in the ``nfl_weather.csv`` schema without the forecast
+columns: one row per game with ``Date`` ("SUN 09/07"), ``Time`` ("01:00 PM",
+the stadium's local time), ``game_loc`` and the stadium attributes. The
+hourly forecast at each stadium is requested from an Open-Meteo style
+endpoint in the stadium's own time zone (``timezone=auto``), so the kickoff
+hour is looked up as written, with no conversion; kickoff-hour
+temperature, wind speed and direction fill ``temp_fg``, ``wind_fg`` and
+``wind_dir_fg``, the next two hours' directions ``wind_dir_1h`` and
+``wind_dir_2h``, and ``rain_fg`` is the precipitation over those three hours (inches).
+
+Requests run on one asyncio loop over keep-alive HTTP/1.1 connections, at
+most ``concurrency`` in flight, retried with exponential backoff on
+connection errors, timeouts, 429 and 5xx. Every hour of a response is cached
+by (lat, lon, hour) for ``ttl`` seconds, so a refresh only requests the
+locations with a kickoff hour missing or stale. The client is built on the
+standard library only, and ``stub`` serves deterministic forecasts locally so
+the fetcher can be run and benchmarked offline.
+
+Games sharing a stadium, or stadiums in the same forecast grid cell
+(``--cell`` degrees, about the forecast model's resolution), are one
+location: the cell is requested once and every game in it reads its hours
+from that response. Games are also grouped by kickoff window, so hours are
+extracted once per (cell, window) and fanned out. ``cells`` reports how much
+work this saves on existing snapshots.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from football_weather import schema, sidecar, wind
+
+logger = logging.getLogger(__name__)
+
+OPEN_METEO_URL = 'https://api.open-meteo.com/v1/forecast'
+HOURLY_FIELDS = ['temperature_2m', 'wind_speed_10m', 'wind_direction_10m', 'precipitation']
+DEFAULT_PARAMS = {
+    'hourly': ','.join(HOURLY_FIELDS),
+    'temperature_unit': 'fahrenheit',
+    'wind_speed_unit': 'mph',
+    'precipitation_unit': 'inch',
+    # Hours in each location's local time, like the schedule's kickoff times
+    'timezone': 'auto',
+    'forecast_days': 16,
+}
+FORECAST_COLUMNS = ['temp_fg', 'wind_fg', 'wind_dir_fg', 'rain_fg', 'wind_dir_1h', 'wind_dir_2h']
+# Hours forecast per game: kickoff and the two after it
+GAME_HOURS = 3
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Forecast grid cell (about 11 km, the forecast model's resolution) and
+# kickoff window games are grouped by
+CELL_DEGREES = 0.1
+WINDOW_HOURS = 1
+
+
+def hour_key(when):
+    """Cache/response key of the hour containing ``when`` ("2025-09-07T13:00")."""
+    return when.strftime('%Y-%m-%dT%H:00')
+
+
+def forecast_cells(lat, lon, kickoff, cell_degrees=CELL_DEGREES, window_hours=WINDOW_HOURS):
+    """Group games into forecast jobs: one per (grid cell, kickoff window).
+
+    Returns (job of each game, hour offset of each kickoff into its job's
+    window, jobs) with ``jobs`` holding the cell centre ``lat``/``lon``, the
+    window ``start`` and the number of ``games`` of each job.
+    """
+    row = np.floor(np.asarray(lat, dtype=float) / cell_degrees).astype(np.int64)
+    col = np.floor(np.asarray(lon, dtype=float) / cell_degrees).astype(np.int64)
+    hour = np.asarray(kickoff, dtype='datetime64[h]').astype(np.int64)
+    window = hour // window_hours
+    # One integer per (row, column, window) so a flat unique does the grouping
+    parts = [part - part.min(initial=0) for part in (row, col, window)]
+    keys = (parts[0] * (parts[1].max(initial=0) + 1) + parts[1]) * (parts[2].max(initial=0) + 1) + parts[2]
+    _, first, job = np.unique(keys, return_index=True, return_inverse=True)
+    job = job.ravel()
+    start = window[first] * window_hours
+    jobs = {
+        'lat': np.round((row[first] + 0.5) * cell_degrees, 4),
+        'lon': np.round((col[first] + 0.5) * cell_degrees, 4),
+        'start': start.astype('datetime64[h]'),
+        'games': np.bincount(job, minlength=len(first)),
+    }
+    return job, hour - start[job], jobs
+
+
+def dedup_report(lat, lon, jobs):
+    """How much forecast work the cell/window grouping saved.
+
+    ``locations`` are distinct stadium coordinates, ``cells`` the requests
+    made and ``cell_windows`` the forecast extractions fanned out to games.
+    """
+    games = len(lat)
+    locations = len(np.unique(np.stack([lat, lon], axis=1), axis=0)) if games else 0
+    cells = len(np.unique(np.stack([jobs['lat'], jobs['lon']], axis=1), axis=0)) if games else 0
+    return {
+        'games': games,
+        'locations': locations,
+        'cells': cells,
+        'cell_windows': len(jobs['games']),
+        'requests_saved': games - cells,
+        'games_per_request': round(games / cells, 2) if cells else 0.0,
+        'games_per_cell_window': round(games / len(jobs['games']), 2) if games else 0.0,
+    }
+
+
+class _Connections:
+    """Keep-alive HTTP/1.1 connections per (scheme, host, port), reused last-in first-out."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.opened = 0
+        self._idle = {}
+
+    async def _open(self, parts):
+        https = parts.scheme == 'https'
+        port = parts.port or (443 if https else 80)
+        self.opened += 1
+        return await asyncio.open_connection(parts.hostname, port, ssl=https or None)
+
+    async def get(self, url, timeout):
+        """(status, body) of a GET; a stale reused connection is replaced once."""
+        parts = urlsplit(url)
+        idle = self._idle.setdefault((parts.scheme, parts.hostname, parts.port), [])
+        while True:
+            reused = bool(idle)
+            reader, writer = idle.pop() if reused else await asyncio.wait_for(self._open(parts), timeout)
+            try:
+                status, keep_alive, body = await asyncio.wait_for(self._exchange(reader, writer, parts), timeout)
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # The server dropped an idle connection; retry on a fresh one
+                if not reused:
+                    raise
+            except BaseException:
+                writer.close()
+                raise
+        if keep_alive and len(idle) < self.limit:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+        return status, body
+
+    @staticmethod
+    async def _exchange(reader, writer, parts):
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        writer.write(
+            f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: application/json\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before the response")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if not size:
+                    # Skip any trailers
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body, keep_alive = await reader.read(), False
+        return status, keep_alive, bytes(body)
+
+    def close(self):
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+class ForecastFetcher:
+    """Hourly forecasts per location with bounded concurrency, retries and a TTL cache.
+
+    The cache lives on the fetcher, so keep one fetcher across refreshes.
+    """
+
+    def __init__(self, url=OPEN_METEO_URL, concurrency=16, retries=3, ttl=3600, timeout=15.0, backoff=0.5,
+                 params=None, cell_degrees=CELL_DEGREES, window_hours=WINDOW_HOURS):
+        self.url = url
+        self.concurrency = concurrency
+        self.retries = retries
+        self.ttl = ttl
+        self.timeout = timeout
+        self.backoff = backoff
+        self.params = dict(DEFAULT_PARAMS, **(params or {}))
+        self.cell_degrees = cell_degrees
+        self.window_hours = window_hours
+        self.last_dedup = None
+        # (lat, lon, hour) -> (expires, (temperature, wind speed, wind direction, precipitation))
+        self._cache = {}
+        self.stats = {'locations': 0, 'cache_hits': 0, 'requests': 0, 'retries': 0, 'failed': 0, 'connections': 0}
+
+    def _cached(self, lat, lon, hours, now):
+        values = []
+        for hour in hours:
+            entry = self._cache.get((lat, lon, hour))
+            if entry is None or entry[0] < now:
+                return None
+            values.append(entry[1])
+        return values
+
+    def _evict(self, now):
+        """Drop the expired hours, so a long-running refresh loop does not grow the cache."""
+        self._cache = {key: entry for key, entry in self._cache.items() if entry[0] >= now}
+
+    def _store(self, lat, lon, payload, now):
+        hourly = payload['hourly']
+        expires = now + self.ttl
+        columns = [hourly[field] for field in HOURLY_FIELDS]
+        for i, hour in enumerate(hourly['time']):
+            self._cache[(lat, lon, hour)] = (expires, tuple(column[i] for column in columns))
+
+    async def _request(self, connections, semaphore, lat, lon):
+        url = f"{self.url}?{urlencode(dict(self.params, latitude=lat, longitude=lon))}"
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+            try:
+                async with semaphore:
+                    self.stats['requests'] += 1
+                    status, body = await connections.get(url, self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                error = e
+                continue
+            if status == 200:
+                return json.loads(body)
+            error = f"HTTP {status}"
+            if status not in RETRY_STATUS:
+                break
+        raise OSError(f"forecast for {lat}, {lon} failed after {attempt + 1} attempts: {error}")
+
+    async def forecast(self, points):
+        """Hourly values for each (lat, lon, hours) point, or None where the request failed.
+
+        Each location missing any of its hours from the cache is requested once.
+        """
+        now = time.monotonic()
+        wanted = {}
+        for lat, lon, hours in points:
+            if self._cached(lat, lon, hours, now) is None:
+                wanted.setdefault((lat, lon), None)
+        self.stats['locations'] += len({(lat, lon) for lat, lon, _ in points})
+        self.stats['cache_hits'] += len({(lat, lon) for lat, lon, _ in points}) - len(wanted)
+
+        if wanted:
+            connections = _Connections(self.concurrency)
+            semaphore = asyncio.Semaphore(self.concurrency)
+            try:
+                results = await asyncio.gather(
+                    *(self._request(connections, semaphore, lat, lon) for lat, lon in wanted),
+                    return_exceptions=True,
+                )
+            finally:
+                self.stats['connections'] += connections.opened
+                connections.close()
+            self._evict(now)
+            for (lat, lon), result in zip(wanted, results):
+                if isinstance(result, BaseException):
+                    self.stats['failed'] += 1
+                    logger.warning("%s", result)
+                else:
+                    self._store(lat, lon, result, now)
+        return [self._cached(lat, lon, hours, now) for lat, lon, hours in points]
+
+    async def snapshot_async(self, schedule, now=None):
+        """``schedule`` with the forecast columns filled, in the nfl_weather.csv schema.
+
+        Games are grouped into forecast cells and kickoff windows first (see
+        forecast_cells); each cell is requested once and its hours are fanned
+        back out to the games. ``last_dedup`` holds the grouping's counts.
+        """
+        now = pd.Timestamp(now or datetime.now())
+        df = sidecar.split_game_loc(schedule.copy())
+        kickoff = schema.kickoff_times(df, now)
+        located = (df['lat'].notna() & df['lon'].notna() & kickoff.notna()).to_numpy()
+        lat, lon = df['lat'].to_numpy(dtype=float)[located], df['lon'].to_numpy(dtype=float)[located]
+        job, offset, jobs = forecast_cells(lat, lon, kickoff.to_numpy()[located], self.cell_degrees, self.window_hours)
+        self.last_dedup = dedup_report(lat, lon, jobs)
+        for name in ('games', 'cell_windows'):
+            self.stats[name] = self.stats.get(name, 0) + self.last_dedup[name]
+
+        span = self.window_hours + GAME_HOURS - 1
+        points = [
+            (cell_lat, cell_lon, [hour_key(start + pd.Timedelta(hours=h)) for h in range(span)])
+            for cell_lat, cell_lon, start in zip(jobs['lat'], jobs['lon'], pd.DatetimeIndex(jobs['start']))
+        ]
+        job_values = np.full((len(points), span, len(HOURLY_FIELDS)), np.nan)
+        for i, hours in enumerate(await self.forecast(points)):
+            if hours is not None:
+                job_values[i] = np.array(hours, dtype=float)
+        values = np.full((len(df), GAME_HOURS, len(HOURLY_FIELDS)), np.nan)
+        values[located] = job_values[job[:, None], offset[:, None] + np.arange(GAME_HOURS)]
+
+        temp, speed, direction, precipitation = (values[:, :, i] for i in range(len(HOURLY_FIELDS)))
+        df['temp_fg'] = temp[:, 0]
+        df['wind_fg'] = speed[:, 0]
+        df['wind_dir_fg'] = wind.compass_label(direction[:, 0])
+        df['wind_dir_1h'] = wind.compass_label(direction[:, 1])
+        df['wind_dir_2h'] = wind.compass_label(direction[:, 2])
+        df['rain_fg'] = precipitation.sum(axis=1)
+        df['Timestamp'] = now.isoformat()
+        return df.reindex(columns=schema.NFL_COLUMNS)
+
+    def snapshot(self, schedule, now=None):
+        return asyncio.run(self.snapshot_async(schedule, now))
+
+
+def write_snapshot(df, path):
+    """Write the csv atomically, so pages and the history watcher never see half a file."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.csv')
+    os.close(fd)
+    try:
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+# -- local stand-in for the forecast API --------------------------------------
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    fail_rate = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            self._send(503, b'{"error": true}')
+            return
+        query = {name: values[0] for name, values in parse_qs(urlsplit(self.path).query).items()}
+        self._send(200, json.dumps(stub_forecast(
+            float(query['latitude']), float(query['longitude']), int(query.get('forecast_days', 16))
+        )).encode())
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def stub_forecast(lat, lon, days=16):
+    """Deterministic Open-Meteo shaped hourly forecast for one location, from yesterday on.
+
+    Hours are in a local time taken from the longitude, as with ``timezone=auto``.
+    """
+    rng = np.random.default_rng([int(abs(lat) * 1e4), int(abs(lon) * 1e4)])
+    offset = int(round(lon / 15)) * 3600
+    start = (pd.Timestamp.now('UTC').tz_localize(None) + pd.Timedelta(seconds=offset)).normalize() - pd.Timedelta(days=1)
+    hours = pd.date_range(start, periods=(days + 1) * 24, freq='h')
+    n = len(hours)
+    return {
+        'latitude': lat,
+        'longitude': lon,
+        'utc_offset_seconds': offset,
+        'hourly': {
+            'time': list(hours.strftime('%Y-%m-%dT%H:00')),
+            'temperature_2m': np.round(105 - 1.4 * lat + rng.normal(0, 9, n), 1).tolist(),
+            'wind_speed_10m': np.round(rng.gamma(2.2, 4.0, n), 1).tolist(),
+            'wind_direction_10m': rng.integers(0, 360, n).tolist(),
+            # Inches per hour, as requested by DEFAULT_PARAMS
+            'precipitation': np.where(rng.random(n) < 0.1, np.round(rng.exponential(0.25, n), 2), 0.0).tolist(),
+        },
+    }
+
+
+def serve_stub(port=0, latency=0.0, fail_rate=0.0):
+    """Start the stand-in API on a background thread; returns (server, forecast url)."""
+    handler = type('StubHandler', (_StubHandler,), {'latency': latency, 'fail_rate': fail_rate})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+
+
+def _bench(args):
+    from football_weather import synth
+
+    server, url = serve_stub(latency=args.latency, fail_rate=args.fail_rate)
+    try:
+        start = (pd.Timestamp.now().normalize() + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        schedule = synth.nfl_slate(args.games, n_teams=args.stadiums, start=start).drop(columns=FORECAST_COLUMNS)
+        fetcher = ForecastFetcher(url, concurrency=args.concurrency, retries=args.retries, backoff=0.05,
+                                  cell_degrees=args.cell, window_hours=args.window)
+        for run in ('cold', 'warm'):
+            began = time.perf_counter()
+            df = fetcher.snapshot(schedule)
+            print(f"{run:>5}: {len(df)} games in {time.perf_counter() - began:.2f}s "
+                  f"({df['wind_fg'].notna().sum()} forecast)  {fetcher.stats}")
+        print(f"dedup: {fetcher.last_dedup}")
+    finally:
+        server.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m football_weather.fetch', description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def grouping_args(command):
+        command.add_argument('--cell', type=float, default=CELL_DEGREES, help="forecast grid cell in degrees")
+        command.add_argument('--window', type=int, default=WINDOW_HOURS, help="kickoff window in hours")
+
+    def client_args(command):
+        command.add_argument('--concurrency', type=int, default=16, help="requests in flight")
+        command.add_argument('--retries', type=int, default=3)
+        grouping_args(command)
+
+    run_cmd = commands.add_parser('run', help="forecast a schedule into a snapshot csv")
+    run_cmd.add_argument('schedule')
+    run_cmd.add_argument('--out', default='nfl_weather.csv')
+    run_cmd.add_argument('--url', default=OPEN_METEO_URL)
+    run_cmd.add_argument('--ttl', type=float, default=3600, help="seconds a forecast hour is reused")
+    run_cmd.add_argument('--every', type=float, default=None, help="refresh every this many seconds")
+    client_args(run_cmd)
+
+    stub_cmd = commands.add_parser('stub', help="serve deterministic forecasts locally")
+    stub_cmd.add_argument('--port', type=int, default=8765)
+    stub_cmd.add_argument('--latency', type=float, default=0.0, help="seconds per response")
+    stub_cmd.add_argument('--fail-rate', type=float, default=0.0, help="share of responses that are 503s")
+
+    bench_cmd = commands.add_parser('bench', help="time a cold and a cached fetch against the stub")
+    bench_cmd.add_argument('--games', type=int, default=500)
+    bench_cmd.add_argument('--stadiums', type=int, default=32)
+    bench_cmd.add_argument('--latency', type=float, default=0.05)
+    bench_cmd.add_argument('--fail-rate', type=float, default=0.0)
+    client_args(bench_cmd)
+
+    cells_cmd = commands.add_parser('cells', help="report forecast work saved by grouping games of snapshots")
+    cells_cmd.add_argument('snapshots', nargs='+')
+    grouping_args(cells_cmd)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    if args.command == 'cells':
+        from football_weather import loaders
+
+        for path in args.snapshots:
+            df = loaders.read_csv(path) if path.endswith('.csv') else loaders.read_excel(path)
+            now = pd.to_datetime(df['Timestamp'], errors='coerce').min() if 'Timestamp' in df.columns else None
+            kickoff = schema.kickoff_times(df, None if pd.isna(now) else now)
+            located = (df['lat'].notna() & df['lon'].notna() & kickoff.notna()).to_numpy()
+            lat, lon = df['lat'].to_numpy(dtype=float)[located], df['lon'].to_numpy(dtype=float)[located]
+            _, _, jobs = forecast_cells(lat, lon, kickoff.to_numpy()[located], args.cell, args.window)
+            print(f"{path}: {dedup_report(lat, lon, jobs)}")
+    elif args.command == 'stub':
+        server, url = serve_stub(args.port, args.latency, args.fail_rate)
+        logger.info("serving forecasts at %s", url)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+    elif args.command == 'bench':
+        _bench(args)
+    else:
+        fetcher = ForecastFetcher(args.url, args.concurrency, args.retries, args.ttl,
+                                  cell_degrees=args.cell, window_hours=args.window)
+        while True:
+            start = time.perf_counter()
+            df = fetcher.snapshot(pd.read_csv(args.schedule))
+            write_snapshot(df, args.out)
+            logger.info("%d games -> %s in %.1fs %s %s", len(df), args.out, time.perf_counter() - start,
+                        fetcher.stats, fetcher.last_dedup)
+            if args.every is None:
+                break
+            time.sleep(args.every)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""Plotly map figures for the classified slates.
+
+plotly is imported inside each builder, so importing this module (or the rest
+of the package) stays cheap for batch jobs that never render.
+
+Above ``DENSE_THRESHOLD`` games (a season or the backtest history), the
+maps switch to ``density_figure``: games are binned into map cells sized for
+the current zoom and each cell is drawn as one marker, so the payload stays
+under ``MAX_MARKERS`` points however many games there are.
+
+``cached_figure`` keeps built figures in a process-wide LRU keyed by the slate
+key (see ``pipeline.*_slate_key``) and the map parameters, so reruns that only
+change the sidebar reuse the figure instead of rebuilding it.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from football_weather import metrics
+
+US_CENTER = {"lat": 37.0902, "lon": -95.7129}
+US_ZOOM = 3.5
+MAP_HEIGHT = 1000
+
+NFL_LEGEND = {
+    'blue': 'Low Impact',
+    'orange': 'Mid Impact',
+    'purple': 'High Impact',
+    'green': 'No Impact',
+}
+
+CFB_LEGEND = {
+    'blue': 'Low Impact (Wind)',
+    'orange': 'Mid Impact',
+    'purple': 'High Impact',
+    'darkred': 'Very High Impact',
+    'green': 'No Impact',
+    'black': 'Low Impact (Rain)',
+    'red': 'Low Impact (Temp)',
+}
+
+# Slates larger than this are drawn with density_figure
+DENSE_THRESHOLD = 5000
+MAX_MARKERS = 4000
+# Width of a map cell in screen pixels at any zoom (a map tile is 256 px wide)
+CELL_PIXELS = 32
+
+# Figures kept by cached_figure (FW_FIGURE_CACHE=0 to disable)
+FIGURE_CACHE_SIZE = int(os.environ.get('FW_FIGURE_CACHE', '16'))
+
+_figures = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+_lock = threading.Lock()
+
+
+def _rename_legend(fig, legend):
+    # Traces are named after their dot color; show the impact instead
+    fig.for_each_trace(lambda t: t.update(name=legend.get(t.name, t.name)))
+
+
+def _layout(fig, legend_title):
+    fig.update_layout(
+        mapbox_style="open-street-map",
+        mapbox_center=US_CENTER,
+        mapbox_zoom=US_ZOOM,
+        legend_title_text=legend_title,
+    )
+
+
+def nfl_figure(df):
+    import plotly.express as px
+
+    fig = px.scatter_mapbox(
+        df,
+        lat="lat",
+        lon="lon",
+        hover_name="Game",
+        hover_data={
+            "wind_fg": True,
+            "temp_fg": True,
+            "rain_fg": True,
+            "gs_fg": True,
+            "Total_open": True,
+            "Total_now": True,
+            "game_loc": True,
+            "wind_vol": True,
+            "Spread_open": True,
+            "Spread_now": True
+        },
+        size="dot_size",
+        color="dot_color",
+        color_discrete_map={color: color for color in NFL_LEGEND},
+        zoom=6,
+        height=MAP_HEIGHT,
+    )
+    _layout(fig, 'Weather Conditions')
+    _rename_legend(fig, NFL_LEGEND)
+    fig.update_traces(marker=dict(sizemode='diameter', sizemin=1, sizeref=1))
+
+    # Apply opacity based on the wind impact level for purple dots (Wind)
+    fig.update_traces(
+        selector=dict(marker_color='purple'),
+        marker_opacity=df['dot_opacity']
+    )
+
+    fig.update_traces(
+        hovertemplate="<b>%{hovertext}</b><br>" +
+        "Wind: %{customdata[0]}<br>" +
+        "Temp: %{customdata[1]}<br>" +
+        "Rain: %{customdata[2]}<br>" +
+        "Weather Impact: %{customdata[3]}%<br>" +
+        "Total (Open): %{customdata[4]}<br>" +
+        "Total (Now): %{customdata[5]}<br>" +
+        "Game Location: %{customdata[6]}<br>" +
+        "Wind Volatility: %{customdata[7]}<br>" +
+        "Spread (Open): %{customdata[8]}<br>" +
+        "Spread (Now): %{customdata[9]}<extra></extra>"
+    )
+    return fig
+
+
+def cfb_figure(df):
+    import plotly.express as px
+
+    fig = px.scatter_mapbox(
+        df,
+        lat="lat",
+        lon="lon",
+        hover_name="Game",
+        hover_data={
+            "wind_fg": True,
+            "temp_fg": True,
+            "rain_fg": True,
+            "Fd_open": True,
+            "FD_now": True,
+            "game_loc": True,
+            "Date": True,
+            "Time": True,
+            "wind_diff": True,
+            "wind_vol": True,
+            "Open": True,
+            "Current": True,
+            "Record": True,
+            "Percentage": True
+        },
+        size="dot_size",
+        color="dot_color",
+        color_discrete_map={color: color for color in CFB_LEGEND},
+        zoom=6,
+        height=MAP_HEIGHT,
+    )
+    _layout(fig, 'Weather Conditions')
+    _rename_legend(fig, CFB_LEGEND)
+    fig.update_traces(marker=dict(sizemode='diameter', sizemin=1, sizeref=1))
+
+    fig.update_traces(
+        hovertemplate="<b>%{hovertext}</b><br>" +
+        "Wind: %{customdata[0]} MPH<br>" +
+        "Temp: %{customdata[1]}°F<br>" +
+        "Rain: %{customdata[2]} in.<br>" +
+        "Open: %{customdata[3]}<br>" +
+        "Current: %{customdata[4]}<br>" +
+        "Game Location: %{customdata[5]}<br>" +
+        "Game Date: %{customdata[6]}<br>" +
+        "Game Time: %{customdata[7]}<br>" +
+        "Wind Diff: %{customdata[8]}<br>" +
+        "Wind Volatility: %{customdata[9]}<br>" +
+        "Open Spread: %{customdata[10]}<br>" +
+        "Current Spread: %{customdata[11]}<br>" +
+        "Record: %{customdata[12]}<br>" +
+        "ROI: %{customdata[13]}<extra></extra>"
+    )
+    return fig
+
+
+def combined_figure(df):
+    import plotly.express as px
+
+    from football_weather.signals import color_map
+
+    fig = px.scatter_mapbox(
+        df,
+        lat="lat",
+        lon="lon",
+        hover_name="Game",
+        hover_data={
+            "signals": True,
+            "league": True,
+            "Time": True,
+            "Date": True,
+            "wind_fg": True,
+            "temp_fg": True,
+            "Open": True,
+            "Current": True,
+            "Fd_open": True,
+            "FD_now": True,
+            "wind_impact": True,
+            "game_loc": True
+        },
+        size="dot_size",
+        color="signal_type",
+        color_discrete_map=color_map(),
+        zoom=6,
+        height=MAP_HEIGHT,
+    )
+    _layout(fig, 'Signal Types')
+
+    fig.update_traces(
+        hovertemplate="<b>%{hovertext}</b><br>" +
+        "Signal: %{customdata[0]}<br>" +
+        "League: %{customdata[1]}<br>" +
+        "Game Time: %{customdata[2]}<br>" +
+        "Game Date: %{customdata[3]}<br>" +
+        "Full Game Wind: %{customdata[4]} mph<br>" +
+        "Full Game Temperature: %{customdata[5]:.1f}°F<br>" +
+        "Open Spread: %{customdata[6]}<br>" +
+        "Current Spread: %{customdata[7]}<br>" +
+        "Open Total: %{customdata[8]}<br>" +
+        "Current Total: %{customdata[9]}<br>" +
+        "Wind Impact: %{customdata[10]}<br>" +
+        "Location: %{customdata[11]}<extra></extra>"
+    )
+
+    # Apply opacity based on wind impact
+    fig.update_traces(marker_opacity=df['dot_opacity'])
+    return fig
+
+
+# Column the dots are colored by, color -> legend label (None: the value is
+# the label) and legend title, per map kind
+_DENSE_STYLES = {
+    'nfl': ('dot_color', NFL_LEGEND, 'Weather Conditions'),
+    'cfb': ('dot_color', CFB_LEGEND, 'Weather Conditions'),
+    'combined': ('signal_type', None, 'Signal Types'),
+}
+
+
+def cell_size(zoom):
+    """Width in degrees of the aggregation cell at a mapbox zoom level."""
+    return 360 / 2 ** zoom * CELL_PIXELS / 256
+
+
+def aggregate(df, color, zoom=US_ZOOM, max_markers=MAX_MARKERS):
+    """Arrays with one entry per (map cell, color): mean position, game count and stats.
+
+    Cells start at ``cell_size(zoom)`` and double until at most ``max_markers``
+    rows remain.
+    """
+    df = df.dropna(subset=['lat', 'lon'])
+    lat = df['lat'].to_numpy(dtype=float)
+    lon = df['lon'].to_numpy(dtype=float)
+    colors, color_codes = np.unique(df[color].astype(str).to_numpy(), return_inverse=True)
+    size = cell_size(zoom)
+    while True:
+        # One integer per (row, column, color) so a flat unique does the grouping
+        rows = np.floor(lat / size).astype(np.int64)
+        cols = np.floor(lon / size).astype(np.int64)
+        rows -= rows.min(initial=0)
+        cols -= cols.min(initial=0)
+        keys = (rows * (cols.max(initial=0) + 1) + cols) * len(colors) + color_codes
+        cells, first, cell_of = np.unique(keys, return_index=True, return_inverse=True)
+        if len(cells) <= max_markers or len(cells) <= len(colors):
+            break
+        size *= 2
+
+    cell_of = cell_of.ravel()
+    count = np.bincount(cell_of)
+
+    def mean(values):
+        values = np.asarray(values, dtype=float)
+        seen = ~np.isnan(values)
+        total = np.bincount(cell_of, weights=np.where(seen, values, 0))
+        with np.errstate(invalid='ignore'):
+            return total / np.bincount(cell_of, weights=seen)
+
+    dot_size = np.full(len(count), -np.inf)
+    np.maximum.at(dot_size, cell_of, df['dot_size'].to_numpy(dtype=float))
+
+    return {
+        'lat': mean(lat).round(4),
+        'lon': mean(lon).round(4),
+        'color': colors[color_codes[first]],
+        'count': count,
+        'dot_size': dot_size,
+        'game': df['Game'].to_numpy(dtype=object)[first],
+        'wind': mean(_numeric(df, 'wind_fg')).round(1),
+        'temp': mean(_numeric(df, 'temp_fg')).round(1),
+    }
+
+
+def _numeric(df, name):
+    from football_weather.classify import numeric_column
+
+    # Columns missing from a slate average to NaN
+    return numeric_column(df, name) if name in df.columns else np.full(len(df), np.nan)
+
+
+def density_figure(df, style, zoom=US_ZOOM, max_markers=MAX_MARKERS):
+    """Aggregated map of a large slate: one WebGL trace per color, one marker per cell.
+
+    ``style`` is the map kind whose colors and legend to use ('nfl', 'cfb' or
+    'combined').
+    """
+    import plotly.graph_objects as go
+
+    from football_weather.signals import color_map
+
+    color, legend, legend_title = _DENSE_STYLES[style]
+    cells = aggregate(df, color, zoom, max_markers)
+    marker_colors = color_map() if legend is None else {c: c for c in legend}
+
+    fig = go.Figure()
+    for value in np.unique(cells['color']):
+        at = cells['color'] == value
+        count = cells['count'][at]
+        # Single games keep their dot size; clusters grow with the log of their size
+        size = np.where(count > 1, 8 + 4 * np.log2(count), cells['dot_size'][at])
+        label = np.where(count > 1, [f"{n} games" for n in count], cells['game'][at])
+        fig.add_trace(go.Scattermapbox(
+            lat=cells['lat'][at],
+            lon=cells['lon'][at],
+            mode='markers',
+            name=value if legend is None else legend.get(value, value),
+            marker=dict(size=size.round(1), color=marker_colors.get(value, value), opacity=0.8, sizemode='diameter'),
+            hovertext=label,
+            customdata=np.stack([cells['wind'][at], cells['temp'][at]], axis=1),
+            hovertemplate="<b>%{hovertext}</b><br>" +
+            "Avg Wind: %{customdata[0]}<br>" +
+            "Avg Temp: %{customdata[1]}<extra></extra>",
+        ))
+    fig.update_layout(height=MAP_HEIGHT)
+    _layout(fig, legend_title)
+    fig.update_layout(mapbox_zoom=zoom)
+    return fig
+
+
+def map_figure(kind, slate_key, df, zoom=US_ZOOM):
+    """The cached page map: the full figure, or density_figure above DENSE_THRESHOLD games."""
+    if len(df) > DENSE_THRESHOLD:
+        return cached_figure('density', slate_key, df, style=kind, zoom=zoom)
+    return cached_figure(kind, slate_key, df)
+
+
+_BUILDERS = {
+    'nfl': nfl_figure,
+    'cfb': cfb_figure,
+    'combined': combined_figure,
+    'density': density_figure,
+}
+
+
+def cached_figure(kind, slate_key, df, **params):
+    """The ``kind`` map of ``df``, built once per (slate_key, params).
+
+    ``slate_key`` must identify ``df``'s contents; ``params`` are passed on to
+    the builder. The same figure object is handed to every caller, so treat it
+    as read-only.
+    """
+    key = (kind, slate_key, tuple(sorted(params.items())))
+    with _lock:
+        fig = _figures.get(key)
+        if fig is not None:
+            _figures.move_to_end(key)
+            _stats['hits'] += 1
+            return fig
+
+    with metrics.stage(f"figure.{kind}", len(df)):
+        fig = _BUILDERS[kind](df, **params)
+    with _lock:
+        _stats['misses'] += 1
+        if FIGURE_CACHE_SIZE > 0:
+            _figures[key] = fig
+            while len(_figures) > FIGURE_CACHE_SIZE:
+                _figures.popitem(last=False)
+                _stats['evictions'] += 1
+    return fig
+
+
+def figure_cache_stats():
+    with _lock:
+        return dict(_stats, entries=len(_figures))
+
+
+def clear_figure_cache():
+    with _lock:
+        _figures.clear()
+        for key in _stats:
+            _stats[key] = 0
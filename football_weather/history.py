@@ -0,0 +1,391 @@
+"""Append-only history of every snapshot, indexed by (game, timestamp).
+
+Each new ``nfl_weather.csv`` / ``cfb_weather.xlsx`` overwrites the last, so
+this keeps what they said over time: line movement, forecast drift.
+
+    python -m football_weather.history watch --interval 60
+    python -m football_weather.history ingest --store history/cfb archive/cfb_*.xlsx
+    python -m football_weather.history show --store history/cfb "Army @ Navy"
+
+A store is a directory of immutable feather segments (``seg-00000001.arrow``),
+one per ingest, holding only the rows that changed. A row is stored when its
+content hash (every column except Timestamp) differs from the same game's
+previous entry, so an unchanged game costs nothing per snapshot. Every row
+carries ``as_of`` (its snapshot's Timestamp, see replay.read_archive),
+``snapshot`` and ``row_hash``.
+
+The key columns of all segments are loaded into arrays sorted by (game,
+as_of) when the store opens. A game's rows are one contiguous block found by
+binary search, so a time-series lookup is O(log n) plus the rows returned.
+Each ingest adds its new keys as another sorted run instead of inserting
+into the existing arrays; runs of similar size are merged, so there are
+O(log n) of them and a key is re-sorted O(log n) times over its life.
+Lookups search every run. ``compact`` merges the segments into one when the
+count grows.
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from football_weather import loaders, pipeline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = 'history'
+# Snapshot file -> store under the history root, for the watcher
+WATCHED = {
+    pipeline.NFL_SNAPSHOT: 'nfl',
+    pipeline.CFB_SNAPSHOT: 'cfb',
+}
+KEY_COLUMNS = ['Game', 'as_of', 'row_hash']
+# Columns that change every snapshot without the game changing, and kickoff
+# (parsed from Date and Time, which are hashed, and only present when compacted)
+_UNHASHED = ['Timestamp', 'as_of', 'snapshot', 'kickoff']
+_SEGMENT = re.compile(r'seg-(\d+)\.arrow$')
+# A run is merged into the one before it while that one is at most this many times larger
+MERGE_RATIO = 2
+
+# Key arrays of some segments, sorted by (game, as_of, segment)
+_Run = namedtuple('_Run', ['game', 'ts', 'hash', 'seg', 'row'])
+
+
+def _hash_values(values):
+    """``values`` in a dtype that does not depend on the rest of the frame.
+
+    Compaction picks float32, narrow integers and categoricals per frame, so
+    one game's new value can change the dtype of a whole column; hashing the
+    compacted values would then report every game of the snapshot as changed.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(values.cat.categories.dtype)
+    if values.dtype.kind in 'biuf':
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if values.dtype.kind == 'M':
+        return values
+    return values.astype(object).where(values.notna(), None)
+
+
+def _sorted_run(game, ts, hashes, seg, row):
+    order = np.lexsort((seg, ts, game))
+    return _Run(game[order], ts[order], hashes[order], seg[order], row[order])
+
+
+def _upper_bound(values, lo, hi, targets):
+    """Per query, the first position in ``values[lo:hi]`` (sorted) past ``targets``; vectorized bisection."""
+    lo, hi = lo.copy(), hi.copy()
+    while True:
+        active = lo < hi
+        if not active.any():
+            return lo
+        mid = (lo + hi) // 2
+        after = values[np.where(active, mid, 0)] <= targets
+        lo = np.where(active & after, mid + 1, lo)
+        hi = np.where(active & ~after, mid, hi)
+
+
+def row_hashes(df):
+    """64-bit content hash of each row, ignoring the snapshot time columns."""
+    columns = sorted(c for c in df.columns if c not in _UNHASHED)
+    normalized = pd.DataFrame({name: _hash_values(df[name]) for name in columns}, index=df.index)
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy(dtype=np.uint64)
+
+
+class HistoryStore:
+    """One league's snapshot history under ``root``."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._codes = {}
+        self._names = []
+        self._load_index()
+
+    # -- index -------------------------------------------------------------
+
+    def _segments(self):
+        found = (_SEGMENT.search(name) for name in os.listdir(self.root))
+        return sorted(int(match.group(1)) for match in found if match)
+
+    def _segment_path(self, segment):
+        return os.path.join(self.root, f"seg-{segment:08d}.arrow")
+
+    def _code(self, game):
+        code = self._codes.get(game)
+        if code is None:
+            code = self._codes[game] = len(self._names)
+            self._names.append(game)
+        return code
+
+    def _encode(self, games):
+        """Integer code of every game name, assigning new codes to new games."""
+        local, uniques = pd.factorize(pd.Series(games), use_na_sentinel=False)
+        return np.array([self._code(game) for game in uniques], dtype=np.int64)[local]
+
+    def _load_index(self):
+        from pyarrow import feather
+
+        games, stamps, hashes, segments, rows = [], [], [], [], []
+        for segment in self._segments():
+            keys = feather.read_table(self._segment_path(segment), columns=KEY_COLUMNS).to_pandas()
+            games.append(self._encode(keys['Game']))
+            stamps.append(keys['as_of'].to_numpy(dtype='datetime64[ns]').view(np.int64))
+            hashes.append(keys['row_hash'].to_numpy(dtype=np.uint64))
+            segments.append(np.full(len(keys), segment, dtype=np.int64))
+            rows.append(np.arange(len(keys), dtype=np.int64))
+
+        def stack(parts, dtype):
+            return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+        self._runs = [_sorted_run(
+            stack(games, np.int64), stack(stamps, np.int64), stack(hashes, np.uint64),
+            stack(segments, np.int64), stack(rows, np.int64),
+        )]
+        self._next_segment = max(self._segments(), default=0) + 1
+
+    def _add_run(self, run):
+        """Add a sorted run, merging it with the runs before it while they are of similar size."""
+        self._runs.append(run)
+        while len(self._runs) > 1 and len(self._runs[-2].game) <= MERGE_RATIO * len(self._runs[-1].game):
+            last, before = self._runs.pop(), self._runs.pop()
+            self._runs.append(_sorted_run(*(np.concatenate(parts) for parts in zip(before, last))))
+
+    def _previous_hashes(self, codes, stamps):
+        """Hash and stamp of each game's newest stored row at or before its stamp, and whether there is one."""
+        found = np.zeros(len(codes), dtype=bool)
+        best_ts = np.zeros(len(codes), dtype=np.int64)
+        best_seg = np.zeros(len(codes), dtype=np.int64)
+        hashes = np.zeros(len(codes), dtype=np.uint64)
+        for run in self._runs:
+            if not len(run.game):
+                continue
+            lo = np.searchsorted(run.game, codes, side='left')
+            hi = np.searchsorted(run.game, codes, side='right')
+            at = _upper_bound(run.ts, lo, hi, stamps) - 1
+            has = at >= lo
+            at = np.where(has, at, 0)
+            ts, seg = run.ts[at], run.seg[at]
+            # Newer than the earlier runs' match; ties go to the later segment, as in one sorted index
+            newer = has & (~found | (ts > best_ts) | ((ts == best_ts) & (seg > best_seg)))
+            best_ts = np.where(newer, ts, best_ts)
+            best_seg = np.where(newer, seg, best_seg)
+            hashes = np.where(newer, run.hash[at], hashes)
+            found |= newer
+        return hashes, best_ts, found
+
+    def __len__(self):
+        return sum(len(run.game) for run in self._runs)
+
+    def games(self):
+        """Every game with history, in first-seen order."""
+        return list(self._names)
+
+    # -- ingest ------------------------------------------------------------
+
+    def ingest_frame(self, df, snapshot=None):
+        """Append the rows of ``df`` (with ``Game`` and ``as_of``) that changed; returns how many."""
+        if not len(df):
+            return 0
+        df = df.reset_index(drop=True)
+        if snapshot is not None:
+            df = df.assign(snapshot=snapshot)
+        hashes = row_hashes(df)
+        stamps = pd.to_datetime(df['as_of']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+        with self._lock:
+            codes = self._encode(df['Game'])
+            order = np.lexsort((stamps, codes))
+            code, ts, digest = codes[order], stamps[order], hashes[order]
+            # A row is unchanged when it hashes like the game's newest entry at or
+            # before it: the stored one, or the row before it in this batch if that
+            # is as new (a skipped row hashes like the entry it matched)
+            last, last_ts, found = self._previous_hashes(code, ts)
+            batch = np.zeros(len(code), dtype=bool)
+            batch[1:] = (code[1:] == code[:-1]) & (~found[1:] | (ts[:-1] >= last_ts[1:]))
+            last[1:] = np.where(batch[1:], digest[:-1], last[1:])
+            keep = np.zeros(len(df), dtype=bool)
+            keep[order] = (digest != last) | ~(found | batch)
+            if not keep.any():
+                return 0
+
+            segment = self._next_segment
+            self._next_segment += 1
+            kept = np.flatnonzero(keep)
+            rows = df.loc[keep].assign(row_hash=hashes[keep])
+            self._write_segment(rows, segment)
+            self._add_run(_sorted_run(
+                codes[kept], stamps[kept], hashes[kept], np.full(len(kept), segment, dtype=np.int64),
+                np.arange(len(kept), dtype=np.int64),
+            ))
+        return len(kept)
+
+    def _write_segment(self, df, segment):
+        import pyarrow as pa
+        from pyarrow import feather
+
+        target = self._segment_path(segment)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        # Plain labels: per-segment dictionaries would not concatenate across segments
+        df = df.assign(**{
+            name: df[name].astype(df[name].cat.categories.dtype)
+            for name in df.columns if isinstance(df[name].dtype, pd.CategoricalDtype)
+        })
+        try:
+            feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp, compression='zstd')
+            os.replace(tmp, target)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def ingest(self, path):
+        """Ingest one snapshot file; returns the number of rows stored."""
+        from football_weather.replay import read_archive
+
+        return self.ingest_frame(read_archive([path]))
+
+    # -- lookups -----------------------------------------------------------
+
+    def _table(self, segment):
+        table = self._tables.get(segment)
+        if table is None:
+            from pyarrow import feather
+
+            table = self._tables[segment] = feather.read_table(self._segment_path(segment), memory_map=True)
+        return table
+
+    def series(self, game, start=None, end=None):
+        """Every stored row of ``game`` with ``start <= as_of <= end``, oldest first."""
+        with self._lock:
+            code = self._codes.get(game)
+            if code is None:
+                return pd.DataFrame()
+            found = []
+            for run in self._runs:
+                lo = np.searchsorted(run.game, code, side='left')
+                hi = np.searchsorted(run.game, code, side='right')
+                if start is not None:
+                    lo += np.searchsorted(run.ts[lo:hi], pd.Timestamp(start).value, side='left')
+                if end is not None:
+                    hi = lo + np.searchsorted(run.ts[lo:hi], pd.Timestamp(end).value, side='right')
+                found.append((run.seg[lo:hi], run.row[lo:hi]))
+            # A segment lies within one run, so its rows stay in as_of order
+            segments = np.concatenate([segs for segs, _ in found])
+            rows = np.concatenate([rows for _, rows in found])
+
+        frames = [
+            self._table(segment).take(rows[segments == segment]).to_pandas()
+            for segment in np.unique(segments)
+        ]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True).sort_values('as_of', kind='stable', ignore_index=True)
+
+    def latest(self, game, as_of=None):
+        """The row of ``game`` current at ``as_of`` (default: the newest), or None."""
+        rows = self.series(game, end=as_of)
+        return None if rows.empty else rows.iloc[-1]
+
+    # -- maintenance -------------------------------------------------------
+
+    def compact(self):
+        """Rewrite all segments as one, sorted by (game, as_of)."""
+        with self._lock:
+            old = self._segments()
+            if len(old) < 2:
+                return
+            import pyarrow as pa
+
+            tables = [self._table(segment) for segment in old]
+            merged = pa.concat_tables(tables, promote_options='permissive').to_pandas()
+            merged = merged.sort_values(['Game', 'as_of'], kind='stable', ignore_index=True)
+            segment = self._next_segment
+            self._write_segment(merged, segment)
+            self._tables.clear()
+            for stale in old:
+                os.remove(self._segment_path(stale))
+        self._codes, self._names = {}, []
+        self._load_index()
+
+
+def watch(directory='.', root=DEFAULT_ROOT, interval=60, snapshots=None, once=False):
+    """Poll the snapshot files in ``directory`` and ingest each new version.
+
+    ``snapshots`` maps file names to store names under ``root`` (default:
+    WATCHED). With ``once`` the files are checked a single time.
+    """
+    snapshots = snapshots or WATCHED
+    stores = {name: HistoryStore(os.path.join(root, store)) for name, store in snapshots.items()}
+    seen = {}
+    while True:
+        for name, store in stores.items():
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                continue
+            try:
+                digest = loaders.snapshot_id(path)
+            except OSError:
+                # Replaced mid-check; pick it up next round
+                continue
+            if seen.get(path) == digest:
+                continue
+            seen[path] = digest
+            added = store.ingest(path)
+            logger.info("%s: %d changed rows (%d stored)", name, added, len(store))
+        if once:
+            return
+        time.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m football_weather.history', description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    watch_cmd = commands.add_parser('watch', help="ingest new versions of the live snapshots as they land")
+    watch_cmd.add_argument('--dir', default='.', help="directory the snapshots are written to")
+    watch_cmd.add_argument('--root', default=DEFAULT_ROOT, help="history root (one store per league)")
+    watch_cmd.add_argument('--interval', type=float, default=60, help="seconds between checks")
+    watch_cmd.add_argument('--once', action='store_true', help="check once and exit")
+
+    ingest_cmd = commands.add_parser('ingest', help="ingest snapshot files into one store")
+    ingest_cmd.add_argument('--store', required=True)
+    ingest_cmd.add_argument('snapshots', nargs='+')
+
+    show_cmd = commands.add_parser('show', help="print one game's history")
+    show_cmd.add_argument('--store', required=True)
+    show_cmd.add_argument('game')
+    show_cmd.add_argument('--columns', nargs='*', default=None)
+
+    compact_cmd = commands.add_parser('compact', help="merge a store's segments into one")
+    compact_cmd.add_argument('--store', required=True)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    if args.command == 'watch':
+        watch(args.dir, args.root, args.interval, once=args.once)
+    elif args.command == 'ingest':
+        store = HistoryStore(args.store)
+        for path in args.snapshots:
+            logger.info("%s: %d changed rows", path, store.ingest(path))
+        logger.info("%s: %d rows, %d games", args.store, len(store), len(store.games()))
+    elif args.command == 'show':
+        rows = HistoryStore(args.store).series(args.game)
+        if args.columns:
+            rows = rows[['as_of'] + args.columns]
+        print(rows.to_string() if len(rows) else f"no history for {args.game}")
+    else:
+        HistoryStore(args.store).compact()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from football_weather import metrics, schema, sidecar
+
+logger = logging.getLogger(__name__)
+
+# Parsed frames keyed by (path, reader, reader kwargs). Each entry keeps the
+# content hash of the snapshot it was parsed from, so a new snapshot landing on
+# disk invalidates it automatically.
+_cache = {}
+# path -> ((mtime_ns, size), content hash), so unchanged files are not re-hashed
+_digests = {}
+_stats = {'hits': 0, 'misses': 0, 'sidecar_reads': 0}
+_lock = threading.Lock()
+
+# Read/write arrow sidecars next to the snapshots (FW_SIDECARS=0 to disable)
+USE_SIDECARS = os.environ.get('FW_SIDECARS', '1') != '0'
+# Cache frames with compact dtypes, see schema.py (FW_COMPACT=0 to disable)
+USE_COMPACT = os.environ.get('FW_COMPACT', '1') != '0'
+# (path, sheet) -> (bytes as parsed, bytes cached) of the last parse
+_memory = {}
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def snapshot_hash(path, chunk_size=1 << 20):
+    """Return the sha1 hex digest of a snapshot file's contents."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_id(path):
+    """Content hash of a snapshot, only re-hashed when its mtime or size changes."""
+    path = os.path.abspath(path)
+    signature = _file_signature(path)
+    with _lock:
+        memo = _digests.get(path)
+    if memo is not None and memo[0] == signature:
+        return memo[1]
+    digest = snapshot_hash(path)
+    with _lock:
+        _digests[path] = (signature, digest)
+    return digest
+
+
+def _load(path, reader, compact=None, **kwargs):
+    path = os.path.abspath(path)
+    digest = snapshot_id(path)
+    compact = USE_COMPACT if compact is None else compact
+    key = (path, reader.__name__, compact, tuple(sorted(kwargs.items())))
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == digest:
+            _stats['hits'] += 1
+            df = entry[1]
+        else:
+            df = None
+
+    if df is None:
+        df = _parse(path, digest, reader, kwargs)
+        if compact:
+            before = schema.memory(df)
+            with metrics.stage('compact', len(df)):
+                df = schema.compact(df)
+            with _lock:
+                _memory[(path, kwargs.get('sheet_name'))] = (before, schema.memory(df))
+        with _lock:
+            _cache[key] = (digest, df)
+            _stats['misses'] += 1
+
+    # Pages add and overwrite columns, so never hand out the cached frame itself
+    return df.copy()
+
+
+def _parse(path, digest, reader, kwargs):
+    # Sidecars only cover whole sheets, not reads with usecols/dtype/etc.
+    use_sidecar = USE_SIDECARS and set(kwargs) <= {'sheet_name'}
+    sheet_name = kwargs.get('sheet_name')
+    start = time.perf_counter()
+
+    if use_sidecar:
+        with metrics.stage('sidecar.read') as timed:
+            df = sidecar.read_sidecar(path, digest, sheet_name)
+            timed.count(0 if df is None else len(df))
+        if df is not None:
+            logger.debug("read sidecar for %s %s in %.3fs", path, kwargs or '', time.perf_counter() - start)
+            with _lock:
+                _stats['sidecar_reads'] += 1
+            return df
+
+    with metrics.stage(f"parse.{os.path.splitext(path)[1].lstrip('.').lower()}") as timed:
+        df = parse_source(path, reader, **kwargs)
+        timed.count(len(df))
+    logger.debug("parsed %s %s in %.3fs", path, kwargs or '', time.perf_counter() - start)
+    if use_sidecar:
+        sidecar.write_sidecar(df, path, digest, sheet_name)
+    return df
+
+
+def _read_xlsx(path, **kwargs):
+    return pd.read_excel(path, engine='openpyxl', **kwargs)
+
+
+_READERS = {'.xlsx': _read_xlsx, '.csv': pd.read_csv}
+
+
+def parse_source(path, reader=None, **kwargs):
+    """Parse a snapshot from its xlsx/csv, bypassing the cache and sidecars.
+
+    ``lat``/``lon`` are split out of ``game_loc`` when present.
+    """
+    if reader is None:
+        reader = _READERS[os.path.splitext(path)[1].lower()]
+    return sidecar.split_game_loc(reader(path, **kwargs))
+
+
+def read_excel(path, compact=None, **kwargs):
+    """Cached ``pd.read_excel`` (openpyxl engine) for a snapshot workbook.
+
+    Whole-sheet reads come from the sheet's arrow sidecar when it is current.
+    ``compact`` overrides FW_COMPACT for this read.
+    """
+    return _load(path, _read_xlsx, compact, **kwargs)
+
+
+def read_csv(path, compact=None, **kwargs):
+    """Cached ``pd.read_csv`` for a snapshot csv, via its arrow sidecar when current."""
+    return _load(path, pd.read_csv, compact, **kwargs)
+
+
+def cache_stats():
+    """Hit/miss counters for the parse cache."""
+    with _lock:
+        hits, misses = _stats['hits'], _stats['misses']
+        sidecar_reads = _stats['sidecar_reads']
+        entries = len(_cache)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'sidecar_reads': sidecar_reads,
+        'entries': entries,
+        'hit_rate': hits / total if total else 0.0,
+    }
+
+
+def memory_stats():
+    """(path, sheet, bytes as parsed, bytes cached) of every compacted frame."""
+    with _lock:
+        return [(path, sheet, before, after) for (path, sheet), (before, after) in _memory.items()]
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _digests.clear()
+        _memory.clear()
+        for name in _stats:
+            _stats[name] = 0
@@ -0,0 +1,245 @@
+"""Per-stage timings, row counts and cache hit rates.
+
+Set ``FW_METRICS=1`` to record them. Every pipeline stage (parse, stadium
+merge, backtest lookup, classifiers, figure build, page steps, ...) then
+logs one JSON line per run:
+
+    {"event": "stage", "stage": "parse.xlsx", "ms": 812.4, "rows": 131}
+
+The stage timings are also kept in memory for the latest WINDOW runs of each
+stage. Every FLUSH_SECONDS they are written as a Prometheus text file
+(FW_METRICS_FILE, default ``metrics.prom``), so node_exporter's textfile
+collector can pick them up. The diagnostics view (``/?diagnostics=1``)
+shows percentiles of the same data. When metrics are off, ``stage`` hands
+back a shared no-op object, so an instrumented call only checks a flag.
+
+    python -m football_weather.metrics show metrics.prom
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('FW_METRICS', '0') == '1'
+METRICS_FILE = os.environ.get('FW_METRICS_FILE', 'metrics.prom')
+# Recent runs kept per stage for the percentiles
+WINDOW = 1000
+FLUSH_SECONDS = 10.0
+QUANTILES = [0.5, 0.9, 0.99]
+
+_lock = threading.Lock()
+# stage -> deque of (seconds, rows) of its latest runs
+_samples = {}
+# stage -> [runs, total seconds, total rows]
+_totals = {}
+_last_flush = 0.0
+_QUANTILE_LINE = re.compile(r'^fw_stage_seconds\{stage="(.*?)",quantile="([\d.]+)"\} (\S+)$', re.M)
+
+if ENABLED and not logger.handlers:
+    # One JSON object per line on stderr, whatever logging the app sets up
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class _Stage:
+    __slots__ = ('name', 'rows', 'start')
+
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+
+    def count(self, rows):
+        """Set the number of rows the stage handled."""
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start, self.rows)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def count(self, rows):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullStage()
+
+
+def stage(name, rows=None):
+    """Context manager timing one run of ``name``; ``.count(rows)`` sets its row count."""
+    if not ENABLED:
+        return _NULL
+    return _Stage(name, rows)
+
+
+def record(name, seconds, rows=None):
+    """Record one run of ``name`` that took ``seconds`` and handled ``rows``."""
+    if not ENABLED:
+        return
+    rows = None if rows is None else int(rows)
+    with _lock:
+        samples = _samples.get(name)
+        if samples is None:
+            samples = _samples[name] = deque(maxlen=WINDOW)
+            _totals[name] = [0, 0.0, 0]
+        samples.append((seconds, rows))
+        totals = _totals[name]
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] += rows or 0
+    logger.info(json.dumps({
+        'ts': round(time.time(), 3), 'event': 'stage', 'stage': name, 'ms': round(seconds * 1000, 2), 'rows': rows,
+    }))
+
+
+def cache_rates():
+    """{cache: {'hits', 'misses', 'hit_rate'}} of the parse, figure and slate caches."""
+    from football_weather import artifacts, figures, loaders
+
+    rates = {}
+    for name, stats in [
+        ('parse', loaders.cache_stats()),
+        ('figure', figures.figure_cache_stats()),
+        ('slate', artifacts.load_stats()),
+    ]:
+        total = stats['hits'] + stats['misses']
+        rates[name] = {
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'hit_rate': stats['hits'] / total if total else 0.0,
+        }
+    return rates
+
+
+def summary():
+    """One row per stage: runs, total seconds, latest rows and percentiles (ms) of the recent runs."""
+    with _lock:
+        snapshot = {name: (list(samples), list(_totals[name])) for name, samples in _samples.items()}
+    rows = []
+    for name, (samples, (runs, seconds, _)) in sorted(snapshot.items()):
+        ms = np.array([s for s, _ in samples]) * 1000
+        p50, p90, p99 = np.percentile(ms, [q * 100 for q in QUANTILES])
+        rows.append({
+            'stage': name,
+            'runs': runs,
+            'total_s': seconds,
+            'rows': samples[-1][1],
+            'p50_ms': p50,
+            'p90_ms': p90,
+            'p99_ms': p99,
+            'max_ms': ms.max(),
+        })
+    return rows
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        snapshot = {name: (list(samples), list(_totals[name])) for name, samples in _samples.items()}
+    lines = [
+        '# HELP fw_stage_seconds Recent run time of a pipeline stage.',
+        '# TYPE fw_stage_seconds summary',
+    ]
+    for name, (samples, (runs, seconds, _)) in sorted(snapshot.items()):
+        values = np.array([s for s, _ in samples])
+        for q, value in zip(QUANTILES, np.quantile(values, QUANTILES)):
+            lines.append(f'fw_stage_seconds{{stage="{_label(name)}",quantile="{q}"}} {value:.6f}')
+        lines.append(f'fw_stage_seconds_sum{{stage="{_label(name)}"}} {seconds:.6f}')
+        lines.append(f'fw_stage_seconds_count{{stage="{_label(name)}"}} {runs}')
+    lines += ['# HELP fw_stage_rows_total Rows handled by a pipeline stage.', '# TYPE fw_stage_rows_total counter']
+    for name, (_, (_, _, rows)) in sorted(snapshot.items()):
+        lines.append(f'fw_stage_rows_total{{stage="{_label(name)}"}} {rows}')
+    rates = cache_rates()
+    for metric, field, kind in [('hits_total', 'hits', 'counter'), ('misses_total', 'misses', 'counter'),
+                                ('hit_ratio', 'hit_rate', 'gauge')]:
+        lines += [f'# TYPE fw_cache_{metric} {kind}']
+        for cache, stats in sorted(rates.items()):
+            lines.append(f'fw_cache_{metric}{{cache="{cache}"}} {stats[field]:g}')
+    return '\n'.join(lines) + '\n'
+
+
+def export(path=METRICS_FILE):
+    """Write prometheus_text() to ``path`` atomically."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+    return path
+
+
+def flush(path=METRICS_FILE, force=False):
+    """export() if metrics are on and FLUSH_SECONDS passed since the last one."""
+    global _last_flush
+    if not ENABLED:
+        return
+    now = time.monotonic()
+    with _lock:
+        if not force and now - _last_flush < FLUSH_SECONDS:
+            return
+        _last_flush = now
+    try:
+        export(path)
+    except OSError:
+        logger.exception("could not write %s", path)
+
+
+def reset():
+    global _last_flush
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+        _last_flush = 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m football_weather.metrics', description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    show_cmd = commands.add_parser('show', help="print the stage quantiles of a metrics file")
+    show_cmd.add_argument('path', nargs='?', default=METRICS_FILE)
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.path) as f:
+            text = f.read()
+    except OSError as e:
+        print(f"cannot read {args.path}: {e}")
+        return 1
+    quantiles = {}
+    for match in _QUANTILE_LINE.finditer(text):
+        name, q, value = match.groups()
+        quantiles.setdefault(name, {})[float(q)] = float(value) * 1000
+    print(f"{'stage':<36}" + ''.join(f"{f'p{q * 100:g} ms':>12}" for q in QUANTILES))
+    for name, values in sorted(quantiles.items()):
+        print(f"{name:<36}" + ''.join(f"{values.get(q, float('nan')):>12.1f}" for q in QUANTILES))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""Probability that each signal fires, given forecast uncertainty.
+
+    python -m football_weather.montecarlo nfl nfl_weather.csv --draws 10000
+    python -m football_weather.montecarlo cfb cfb_weather.xlsx --backtest cfb_weather_backtest.xlsx
+    python -m football_weather.montecarlo combined --nfl nfl_weather.csv --cfb cfb_weather.xlsx --workers 4
+
+The signals are hard thresholds on point forecasts. Here ``wind_fg``,
+``temp_fg`` and ``rain_fg`` are redrawn many times per game around the
+forecast, with a spread that depends on the stadium's ``wind_vol`` label and
+on the days left to kickoff (see ``VolatilityModel``). The unchanged signal
+rules (classify.nfl_conditions / cfb_conditions, signals.SIGNALS) are then
+run on every draw. The result is the share of draws on which each signal
+fires, per game.
+
+Draws are generated and evaluated as (draws, games) arrays, a chunk of draws
+at a time so memory stays bounded; the rules broadcast the per-game columns
+against them. ``workers`` splits the draws across a process pool, each
+worker with its own independent random stream.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from football_weather import clock, schema, signals
+from football_weather.classify import (
+    CFB_SIGNALS,
+    NFL_LEVELS,
+    cfb_conditions,
+    low_impact_wind_threshold,
+    nfl_conditions,
+    numeric_column,
+)
+
+logger = logging.getLogger(__name__)
+
+DRAWS = 10_000
+# Largest (draws x games) block evaluated at once
+CHUNK_CELLS = 1 << 20
+PERTURBED = ['wind_fg', 'temp_fg', 'rain_fg']
+# Every other column a rule reads; taken as forecast
+FIXED = ['Open', 'travel_alt', 'home_temp', 'away_temp']
+# Lead time assumed when a game's kickoff or snapshot time is unknown, and the cap
+DEFAULT_LEAD_DAYS = 3.0
+MAX_LEAD_DAYS = 10.0
+
+# One standard deviation of forecast error: ``*_sd`` at kickoff, growing by
+# ``*_per_day`` for every day of lead time. Wind (mph) is scaled by the
+# wind_vol label; rain is multiplicative (sd of its log).
+VolatilityModel = namedtuple(
+    'VolatilityModel', ['wind_sd', 'wind_per_day', 'wind_vol_scale', 'temp_sd', 'temp_per_day', 'rain_sd', 'rain_per_day']
+)
+DEFAULT_MODEL = VolatilityModel(
+    wind_sd=1.5,
+    wind_per_day=0.75,
+    wind_vol_scale={'low': 0.75, 'mid': 1.0, 'medium': 1.0, 'high': 1.5},
+    temp_sd=1.5,
+    temp_per_day=1.0,
+    rain_sd=0.3,
+    rain_per_day=0.15,
+)
+
+# Set in each pool worker by _init_worker
+_worker_args = None
+
+
+def lead_days(df, now=None):
+    """Days from each snapshot to its kickoff, in [0, MAX_LEAD_DAYS].
+
+    The snapshot time is ``Timestamp`` where present, else ``now`` (default:
+    clock.now()). Unknown kickoffs get DEFAULT_LEAD_DAYS.
+    """
+    fallback = pd.Timestamp(now if now is not None else clock.now())
+    if 'Timestamp' in df.columns:
+        taken = pd.to_datetime(df['Timestamp'].astype('string'), errors='coerce', format='ISO8601').fillna(fallback)
+    else:
+        taken = pd.Series(fallback, index=df.index)
+    kickoff = df['kickoff'] if 'kickoff' in df.columns else schema.kickoff_times(df, taken)
+    days = (pd.to_datetime(kickoff) - taken).dt.total_seconds().to_numpy(dtype=float, na_value=np.nan) / 86400
+    return np.clip(np.nan_to_num(days, nan=DEFAULT_LEAD_DAYS), 0, MAX_LEAD_DAYS)
+
+
+def spreads(df, days, model=DEFAULT_MODEL):
+    """(wind, temp, rain) standard deviations per game for ``days`` of lead time."""
+    labels = df['wind_vol'] if 'wind_vol' in df.columns else pd.Series(np.nan, index=df.index)
+    codes, uniques = pd.factorize(pd.Series(labels), use_na_sentinel=True)
+    scale = np.array([model.wind_vol_scale.get(str(label).strip().lower(), 1.0) for label in uniques] + [1.0])
+    wind = scale[codes] * (model.wind_sd + model.wind_per_day * days)
+    temp = model.temp_sd + model.temp_per_day * days
+    rain = model.rain_sd + model.rain_per_day * days
+    return wind, temp, rain
+
+
+def _nfl_outcomes(data):
+    choice = np.select(nfl_conditions(data), np.arange(len(NFL_LEVELS)), default=len(NFL_LEVELS))
+    return [choice == level for level in range(len(NFL_LEVELS))]
+
+
+def _cfb_outcomes(data, low_wind, thresholds):
+    choice = np.select(cfb_conditions(data, low_wind, thresholds), np.arange(len(CFB_SIGNALS)), default=len(CFB_SIGNALS))
+    return [choice == level for level in range(len(CFB_SIGNALS))]
+
+
+def _combined_outcomes(data, league):
+    return [np.asarray(signal.rule(data), dtype=bool) & (league == signal.league) for signal in signals.SIGNALS]
+
+
+def _count(outcomes, fixed, center, sd, draws, seed):
+    """Draws (of ``draws``) on which each outcome fires, as a (outcomes, games) int array."""
+    rng = np.random.default_rng(seed)
+    n = len(center['wind_fg'])
+    chunk = max(1, CHUNK_CELLS // max(1, n))
+    counts = None
+    for start in range(0, draws, chunk):
+        size = min(chunk, draws - start)
+        noise = rng.standard_normal((3, size, n))
+        data = dict(fixed)
+        data['wind_fg'] = np.maximum(center['wind_fg'] + sd['wind_fg'] * noise[0], 0)
+        data['temp_fg'] = center['temp_fg'] + sd['temp_fg'] * noise[1]
+        # Lognormal with the forecast as its mean, so a dry forecast stays dry
+        data['rain_fg'] = center['rain_fg'] * np.exp(sd['rain_fg'] * noise[2] - sd['rain_fg'] ** 2 / 2)
+        fired = np.stack([mask.sum(axis=0) for mask in outcomes(data)])
+        counts = fired if counts is None else counts + fired
+    return counts
+
+
+def _init_worker(*args):
+    global _worker_args
+    _worker_args = args
+
+
+def _shard_count(task):
+    draws, seed = task
+    return _count(*_worker_args, draws, seed)
+
+
+def _simulate(df, outcomes, names, draws, seed, model, now, workers):
+    days = lead_days(df, now)
+    center = {name: numeric_column(df, name).astype(np.float64) for name in PERTURBED}
+    sd = dict(zip(PERTURBED, spreads(df, days, model)))
+    fixed = {name: numeric_column(df, name).astype(np.float64) for name in FIXED if name in df.columns}
+    workers = workers or 1
+
+    if workers == 1 or draws < 2 * workers:
+        counts = _count(outcomes, fixed, center, sd, draws, seed)
+    else:
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        shares = [draws // workers + (i < draws % workers) for i in range(workers)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(outcomes, fixed, center, sd)) as pool:
+            counts = sum(pool.map(_shard_count, zip(shares, seeds)))
+    return pd.DataFrame((counts / draws).T, index=df.index, columns=names)
+
+
+def nfl_probabilities(df, draws=DRAWS, seed=None, model=DEFAULT_MODEL, now=None, workers=1):
+    """Share of draws on which each NFL impact level is a game's level (NFL_LEVELS order)."""
+    return _simulate(df, _nfl_outcomes, [level for level, _, _ in NFL_LEVELS], draws, seed, model, now, workers)
+
+
+def cfb_probabilities(df, draws=DRAWS, seed=None, model=DEFAULT_MODEL, now=None, workers=1, today=None, thresholds=None):
+    """Share of draws on which each CFB signal is a game's signal (see classify.classify_cfb for ``today``).
+
+    ``today`` defaults to each row's ``as_of`` where the slate has one (stacked
+    snapshots, replays), so every game uses its own snapshot's weekday.
+    """
+    if today is None and 'as_of' in df.columns:
+        today = df['as_of']
+    low_wind = low_impact_wind_threshold(today, thresholds)
+    outcomes = partial(_cfb_outcomes, low_wind=low_wind, thresholds=thresholds)
+    return _simulate(df, outcomes, list(CFB_SIGNALS), draws, seed, model, now, workers)
+
+
+def combined_probabilities(df, draws=DRAWS, seed=None, model=DEFAULT_MODEL, now=None, workers=1):
+    """Share of draws on which each combined signal matches, for a signals.unify frame.
+
+    Signals are not exclusive, so a game's probabilities can add up to more than 1.
+    """
+    outcomes = partial(_combined_outcomes, league=df['league'].to_numpy(dtype=object))
+    return _simulate(df, outcomes, [signal.name for signal in signals.SIGNALS], draws, seed, model, now, workers)
+
+
+def main(argv=None):
+    from football_weather import loaders, pipeline
+
+    parser = argparse.ArgumentParser(prog='python -m football_weather.montecarlo', description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name in ['nfl', 'cfb', 'combined']:
+        command = commands.add_parser(name)
+        if name == 'combined':
+            command.add_argument('--nfl', default=pipeline.NFL_SNAPSHOT)
+            command.add_argument('--cfb', default=pipeline.CFB_SNAPSHOT)
+        else:
+            command.add_argument('snapshot', nargs='?', default=pipeline.NFL_SNAPSHOT if name == 'nfl' else pipeline.CFB_SNAPSHOT)
+        if name == 'cfb':
+            command.add_argument('--backtest', default=pipeline.CFB_BACKTEST)
+        command.add_argument('--draws', type=int, default=DRAWS)
+        command.add_argument('--seed', type=int, default=None)
+        command.add_argument('--workers', type=int, default=1, help="processes to split the draws across")
+        command.add_argument('--out', default=None, help="write the probabilities as csv")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    if args.command == 'nfl':
+        df = pipeline.load_nfl_slate(args.snapshot)
+        run = nfl_probabilities
+    elif args.command == 'cfb':
+        df = pipeline.load_cfb_slate(args.snapshot, args.backtest)
+        run = cfb_probabilities
+    else:
+        df = signals.unify(loaders.read_csv(args.nfl), loaders.read_excel(args.cfb))
+        run = combined_probabilities
+    start = time.perf_counter()
+    probabilities = run(df, args.draws, args.seed, workers=args.workers)
+    logger.info("%d games x %d draws in %.3fs", len(df), args.draws, time.perf_counter() - start)
+
+    result = pd.concat([df[['Game']], probabilities], axis=1)
+    if args.out:
+        result.to_csv(args.out, index=False)
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:.3f}'.format):
+        print(result.to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
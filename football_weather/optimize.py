@@ -0,0 +1,246 @@
+"""Grid search over the CFB classifier thresholds on graded game history.
+
+    python -m football_weather.optimize history/*.csv --out cfb_thresholds.json
+    python -m football_weather.optimize history.csv --min-signal "High Impact" --workers 8
+    python -m football_weather cfb cfb_weather.xlsx --thresholds cfb_thresholds.json --min-sample 200
+
+Every combination of the shared cutoffs (wind step, temperatures, spreads)
+and of a Low Impact wind threshold for each weekday is scored by the ROI and
+sample of betting the under at -110 on the games it classifies at
+``--min-signal`` or above. History files are graded CFB snapshots (see
+backtest_build) whose ``Timestamp`` gives the forecast weekday. The output is
+the Pareto front: sets that no other set beats on both sample and ROI.
+``classify.load_cfb_thresholds`` picks one for the classifier.
+
+A game only depends on the threshold of its own weekday, so the weekday
+choices are combined exactly with a max-plus merge: for every reachable
+sample size only the most profitable partial choice is kept. The shared
+cutoff combinations are split across a process pool.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from football_weather.backtest_build import read_history
+from football_weather.classify import (
+    CFB_SIGNALS,
+    DEFAULT_CFB_THRESHOLDS,
+    CfbThresholds,
+    cfb_conditions,
+    numeric_column,
+)
+
+logger = logging.getLogger(__name__)
+
+FORECAST_COLUMNS = ['wind_fg', 'temp_fg', 'Open', 'travel_alt', 'rain_fg', 'home_temp', 'away_temp']
+HISTORY_COLUMNS = FORECAST_COLUMNS + ['FD_now', 'Final', 'Timestamp']
+
+# Candidate values per threshold; low_wind is tried for every weekday
+DEFAULT_GRID = {
+    'low_wind': [float(v) for v in np.arange(7, 14.5, 0.5)],
+    'wind_step': [5, 6, 7.5, 9],
+    'cold_temp': [45, 50, 55],
+    'cool_temp': [60, 65, 70],
+    'close_spread': [7.5, 10.5, 14.5],
+    'wide_spread': [17.5, 20.5, 24.5],
+}
+SHARED_FIELDS = [name for name in CfbThresholds._fields if name != 'low_wind']
+
+# Set in each pool worker by _init_worker
+_worker_args = None
+
+
+def history_arrays(history):
+    """Forecast columns shaped (n, 1) to broadcast against thresholds, and per-weekday outcome weights.
+
+    ``sample`` and ``profit`` are (7, n): row d holds, for games forecast on
+    weekday d, 1 and the under's return in units (win 100/110, loss -1, push 0).
+    """
+    missing = [name for name in HISTORY_COLUMNS if name not in history.columns]
+    if missing:
+        raise ValueError(f"history is missing columns: {', '.join(missing)}")
+    line = numeric_column(history, 'FD_now')
+    final = numeric_column(history, 'Final')
+    weekday = pd.to_datetime(history['Timestamp'], errors='coerce').dt.weekday.to_numpy(dtype=float)
+    graded = ~np.isnan(line) & ~np.isnan(final) & ~np.isnan(weekday)
+    line, final, weekday = line[graded], final[graded], weekday[graded].astype(np.int64)
+
+    sample = np.zeros((7, len(line)))
+    sample[weekday, np.arange(len(line))] = 1
+    units = np.where(final < line, 100 / 110, np.where(final > line, -1.0, 0.0))
+    return {
+        'data': {name: numeric_column(history, name)[graded, None] for name in FORECAST_COLUMNS},
+        'sample': sample,
+        'profit': sample * units,
+    }
+
+
+def weekday_tables(games, shared, low_wind, min_rank):
+    """(7, k) sample and profit per weekday and Low Impact threshold for one set of shared cutoffs."""
+    thresholds = CfbThresholds(low_wind=None, **shared)
+    conditions = cfb_conditions(games['data'], np.asarray(low_wind, dtype=float)[None, :], thresholds)
+    bet = reduce(np.logical_or, conditions[:min_rank + 1])
+    bet = np.broadcast_to(bet, (games['sample'].shape[1], len(low_wind))).astype(float)
+    return games['sample'] @ bet, games['profit'] @ bet
+
+
+def best_by_sample(sample, profit):
+    """For every reachable total sample, the most profitable choice of one column per weekday row.
+
+    Returns (sample, profit, choices) with ``choices`` of shape (m, 7).
+    """
+    k = sample.shape[1]
+    totals, gains = np.zeros(1), np.zeros(1)
+    choices = np.zeros((1, 0), dtype=np.int64)
+    for day in range(len(sample)):
+        n = (totals[:, None] + sample[day]).ravel()
+        p = (gains[:, None] + profit[day]).ravel()
+        order = np.lexsort((-p, n))
+        keep = order[np.r_[True, n[order][1:] != n[order][:-1]]]
+        rows, pick = np.divmod(keep, k)
+        totals, gains = n[keep], p[keep]
+        choices = np.column_stack([choices[rows], pick])
+    return totals, gains, choices
+
+
+def pareto(sample, roi):
+    """Positions of the points no other point beats on both sample and ROI, largest sample first."""
+    order = np.lexsort((-roi, -sample))
+    best_before = np.maximum.accumulate(np.r_[-np.inf, roi[order][:-1]])
+    return order[roi[order] > best_before]
+
+
+def frontier(games, shared, low_wind, min_rank, min_sample):
+    """Pareto points (sample, profit, choices) over the weekday thresholds for one set of shared cutoffs."""
+    sample, profit = weekday_tables(games, shared, low_wind, min_rank)
+    totals, gains, choices = best_by_sample(sample, profit)
+    enough = totals >= max(min_sample, 1)
+    totals, gains, choices = totals[enough], gains[enough], choices[enough]
+    keep = pareto(totals, gains / np.maximum(totals, 1))
+    return totals[keep], gains[keep], choices[keep]
+
+
+def _init_worker(*args):
+    global _worker_args
+    _worker_args = args
+
+
+def _shard_frontier(combos):
+    games, low_wind, min_rank, min_sample = _worker_args
+    return _combos_frontier(games, combos, low_wind, min_rank, min_sample)
+
+
+def _combos_frontier(games, combos, low_wind, min_rank, min_sample):
+    parts = []
+    for combo_id, shared in combos:
+        totals, gains, choices = frontier(games, shared, low_wind, min_rank, min_sample)
+        parts.append((totals, gains, np.full(len(totals), combo_id), choices))
+    return parts
+
+
+def search(history, grid=None, min_signal='Low Impact', min_sample=30, workers=None):
+    """Pareto-best threshold sets on ``history``, as dicts with sample, units, roi and thresholds."""
+    grid = dict(DEFAULT_GRID, **(grid or {}))
+    min_rank = CFB_SIGNALS.index(min_signal)
+    low_wind = grid['low_wind']
+    games = history_arrays(history)
+    combos = [
+        (combo_id, dict(zip(SHARED_FIELDS, values)))
+        for combo_id, values in enumerate(itertools.product(*(grid[name] for name in SHARED_FIELDS)))
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(combos) < 2:
+        parts = _combos_frontier(games, combos, low_wind, min_rank, min_sample)
+    else:
+        shards = [combos[i::workers * 4] for i in range(min(len(combos), workers * 4))]
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(games, low_wind, min_rank, min_sample)
+        ) as pool:
+            parts = [part for shard in pool.map(_shard_frontier, shards) for part in shard]
+
+    if not parts:
+        return []
+    totals, gains, combo_ids, choices = (np.concatenate(column) for column in zip(*parts))
+    if not len(totals):
+        return []
+    roi = gains / totals
+    # Weekdays without history keep their current threshold
+    seen = games['sample'].sum(axis=1) > 0
+    entries = []
+    for i in pareto(totals, roi):
+        low = [
+            low_wind[choices[i, day]] if seen[day] else DEFAULT_CFB_THRESHOLDS.low_wind[day]
+            for day in range(7)
+        ]
+        entries.append({
+            'sample': int(totals[i]),
+            'units': round(float(gains[i]), 2),
+            'roi': round(float(roi[i]), 4),
+            'thresholds': dict(combos[combo_ids[i]][1], low_wind=low),
+        })
+    return entries
+
+
+def baseline(history, min_signal='Low Impact', thresholds=None):
+    """Sample, units and ROI of one threshold set (default: the built-in one) on ``history``."""
+    thresholds = thresholds or DEFAULT_CFB_THRESHOLDS
+    games = history_arrays(history)
+    shared = {name: getattr(thresholds, name) for name in SHARED_FIELDS}
+    sample, profit = weekday_tables(games, shared, list(thresholds.low_wind), CFB_SIGNALS.index(min_signal))
+    # Column d was classified with weekday d's threshold, so weekday d's games are at [d, d]
+    days = np.arange(7)
+    n, units = sample[days, days].sum(), profit[days, days].sum()
+    return {'sample': int(n), 'units': round(float(units), 2), 'roi': round(float(units / n), 4) if n else None}
+
+
+def _values(text):
+    return [float(v) for v in text.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m football_weather.optimize', description=__doc__.split('\n')[0])
+    parser.add_argument('history', nargs='+', help="csv/xlsx/parquet files of graded games")
+    parser.add_argument('--out', default='cfb_thresholds.json')
+    parser.add_argument('--min-signal', choices=CFB_SIGNALS, default='Low Impact',
+                        help="bet on games classified at this signal or above")
+    parser.add_argument('--min-sample', type=int, default=30, help="ignore threshold sets betting fewer games")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU)")
+    for name in ['low_wind'] + SHARED_FIELDS:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=_values, default=None,
+                            help=f"comma separated candidates (default: {','.join(map(str, DEFAULT_GRID[name]))})")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    grid = {name: getattr(args, name) for name in DEFAULT_GRID if getattr(args, name) is not None}
+    start = time.perf_counter()
+    history = read_history(args.history)
+    entries = search(history, grid, args.min_signal, args.min_sample, args.workers)
+    current = baseline(history, args.min_signal)
+    with open(args.out, 'w') as f:
+        json.dump({
+            'min_signal': args.min_signal,
+            'games': len(history),
+            'current': current,
+            'frontier': entries,
+        }, f, indent=2)
+
+    logger.info("%d games, %d Pareto sets -> %s in %.1fs", len(history), len(entries), args.out, time.perf_counter() - start)
+    if current['roi'] is not None:
+        print(f"{'current':>10} {current['sample']:>7} games  ROI {current['roi']:+.4f}")
+    for entry in entries:
+        print(f"{'':>10} {entry['sample']:>7} games  ROI {entry['roi']:+.4f}  {entry['thresholds']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
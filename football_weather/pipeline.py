@@ -0,0 +1,120 @@
+"""Snapshot -> classified slate, without streamlit or plotly.
+
+The ``build_*`` functions take already loaded frames; the ``load_*`` functions
+go straight from snapshot paths. Both return new frames and leave their
+inputs untouched. The ``*_slate_key`` functions identify what a ``load_*``
+call would return (snapshot contents plus anything else it depends on), for
+caching work derived from a slate.
+"""
+import logging
+
+from football_weather import loaders, metrics, schema, signals, stadiums
+from football_weather.backtest import RESULT_COLUMNS, BacktestMatcher
+from football_weather.classify import classify_cfb, classify_nfl, low_impact_wind_threshold
+
+NFL_SNAPSHOT = 'nfl_weather.csv'
+CFB_SNAPSHOT = 'cfb_weather.xlsx'
+CFB_BACKTEST = 'cfb_weather_backtest.xlsx'
+
+logger = logging.getLogger(__name__)
+
+
+def build_nfl_slate(df):
+    """Scale the win-probability shifts, add wind_diff and classify an NFL slate."""
+    df = df.copy()
+    df['gs_fg'] = df['gs_fg'] * 100
+    df['away_fg'] = df['away_fg'] * 100
+    df['wind_diff'] = df['wind_fg'] - df['avg_wind']
+
+    # Light wind is never volatile enough to matter
+    df['wind_vol'] = schema.with_category(df['wind_vol'], 'Low')
+    df.loc[df['wind_fg'] < 11.99, 'wind_vol'] = 'Low'
+
+    with metrics.stage('classify.nfl', len(df)):
+        df[['impact_level', 'dot_color', 'dot_size', 'dot_opacity']] = classify_nfl(df)
+    return schema.categorize(df, schema.LABEL_COLUMNS)
+
+
+def join_stadiums(df_weather, df_stadiums, dimension=None):
+    """Attach each game's home stadium record by stadium id; games without coordinates are dropped.
+
+    Home teams matching no stadium are logged (see stadiums.join), and so are
+    the games dropped. Pass a prebuilt ``dimension`` to skip building one from
+    ``df_stadiums``.
+    """
+    with metrics.stage('stadium_merge', len(df_weather)):
+        if dimension is None:
+            dimension = stadiums.StadiumDimension(df_stadiums)
+        df = stadiums.join(df_weather, dimension)
+        located = df['lat'].notna() & df['lon'].notna()
+        if not located.all():
+            logger.warning(
+                "%d games without coordinates left off the slate: %s",
+                (~located).sum(), ', '.join(df.loc[~located, 'Game'].astype(str)),
+            )
+        return df[located]
+
+
+def build_cfb_slate(df_weather, df_stadiums, df_bt, today=None, matcher=None, thresholds=None, dimension=None):
+    """Join stadium records, look up backtest results and classify a CFB slate.
+
+    ``today`` sets the weekday used for the wind thresholds (default: clock.now()) and
+    ``thresholds`` overrides the classifier cutoffs (see classify.CfbThresholds).
+    Pass a prebuilt ``matcher`` to reuse one BacktestMatcher across slates, and
+    a ``dimension`` to reuse one stadiums.StadiumDimension.
+    """
+    df = join_stadiums(df_weather, df_stadiums, dimension)
+    with metrics.stage('backtest_lookup', len(df)):
+        matcher = matcher or BacktestMatcher(df_bt)
+        df[RESULT_COLUMNS] = matcher.match(df)
+    with metrics.stage('classify.cfb', len(df)):
+        df[['signal', 'dot_color', 'dot_size']] = classify_cfb(df, today, thresholds)
+    return schema.categorize(df, schema.LABEL_COLUMNS)
+
+
+def build_combined_slate(nfl_df, cfb_df):
+    """Games from the raw NFL and CFB snapshots matching any combined signal."""
+    with metrics.stage('signals.combined', len(nfl_df) + len(cfb_df)):
+        return schema.categorize(signals.matched_games(signals.unify(nfl_df, cfb_df)), schema.LABEL_COLUMNS)
+
+
+def load_nfl_slate(path=NFL_SNAPSHOT):
+    return build_nfl_slate(loaders.read_csv(path))
+
+
+def load_cfb_inputs(path=CFB_SNAPSHOT, backtest_path=CFB_BACKTEST):
+    """Weather, Stadiums and Backtesting frames for a CFB snapshot."""
+    return (
+        loaders.read_excel(path),
+        loaders.read_excel(backtest_path, sheet_name='Stadiums'),
+        loaders.read_excel(backtest_path, sheet_name='Backtesting'),
+    )
+
+
+def load_cfb_slate(path=CFB_SNAPSHOT, backtest_path=CFB_BACKTEST, today=None, thresholds=None):
+    return build_cfb_slate(
+        *load_cfb_inputs(path, backtest_path), today=today, thresholds=thresholds,
+        dimension=stadiums.for_workbook(backtest_path),
+    )
+
+
+def load_combined_slate(nfl_path=NFL_SNAPSHOT, cfb_path=CFB_SNAPSHOT):
+    return build_combined_slate(loaders.read_csv(nfl_path), loaders.read_excel(cfb_path))
+
+
+def nfl_slate_key(path=NFL_SNAPSHOT):
+    return (loaders.snapshot_id(path),)
+
+
+def cfb_slate_key(path=CFB_SNAPSHOT, backtest_path=CFB_BACKTEST, today=None, thresholds=None):
+    # The classification depends on the weekday only through its wind threshold
+    return (
+        loaders.snapshot_id(path),
+        loaders.snapshot_id(backtest_path),
+        low_impact_wind_threshold(today, thresholds),
+        thresholds,
+    )
+
+
+def combined_slate_key(nfl_path=NFL_SNAPSHOT, cfb_path=CFB_SNAPSHOT):
+    return (loaders.snapshot_id(nfl_path), loaders.snapshot_id(cfb_path))
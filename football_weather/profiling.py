@@ -0,0 +1,151 @@
+"""Startup profiling: import cost per module and first-render time per page.
+
+In the running app, set ``FW_PROFILE=1`` and every page logs how long its
+first render in the process took, split into the marks it records (imports,
+load, figure, ...). With ``FW_METRICS=1`` every render's marks also go to
+football_weather.metrics as ``page.<page>.<mark>`` stages. Off by default,
+where the hooks only check a flag.
+
+Offline, each measurement runs in a fresh interpreter so nothing is warm:
+
+    python -m football_weather.profiling imports
+    python -m football_weather.profiling pages
+"""
+import argparse
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+from football_weather import metrics
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('FW_PROFILE', '0') == '1'
+
+DEFAULT_MODULES = [
+    'streamlit',
+    'pandas',
+    'numpy',
+    'pyarrow',
+    'openpyxl',
+    'plotly.express',
+    'football_weather.pipeline',
+    'football_weather.figures',
+]
+
+DEFAULT_PAGES = ['app.py', 'pages/nfl_weather.py', 'pages/cfb_weather.py', 'pages/combined_signals.py']
+
+_rendered = set()
+_lock = threading.Lock()
+
+
+class PageTimer:
+    """Marks elapsed time through one page run; a no-op unless profiling is enabled."""
+
+    def __init__(self, page):
+        self.page = page
+        self.start = time.perf_counter()
+        self.marks = []
+
+    def mark(self, label, rows=None):
+        """End the step ``label`` (``rows``: how many rows it handled)."""
+        if ENABLED or metrics.ENABLED:
+            now = time.perf_counter()
+            if metrics.ENABLED:
+                metrics.record(f"page.{self.page}.{label}", now - (self.marks[-1][1] if self.marks else self.start), rows)
+            self.marks.append((label, now))
+
+    def done(self):
+        """Log the page's first render in this process."""
+        if metrics.ENABLED:
+            metrics.record(f"page.{self.page}", time.perf_counter() - self.start)
+            metrics.flush()
+        if not ENABLED:
+            return
+        with _lock:
+            if self.page in _rendered:
+                return
+            _rendered.add(self.page)
+        end = time.perf_counter()
+        steps, last = [], self.start
+        for label, at in self.marks:
+            steps.append(f"{label}={(at - last) * 1000:.0f}ms")
+            last = at
+        logger.warning("first render of %s: %.0fms (%s)", self.page, (end - self.start) * 1000, ' '.join(steps))
+
+
+def start_page(page):
+    return PageTimer(page)
+
+
+_IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def import_cost(module):
+    """Cumulative import time in seconds of ``module`` in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return None
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        # The top-level entry is the unindented one for the module itself
+        if match and match.group(4) == module and not match.group(3):
+            return int(match.group(2)) / 1e6
+    return None
+
+
+_PAGE_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+ready = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+end = time.perf_counter()
+print(ready - start, end - ready, len(at.exception))
+"""
+
+
+def page_cost(page):
+    """(streamlit test harness import, first render) seconds for ``page`` in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get('PYTHONPATH')])))
+    proc = subprocess.run(
+        [sys.executable, '-c', _PAGE_SCRIPT, os.path.abspath(page)],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        return None
+    harness, render, errors = proc.stdout.split()[-3:]
+    return float(harness), float(render), int(errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m football_weather.profiling', description=__doc__.split('\n')[0])
+    parser.add_argument('what', choices=['imports', 'pages'])
+    parser.add_argument('targets', nargs='*', help="modules or page scripts (default: the app's)")
+    args = parser.parse_args(argv)
+
+    if args.what == 'imports':
+        for module in args.targets or DEFAULT_MODULES:
+            seconds = import_cost(module)
+            print(f"{module:<28} {'not installed' if seconds is None else f'{seconds * 1000:8.0f} ms'}")
+    else:
+        for page in args.targets or DEFAULT_PAGES:
+            result = page_cost(page)
+            if result is None:
+                print(f"{page:<28} failed to run")
+                continue
+            harness, render, errors = result
+            note = f" ({errors} exceptions)" if errors else ''
+            print(f"{page:<28} first render {render * 1000:8.0f} ms{note}  (+{harness * 1000:.0f} ms streamlit import)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
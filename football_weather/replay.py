@@ -0,0 +1,97 @@
+"""Point-in-time replay of archived snapshots.
+
+    python -m football_weather.replay --cfb 'archive/cfb_weather_*.xlsx' --nfl 'archive/nfl_weather_*.csv'
+    python -m football_weather.replay --cfb 'archive/**/*.xlsx' --format parquet --out results/2025
+
+Every snapshot is classified as of its own ``Timestamp``, so the CFB wind
+thresholds follow the weekday it was taken on, exactly as the dashboard showed
+it then. All snapshots of a league are stacked and classified in one batch
+(one stadium join, one backtest lookup and one classification with a per-row
+as-of), so a season of hourly snapshots is a single vectorized pass. Results
+are written as ``<out>/replay.<kind>.<format>``, one row per game per snapshot,
+tagged with ``snapshot`` (file name) and ``as_of``.
+"""
+import argparse
+import logging
+import sys
+import time
+
+from football_weather import loaders, pipeline, signals, snapshots, stadiums
+from football_weather.classify import load_cfb_thresholds
+
+logger = logging.getLogger(__name__)
+
+
+def read_archive(paths, workers=1):
+    """All snapshots stacked, each row tagged with its ``snapshot`` file name and ``as_of`` time.
+
+    ``as_of`` is the snapshot's ``Timestamp``, or the file's mtime where that
+    is missing. The stack is compacted once (see schema.py), not file by file.
+    ``workers`` > 1 parses the files in a process pool (see snapshots.read).
+    """
+    return snapshots.stack(paths, snapshots.read(paths, workers), normalize=False)
+
+
+def replay_nfl(paths, workers=1):
+    """NFL slates of every snapshot (NFL classification does not depend on the clock)."""
+    slate = pipeline.build_nfl_slate(read_archive(paths, workers))
+    return slate.sort_values(['as_of', 'Game'], kind='stable', ignore_index=True)
+
+
+def replay_cfb(paths, backtest_path=pipeline.CFB_BACKTEST, thresholds=None, workers=1):
+    """CFB slates of every snapshot, each classified as of its own time."""
+    df = read_archive(paths, workers)
+    slate = pipeline.build_cfb_slate(
+        df,
+        loaders.read_excel(backtest_path, sheet_name='Stadiums'),
+        loaders.read_excel(backtest_path, sheet_name='Backtesting'),
+        today=df['as_of'], thresholds=thresholds, dimension=stadiums.for_workbook(backtest_path),
+    )
+    return slate.sort_values(['as_of', 'Game'], kind='stable', ignore_index=True)
+
+
+def replay_combined(nfl_paths, cfb_paths, workers=1):
+    """Combined-signal matches of every NFL and CFB snapshot."""
+    games = signals.matched_games(signals.unify(read_archive(nfl_paths, workers), read_archive(cfb_paths, workers)))
+    return games.sort_values(['as_of', 'Game'], kind='stable', ignore_index=True)
+
+
+def main(argv=None):
+    from football_weather.cli import write_slate
+
+    parser = argparse.ArgumentParser(prog='python -m football_weather.replay', description=__doc__.split('\n')[0])
+    parser.add_argument('--nfl', nargs='*', default=[], help="NFL snapshot directories and globs")
+    parser.add_argument('--cfb', nargs='*', default=[], help="CFB snapshot directories and globs")
+    parser.add_argument('--backtest', default=pipeline.CFB_BACKTEST, help="workbook with Stadiums and Backtesting sheets")
+    parser.add_argument('--thresholds', default=None, help="optimizer output to classify CFB with")
+    parser.add_argument('--min-sample', type=int, default=0, help="with --thresholds, best-ROI set with at least this many games")
+    parser.add_argument('--out', default='results')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--workers', type=int, default=1, help="processes parsing the snapshots")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    nfl_paths, cfb_paths = snapshots.expand(args.nfl), snapshots.expand(args.cfb)
+    if not nfl_paths and not cfb_paths:
+        parser.error("no snapshots matched --nfl/--cfb")
+    thresholds = load_cfb_thresholds(args.thresholds, args.min_sample) if args.thresholds else None
+
+    runs = []
+    if nfl_paths:
+        runs.append(('nfl', lambda: replay_nfl(nfl_paths, args.workers)))
+    if cfb_paths:
+        runs.append(('cfb', lambda: replay_cfb(cfb_paths, args.backtest, thresholds, args.workers)))
+    if nfl_paths and cfb_paths:
+        runs.append(('combined', lambda: replay_combined(nfl_paths, cfb_paths, args.workers)))
+
+    for kind, run in runs:
+        start = time.perf_counter()
+        records = run()
+        path = write_slate(records, args.out, 'replay', kind, args.format)
+        logger.info("%s: %d rows from %d snapshots -> %s in %.1fs", kind, len(records),
+                    records['snapshot'].nunique(), path, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""Compact dtypes for snapshot and slate frames.
+
+    python -m football_weather.schema nfl_weather.csv cfb_weather.xlsx cfb_weather_backtest.xlsx:Backtesting
+
+Parsed snapshots come out as float64/int64 and one Python-backed string per
+cell. ``compact`` turns the low-cardinality label columns (CATEGORY_COLUMNS)
+into categoricals, integers into the smallest integer type that holds them
+and floats into float32 where every value survives the round trip exactly,
+so comparisons against the classifier thresholds give the same answers.
+``Date``/``Time`` stay as labels for display and a parsed ``kickoff``
+datetime is added next to them. The loaders compact every frame they cache
+(FW_COMPACT=0 to disable).
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from football_weather import clock
+
+# Columns of the nfl_weather.csv and cfb_weather.xlsx snapshots
+NFL_COLUMNS = [
+    'Game', 'Date', 'Time', 'stadium', 'avg_wind', 'wind_vol', 'orient', 'wind_impact',
+    'weakest_wind_effect', 'game_loc', 'travel_alt', 'home_temp', 'away_temp', 'year_built',
+    'wind_dir_1h', 'wind_dir_2h', 'temp_fg', 'wind_fg', 'wind_dir_fg', 'rain_fg', 'gs_fg',
+    'away_fg', 'Spread_now', 'Odds_now', 'Total_now', 'Under_now', 'Spread_open', 'Odds_open',
+    'Total_open', 'Under_open', 'Timestamp',
+]
+
+CFB_COLUMNS = [
+    'Game', 'Date', 'Time', 'wind_vol', 'orient', 'wind_impact', 'weakest_wind_effect',
+    'travel_alt', 'home_temp', 'away_temp', 'wind_avg', 'year_built', 'wind_dir_1h',
+    'wind_dir_2h', 'temp_fg', 'wind_fg', 'wind_dir_fg', 'rain_fg', 'gs_fg', 'away_fg',
+    'wind_diff', 'game_loc', 'Fd_open', 'Odds_o', 'FD_now', 'Odds_n', 'Open', 'Current',
+    'Spread', 'Total_proj', 'Move_t', 'Move_s', 'My_total', 'Edge', 'My_spread', 'Edge_s',
+    'Timestamp',
+]
+
+# Label columns stored as categoricals, when they repeat enough to save memory
+CATEGORY_COLUMNS = [
+    'Date', 'Time', 'Timestamp', 'snapshot', 'game_loc', 'stadium', 'Stadium', 'Team', 'Record', 'home_tm', 'league',
+    'wind_vol', 'wind_impact', 'orient', 'weakest_wind_effect', 'wind_dir_fg', 'wind_dir_1h', 'wind_dir_2h',
+    'signal', 'signal_type', 'signals', 'impact_level', 'dot_color', 'Signal', 'Sport', 'CLV from Open',
+]
+# Output labels of the classifiers (see pipeline)
+LABEL_COLUMNS = ['impact_level', 'dot_color', 'signal', 'signal_type', 'signals', 'league']
+# A column becomes categorical only with at most this many distinct values per row
+MAX_CATEGORY_RATIO = 0.5
+
+
+def kickoff_times(schedule, now=None):
+    """Kickoff of each game from its ``Date`` ("SUN 09/07") and ``Time`` ("01:00 PM").
+
+    The snapshots carry no year; each kickoff gets the year that puts it
+    least far before ``now`` minus 180 days. ``now`` may be a scalar or one
+    time per row (default: clock.now()).
+    """
+    if now is None:
+        now = clock.now()
+    now = pd.to_datetime(now) if isinstance(now, pd.Series) else pd.Series(pd.Timestamp(now), index=schedule.index)
+    month_day = schedule['Date'].astype('string').str.strip().str[-5:]
+    text = now.dt.year.astype('string') + '/' + month_day + ' ' + schedule['Time'].astype('string').str.strip()
+    kickoff = pd.to_datetime(text, format='%Y/%m/%d %I:%M %p', errors='coerce')
+    earlier = kickoff < now - pd.Timedelta(days=180)
+    return kickoff.where(~earlier, kickoff + pd.DateOffset(years=1))
+
+
+def with_category(series, value):
+    """``series`` with ``value`` among its categories, so it can be assigned."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        return series.cat.add_categories([value])
+    return series
+
+
+def categorize(df, columns=CATEGORY_COLUMNS):
+    """Store the given label columns of ``df`` as categoricals, in place."""
+    for name in columns:
+        if name not in df.columns or isinstance(df[name].dtype, pd.CategoricalDtype):
+            continue
+        values = df[name]
+        if values.dtype.kind in 'biufcM':
+            continue
+        if values.nunique(dropna=True) <= max(1, len(values) * MAX_CATEGORY_RATIO):
+            df[name] = values.astype('category')
+    return df
+
+
+def concat(frames):
+    """``pd.concat`` that keeps categoricals categorical.
+
+    Frames whose categoricals have different categories would otherwise stack
+    into plain object columns, so the categories are unioned first.
+    """
+    frames = list(frames)
+    categorical = {
+        name for df in frames for name in df.columns if isinstance(df[name].dtype, pd.CategoricalDtype)
+    }
+    for name in categorical:
+        categories = pd.Index([])
+        for df in frames:
+            if name in df.columns:
+                values = df[name]
+                extra = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) else values.dropna().unique()
+                categories = categories.union(pd.Index(extra), sort=False)
+        dtype = pd.CategoricalDtype(categories)
+        frames = [df.assign(**{name: df[name].astype(dtype)}) if name in df.columns else df for df in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _float32(values):
+    """float32 copy of ``values`` if every value round-trips exactly, else None."""
+    narrow = values.astype(np.float32)
+    return narrow if np.array_equal(narrow.astype(np.float64), values, equal_nan=True) else None
+
+
+def downcast(df):
+    """Smallest exact numeric dtypes for the numeric columns of ``df``, in place."""
+    for name in df.columns:
+        dtype = df[name].dtype
+        if isinstance(dtype, pd.CategoricalDtype) or dtype.kind not in 'iuf' or dtype == np.float32:
+            continue
+        if dtype.kind in 'iu' and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            df[name] = pd.to_numeric(df[name], downcast='integer')
+            continue
+        values = df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+        narrow = _float32(values)
+        if narrow is not None:
+            df[name] = narrow
+        elif isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            # Nullable floats to plain NaN-holding floats
+            df[name] = values
+    return df
+
+
+def compact(df):
+    """``df`` with categorical labels, exact narrow numerics and a parsed ``kickoff``.
+
+    Returns a new frame; ``df`` is left untouched.
+    """
+    df = df.copy()
+    if {'Date', 'Time'} <= set(df.columns) and 'kickoff' not in df.columns:
+        now = None
+        if 'Timestamp' in df.columns:
+            stamped = pd.to_datetime(df['Timestamp'].astype('string'), errors='coerce', format='ISO8601')
+            now = stamped.fillna(pd.Timestamp(clock.now()))
+        df['kickoff'] = kickoff_times(df, now)
+    categorize(df)
+    return downcast(df)
+
+
+def memory(df):
+    """Bytes held by ``df``, counting string contents."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def memory_report(frames):
+    """Rows of (name, rows, bytes before, bytes after, ratio) for ``{name: frame}``, compacting each."""
+    rows = []
+    for name, df in frames.items():
+        before, after = memory(df), memory(compact(df))
+        rows.append((name, len(df), before, after, after / before if before else 1.0))
+    return rows
+
+
+def main(argv=None):
+    from football_weather import loaders
+
+    parser = argparse.ArgumentParser(prog='python -m football_weather.schema', description=__doc__.split('\n')[0])
+    parser.add_argument('snapshots', nargs='+', help="snapshot paths, 'book.xlsx:Sheet' for a named sheet")
+    args = parser.parse_args(argv)
+
+    frames = {}
+    for spec in args.snapshots:
+        path, _, sheet = spec.partition(':')
+        kwargs = {'sheet_name': sheet} if sheet else {}
+        frames[spec] = loaders.parse_source(path, **kwargs)
+    print(f"{'frame':<40} {'rows':>8} {'before':>12} {'after':>12}")
+    for name, rows, before, after, ratio in memory_report(frames):
+        print(f"{name:<40} {rows:>8} {before:>12,} {after:>12,}  {ratio:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
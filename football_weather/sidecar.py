@@ -0,0 +1,141 @@
+"""Arrow (feather v2) sidecars for the xlsx/csv snapshots.
+
+The xlsx/csv stays the source of truth. A sidecar is written next to it, e.g.
+``cfb_weather_backtest.xlsx`` sheet ``Stadiums`` ->
+``cfb_weather_backtest.Stadiums.arrow``, and records the content hash of the
+source it was converted from. Readers only trust a sidecar whose hash matches
+the current source.
+
+    python -m football_weather.sidecar convert cfb_weather.xlsx cfb_weather_backtest.xlsx:Stadiums
+    python -m football_weather.sidecar compare cfb_weather.xlsx cfb_weather_backtest.xlsx:Backtesting
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = '.arrow'
+_HASH_KEY = b'football_weather.source_hash'
+
+
+def sidecar_path(path, sheet_name=None):
+    root, _ = os.path.splitext(path)
+    if isinstance(sheet_name, str):
+        root = f"{root}.{sheet_name}"
+    return root + SUFFIX
+
+
+def split_game_loc(df):
+    """Add float ``lat``/``lon`` columns parsed from the ``"lat, lon"`` game_loc string."""
+    if 'game_loc' in df.columns:
+        coords = df['game_loc'].astype('string').str.split(',', n=1, expand=True)
+        coords = coords.reindex(columns=[0, 1])
+        df['lat'] = pd.to_numeric(coords[0], errors='coerce')
+        df['lon'] = pd.to_numeric(coords[1], errors='coerce')
+    return df
+
+
+def read_sidecar(path, source_hash, sheet_name=None):
+    """Memory-map the sidecar for ``path`` if it exists and matches ``source_hash``.
+
+    Returns None when the sidecar is missing, stale or unreadable.
+    """
+    target = sidecar_path(path, sheet_name)
+    if not os.path.exists(target):
+        return None
+    try:
+        from pyarrow import feather
+        table = feather.read_table(target, memory_map=True)
+    except Exception as e:
+        logger.warning("ignoring unreadable sidecar %s: %s", target, e)
+        return None
+    metadata = table.schema.metadata or {}
+    if metadata.get(_HASH_KEY, b'').decode() != source_hash:
+        return None
+    return table.to_pandas()
+
+
+def write_sidecar(df, path, source_hash, sheet_name=None):
+    """Write ``df`` as the sidecar for ``path``; returns the sidecar path or None."""
+    target = sidecar_path(path, sheet_name)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        import pyarrow as pa
+        from pyarrow import feather
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_HASH_KEY] = source_hash.encode()
+        table = table.replace_schema_metadata(metadata)
+        # Uncompressed so readers can memory-map it instead of decoding
+        feather.write_feather(table, tmp, compression='uncompressed')
+        os.replace(tmp, target)
+    except Exception as e:
+        logger.warning("could not write sidecar %s: %s", target, e)
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+    return target
+
+
+def _parse_spec(spec):
+    # "book.xlsx:Sheet" -> ("book.xlsx", "Sheet")
+    path, _, sheet = spec.partition(':')
+    return path, (sheet or None)
+
+
+def _source_kwargs(sheet):
+    return {'sheet_name': sheet} if sheet else {}
+
+
+def convert(spec):
+    from football_weather import loaders
+    path, sheet = _parse_spec(spec)
+    df = loaders.parse_source(path, **_source_kwargs(sheet))
+    return write_sidecar(df, path, loaders.snapshot_id(path), sheet)
+
+
+def compare(spec, repeat=3):
+    """Best-of-``repeat`` load times for the source file and its sidecar."""
+    from football_weather import loaders
+    path, sheet = _parse_spec(spec)
+    digest = loaders.snapshot_id(path)
+    if read_sidecar(path, digest, sheet) is None:
+        convert(spec)
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    source_s = best(lambda: loaders.parse_source(path, **_source_kwargs(sheet)))
+    sidecar_s = best(lambda: read_sidecar(path, digest, sheet))
+    return source_s, sidecar_s
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m football_weather.sidecar')
+    parser.add_argument('command', choices=['convert', 'compare'])
+    parser.add_argument('snapshots', nargs='+', help="snapshot paths, 'book.xlsx:Sheet' for a named sheet")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for spec in args.snapshots:
+        if args.command == 'convert':
+            print(f"{spec} -> {convert(spec)}")
+        else:
+            source_s, sidecar_s = compare(spec, args.repeat)
+            print(f"{spec}: source {source_s * 1000:.1f} ms, sidecar {sidecar_s * 1000:.1f} ms "
+                  f"({source_s / max(sidecar_s, 1e-9):.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""The CFB backtest signal table, sorted, filtered and paged without copying the slate.
+
+``SignalTable`` is built once per published slate. It keeps the games that
+matched a backtest bucket, in the display columns with ROI and Percentage in
+percent, and the sort order of every sortable column. A view (sort plus
+filters) is an array of row positions into that table, computed from the
+presorted order and boolean masks. ``page`` slices one page out of it, so
+only the visible rows are copied and sent to the browser.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from football_weather import metrics
+
+COLUMNS = ['Game', 'Date', 'Time', 'temp_fg', 'wind_fg', 'Fd_open', 'FD_now', 'Open', 'Record', 'Percentage',
+           'Sample', 'Margin', 'ROI', 'Signal', 'game_loc']
+SORT_COLUMNS = ['Signal', 'ROI', 'Sample', 'Margin']
+# Columns shown in percent rather than as fractions
+PERCENT_COLUMNS = ['ROI', 'Percentage']
+PAGE_SIZES = [25, 50, 100, 250]
+# Views kept per table, and tables kept in memory
+VIEW_CACHE_SIZE = 32
+CACHE_SIZE = 8
+
+
+def _order(values, ascending):
+    """Stable positions sorting ``values``, NaN last either way."""
+    key = values if ascending else -values
+    return np.argsort(np.where(np.isnan(values), np.inf, key), kind='stable')
+
+
+class SignalTable:
+    """Games of a CFB slate with a backtest result, ready to sort, filter and page."""
+
+    def __init__(self, df):
+        table = df.loc[df['ROI'].notna(), COLUMNS].reset_index(drop=True)
+        for name in PERCENT_COLUMNS:
+            table[name] = table[name] * 100
+        self.table = table
+        self._values = {
+            name: pd.to_numeric(table[name], errors='coerce').to_numpy(dtype=np.float64) for name in SORT_COLUMNS
+        }
+        self._orders = {
+            (name, ascending): _order(values, ascending)
+            for name, values in self._values.items() for ascending in (True, False)
+        }
+        # Bucket ids are whole numbers; offer them as ints so the filter doesn't show 1.0
+        signals = np.unique(self._values['Signal'][~np.isnan(self._values['Signal'])]).tolist()
+        self.signals = [int(value) if value.is_integer() else value for value in signals]
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.table)
+
+    def view(self, sort=None, ascending=True, signals=None, min_roi=None, min_sample=None, min_margin=None):
+        """Row positions of the table sorted by ``sort`` and filtered; cached per arguments.
+
+        ``signals`` keeps only those Signal buckets; the ``min_*`` filters keep
+        rows at or above the value (None: no filter).
+        """
+        signals = None if signals is None else tuple(sorted(signals))
+        key = (sort, ascending, signals, min_roi, min_sample, min_margin)
+        with self._lock:
+            positions = self._views.get(key)
+            if positions is not None:
+                self._views.move_to_end(key)
+                return positions
+
+        keep = np.ones(len(self.table), dtype=bool)
+        if signals is not None:
+            keep &= np.isin(self._values['Signal'], signals)
+        for name, minimum in [('ROI', min_roi), ('Sample', min_sample), ('Margin', min_margin)]:
+            if minimum is not None:
+                keep &= self._values[name] >= minimum
+        order = self._orders[(sort, ascending)] if sort else np.arange(len(self.table))
+        positions = order[keep[order]]
+
+        with self._lock:
+            self._views[key] = positions
+            while len(self._views) > VIEW_CACHE_SIZE:
+                self._views.popitem(last=False)
+        return positions
+
+    def page(self, positions, number, size=PAGE_SIZES[0]):
+        """Rows of page ``number`` (from 0) of a view, ``size`` rows per page."""
+        return self.table.iloc[positions[number * size:(number + 1) * size]]
+
+
+def page_count(positions, size=PAGE_SIZES[0]):
+    return max(1, -(-len(positions) // size))
+
+
+_tables = OrderedDict()
+_lock = threading.Lock()
+
+
+def for_slate(version, df):
+    """SignalTable of the CFB slate ``df`` published as ``version``, built once."""
+    with _lock:
+        table = _tables.get(version)
+        if table is not None:
+            _tables.move_to_end(version)
+            return table
+    with metrics.stage('signal_table', len(df)):
+        table = SignalTable(df)
+    with _lock:
+        _tables[version] = table
+        while len(_tables) > CACHE_SIZE:
+            _tables.popitem(last=False)
+    return table
@@ -0,0 +1,127 @@
+"""Combined NFL + CFB signal evaluation.
+
+Every signal is a rule over the unified NFL + CFB frame. All rules are
+evaluated over that one frame and each game records the signals it matched as
+bits of ``signal_mask`` (bit ``i`` is ``SIGNALS[i]``), so a game matching two
+signals is still one row. Adding a signal means adding one entry to
+``SIGNALS``.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from football_weather import schema
+from football_weather.classify import numeric_column, wind_impact_opacity
+
+# NFL columns renamed to their CFB equivalents so both leagues share a schema
+NFL_RENAMES = {
+    'Total_open': 'Fd_open',
+    'Total_now': 'FD_now',
+    'Spread_open': 'Open',
+    'Spread_now': 'Current',
+}
+
+# league: 'NFL' or 'CFB'; rule: column mapping -> boolean mask;
+# full_opacity: draw at full opacity instead of fading by wind_impact
+Signal = namedtuple('Signal', ['name', 'league', 'rule', 'color', 'full_opacity'])
+
+
+def _cfb_wind(data):
+    return (
+        (np.abs(numeric_column(data, 'Open')) < 10.5)
+        & (numeric_column(data, 'temp_fg') < 70)
+        & (numeric_column(data, 'wind_fg') > 14)
+    )
+
+
+def _nfl_wind(data):
+    return (numeric_column(data, 'wind_fg') > 15) & (numeric_column(data, 'temp_fg') < 60)
+
+
+def _heat(data):
+    # Both teams used to cold weather, forecast hot
+    return (
+        (numeric_column(data, 'home_temp') < 57)
+        & (numeric_column(data, 'away_temp') < 57)
+        & (numeric_column(data, 'temp_fg') > 80)
+    )
+
+
+def _alt_heat(data):
+    # Travelling up to altitude in the heat, in a close game
+    spread = numeric_column(data, 'Open')
+    return (
+        (numeric_column(data, 'travel_alt') > 800)
+        & (spread >= -10) & (spread <= 10)
+        & (numeric_column(data, 'temp_fg') > 75)
+    )
+
+
+SIGNALS = [
+    Signal('CFB Wind', 'CFB', _cfb_wind, 'purple', False),
+    Signal('NFL Wind', 'NFL', _nfl_wind, 'blue', False),
+    Signal('CFB Heat', 'CFB', _heat, 'red', True),
+    Signal('NFL Heat', 'NFL', _heat, 'red', True),
+    Signal('Alt+Heat', 'CFB', _alt_heat, 'saddlebrown', True),
+]
+
+
+def unify(nfl_df, cfb_df):
+    """Stack the NFL and CFB slates into one frame with a ``league`` column."""
+    nfl_df = nfl_df.rename(columns=NFL_RENAMES).assign(league='NFL')
+    cfb_df = cfb_df.assign(league='CFB')
+    return schema.concat([cfb_df, nfl_df])
+
+
+def evaluate(df, signals=SIGNALS):
+    """Bitmask of the signals each row of a unified frame matches."""
+    league = df['league'].to_numpy()
+    mask = np.zeros(len(df), dtype=np.int64)
+    for bit, signal in enumerate(signals):
+        hit = np.asarray(signal.rule(df), dtype=bool) & (league == signal.league)
+        mask |= hit.astype(np.int64) << bit
+    return mask
+
+
+def mask_labels(mask, signals=SIGNALS):
+    """Primary (first matching) signal name and all matched names for each mask."""
+    mask = np.asarray(mask, dtype=np.int64)
+    # Few distinct masks occur in a slate, so label each one once
+    unique, inverse = np.unique(mask, return_inverse=True)
+    primary, names = [], []
+    for value in unique:
+        matched = [signal.name for bit, signal in enumerate(signals) if value >> bit & 1]
+        primary.append(matched[0] if matched else None)
+        names.append(', '.join(matched))
+    return np.array(primary, dtype=object)[inverse], np.array(names, dtype=object)[inverse]
+
+
+def full_opacity(mask, signals=SIGNALS):
+    """True where any matched signal is drawn at full opacity."""
+    bits = sum(1 << bit for bit, signal in enumerate(signals) if signal.full_opacity)
+    return (np.asarray(mask, dtype=np.int64) & bits) != 0
+
+
+def matched_games(df, signals=SIGNALS):
+    """Games of a unified frame matching at least one signal, ready to render.
+
+    Adds ``signal_mask``, ``signal_type`` (first matched signal, used for the
+    dot color), ``signals`` (all matched), ``dot_size`` and ``dot_opacity``.
+    """
+    mask = evaluate(df, signals)
+    hit = mask != 0
+    out = df.loc[hit].copy()
+    out['signal_mask'] = mask[hit]
+    out['signal_type'], out['signals'] = mask_labels(out['signal_mask'], signals)
+    out['dot_size'] = out['gs_fg'].abs() * 4 + 7
+    out['dot_opacity'] = np.where(
+        full_opacity(out['signal_mask'], signals),
+        1.0,
+        wind_impact_opacity(out['wind_impact'], ignore_case=True),
+    )
+    return out.reset_index(drop=True)
+
+
+def color_map(signals=SIGNALS):
+    return {signal.name: signal.color for signal in signals}
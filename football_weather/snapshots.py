@@ -0,0 +1,178 @@
+"""Many snapshots as one frame: a week of hourly files, a season, an archive.
+
+    python -m football_weather.snapshots archive/ --workers 8 --out season.parquet
+    python -m football_weather.snapshots 'archive/**/nfl_weather_*.csv' 'archive/**/cfb_weather_*.xlsx'
+
+``load`` takes directories and globs and parses the snapshots concurrently in
+a process pool (openpyxl is the cost; cached sidecars are read instead where
+current, see loaders). The frames are stacked into the shared NFL + CFB
+schema: NFL columns take their CFB names (signals.NFL_RENAMES), and every
+row gets ``league``, ``snapshot`` (file name) and ``as_of`` (its Timestamp,
+else the file's mtime). Stacking is one concat and one compaction, not one
+per file.
+
+``nfl_slate``, ``cfb_slate`` and ``combined_slate`` classify a stack into
+the frames the pages render, each snapshot as of its own time. Set
+FW_SNAPSHOTS to serve them from the dashboard (see artifacts.py).
+"""
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from football_weather import loaders, metrics, pipeline, schema, signals, stadiums
+
+logger = logging.getLogger(__name__)
+
+LEAGUES = ['NFL', 'CFB']
+SNAPSHOT_EXTENSIONS = ('.csv', '.xlsx')
+# CFB names -> NFL names, to hand NFL rows of a stack back to the NFL pipeline
+NFL_NAMES = {cfb: nfl for nfl, cfb in signals.NFL_RENAMES.items()}
+# Added to every row by stack()
+TAG_COLUMNS = ['league', 'snapshot', 'as_of']
+
+
+def league_of(path):
+    """'NFL' or 'CFB' from the file name ("nfl_weather_..."), else csv is NFL and xlsx CFB."""
+    name = os.path.basename(path).lower()
+    for league in LEAGUES:
+        if name.startswith(league.lower()):
+            return league
+    return 'NFL' if name.endswith('.csv') else 'CFB'
+
+
+def _is_snapshot(path):
+    name = os.path.basename(path)
+    # Backtest workbooks and Excel lock files sit next to the snapshots
+    return (
+        os.path.isfile(path) and name.lower().endswith(SNAPSHOT_EXTENSIONS)
+        and 'backtest' not in name.lower() and not name.startswith('~$')
+    )
+
+
+def expand(sources):
+    """Sorted unique snapshot paths under the given directories (recursively) and globs (``**`` recurses)."""
+    paths = set()
+    for source in sources:
+        if os.path.isdir(source):
+            paths.update(os.path.join(folder, name) for folder, _, names in os.walk(source) for name in names)
+        else:
+            paths.update(glob.glob(source, recursive=True))
+    return sorted(path for path in paths if _is_snapshot(path))
+
+
+def read_one(path):
+    """One snapshot as parsed (not compacted; the stack is compacted once)."""
+    if path.lower().endswith('.csv'):
+        return loaders.read_csv(path, compact=False)
+    return loaders.read_excel(path, compact=False)
+
+
+def read(paths, workers=None):
+    """Every snapshot in ``paths``, parsed across ``workers`` processes (default: one per CPU)."""
+    paths = list(paths)
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    with metrics.stage('snapshots.read', len(paths)):
+        if workers <= 1:
+            return [read_one(path) for path in paths]
+        with ProcessPoolExecutor(workers) as pool:
+            return list(pool.map(read_one, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+
+def stack(paths, frames, normalize=True):
+    """``frames`` (parsed from ``paths``) as one frame with ``snapshot`` and ``as_of`` on every row.
+
+    With ``normalize``, NFL columns are renamed to the CFB schema and every
+    row is tagged with its ``league``.
+    """
+    paths = list(paths)
+    if not frames:
+        return pd.DataFrame(columns=TAG_COLUMNS if normalize else TAG_COLUMNS[1:])
+    leagues = [league_of(path) for path in paths]
+    if normalize:
+        # rename() is a shallow copy, so this costs no data copying
+        frames = [df.rename(columns=signals.NFL_RENAMES) if league == 'NFL' else df for df, league in zip(frames, leagues)]
+    lengths = [len(df) for df in frames]
+    df = pd.concat(frames, ignore_index=True)
+
+    # Tag and parse once on the stacked frame; per-file pandas calls dominate otherwise
+    if normalize:
+        df['league'] = np.repeat(leagues, lengths)
+    df['snapshot'] = np.repeat([os.path.basename(path) for path in paths], lengths)
+    stamped = df['Timestamp'] if 'Timestamp' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    df['as_of'] = pd.to_datetime(stamped, errors='coerce', format='ISO8601')
+    mtimes = pd.to_datetime(np.repeat([os.path.getmtime(path) for path in paths], lengths), unit='s')
+    df['as_of'] = df['as_of'].fillna(pd.Series(mtimes, index=df.index))
+    return schema.compact(df) if loaders.USE_COMPACT else df
+
+
+def load(sources, workers=None):
+    """Every snapshot under ``sources`` (directories/globs) stacked in the shared schema."""
+    paths = expand(sources)
+    return stack(paths, read(paths, workers))
+
+
+def league_rows(df, league):
+    """The ``league`` rows of a stack, with the NFL's own column names for NFL rows."""
+    rows = df[df['league'] == league].drop(columns='league').reset_index(drop=True)
+    return rows.rename(columns=NFL_NAMES) if league == 'NFL' else rows
+
+
+def nfl_slate(df):
+    """Classified NFL slate of every NFL snapshot in a stack."""
+    slate = pipeline.build_nfl_slate(league_rows(df, 'NFL'))
+    return slate.sort_values(['as_of', 'Game'], kind='stable', ignore_index=True)
+
+
+def cfb_slate(df, backtest_path=pipeline.CFB_BACKTEST, thresholds=None):
+    """Classified CFB slate of every CFB snapshot in a stack, each as of its own time."""
+    rows = league_rows(df, 'CFB')
+    slate = pipeline.build_cfb_slate(
+        rows,
+        loaders.read_excel(backtest_path, sheet_name='Stadiums'),
+        loaders.read_excel(backtest_path, sheet_name='Backtesting'),
+        today=rows['as_of'], thresholds=thresholds, dimension=stadiums.for_workbook(backtest_path),
+    )
+    return slate.sort_values(['as_of', 'Game'], kind='stable', ignore_index=True)
+
+
+def combined_slate(df):
+    """Combined-signal matches of every snapshot in a stack."""
+    games = signals.matched_games(df)
+    games = games.sort_values(['as_of', 'Game'], kind='stable', ignore_index=True)
+    return schema.categorize(games, schema.LABEL_COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m football_weather.snapshots', description=__doc__.split('\n')[0])
+    parser.add_argument('sources', nargs='+', help="snapshot directories and globs")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument('--out', default=None, help="write the stack as .parquet or .csv")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    start = time.perf_counter()
+    paths = expand(args.sources)
+    if not paths:
+        parser.error("no snapshots matched")
+    df = stack(paths, read(paths, args.workers))
+    logger.info("%d rows from %d snapshots (%s) in %.2fs", len(df), len(paths),
+                ', '.join(f"{league} {n}" for league, n in df['league'].value_counts().items()),
+                time.perf_counter() - start)
+    if args.out:
+        if args.out.endswith('.parquet'):
+            df.to_parquet(args.out, index=False)
+        else:
+            df.to_csv(args.out, index=False)
+        logger.info("-> %s", args.out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""Stadium dimension: one row per stadium with an integer id, and a team alias index.
+
+    python -m football_weather.stadiums report cfb_weather.xlsx
+    python -m football_weather.stadiums build cfb_weather.xlsx --out stadiums.arrow
+
+The ``Stadiums`` sheet keys stadiums by team name, and the snapshots spell
+some teams differently ("UConn" / "Connecticut"). Every spelling (sheet
+team, stadium name, known aliases) is normalized and mapped to the stadium's
+row number, so slates join on integer ids instead of strings. Where a team is
+listed at several stadiums (home field plus one-off neutral sites), its games
+go to the stadium with the most games in ``Record``.
+
+The sheet has no coordinates; ``lat``/``lon``, ``orient``, ``year_built`` and
+``altitude`` are filled from the games played there (first non-blank value
+per stadium) when a snapshot is passed in. Team names that match no stadium
+are logged once and listed by ``report`` rather than dropped silently.
+"""
+import argparse
+import logging
+import re
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from football_weather import loaders
+
+logger = logging.getLogger(__name__)
+
+SHEET_COLUMNS = ['Team', 'Stadium', 'Record', 'Percentage']
+# Per-stadium attributes taken from the games played there
+ATTRIBUTE_COLUMNS = ['lat', 'lon', 'orient', 'year_built', 'altitude']
+# Sheet team -> other spellings of it in the snapshots
+TEAM_ALIASES = {
+    'UConn': ['Connecticut'],
+    'FIU': ['Florida International'],
+    'Miami (OH)': ['Miami OH', 'Miami (Ohio)', 'Miami-Ohio'],
+}
+UNMATCHED = -1
+_ALIASES_KEY = b'football_weather.aliases'
+
+_SPACES = re.compile(r'\s+')
+# Unmatched names already logged, so page reruns do not repeat the warning
+_reported = set()
+_reported_lock = threading.Lock()
+
+
+def normalize(name):
+    """Alias index key: case-folded, periods dropped, whitespace collapsed."""
+    return _SPACES.sub(' ', str(name).replace('.', '')).strip().casefold()
+
+
+def home_team(games):
+    """Home team of each "Away @ Home" game string."""
+    return games.str.split('@').str[1].str.strip()
+
+
+def _games_in_record(records):
+    parts = records.astype('string').str.split('-', expand=True).reindex(columns=[0, 1, 2])
+    return parts.apply(pd.to_numeric, errors='coerce').sum(axis=1).to_numpy(dtype=float)
+
+
+class StadiumDimension:
+    """Stadiums of a ``Stadiums`` sheet with integer ids and an alias index.
+
+    ``table`` is indexed by ``stadium_id``. Pass snapshot frames as ``games``
+    to fill the stadium attributes from the games played there.
+    """
+
+    def __init__(self, sheet, games=(), aliases=None):
+        table = sheet.reindex(columns=SHEET_COLUMNS).reset_index(drop=True)
+        table.index.name = 'stadium_id'
+        self.table = table
+        self.aliases = {}
+        self.duplicates = {}
+        self._build_aliases(dict(TEAM_ALIASES, **(aliases or {})))
+        for attribute in ATTRIBUTE_COLUMNS:
+            self.table[attribute] = sheet[attribute].to_numpy() if attribute in sheet.columns else np.nan
+        for df in games:
+            self.learn(df)
+
+    def _build_aliases(self, aliases):
+        table = self.table
+        # A team's home stadium is the one with the most games in its Record
+        played = _games_in_record(table['Record'])
+        order = np.lexsort((table.index.to_numpy(), -np.nan_to_num(played, nan=-1)))
+        for stadium_id in order:
+            team = table.at[stadium_id, 'Team']
+            if pd.isna(team):
+                continue
+            key = normalize(team)
+            if key in self.aliases:
+                # Repeated rows of the same stadium are not a conflict
+                if table.at[self.aliases[key], 'Stadium'] == table.at[stadium_id, 'Stadium']:
+                    continue
+                self.duplicates.setdefault(team, [self.aliases[key]]).append(int(stadium_id))
+                continue
+            self.aliases[key] = int(stadium_id)
+        # Stadium names resolve too (neutral sites carry no team), without
+        # shadowing a team of the same name
+        for stadium_id, stadium in table['Stadium'].items():
+            if pd.notna(stadium):
+                self.aliases.setdefault(normalize(stadium), int(stadium_id))
+        for team, spellings in aliases.items():
+            stadium_id = self.aliases.get(normalize(team))
+            if stadium_id is None:
+                continue
+            for spelling in spellings:
+                self.aliases.setdefault(normalize(spelling), stadium_id)
+
+    def __len__(self):
+        return len(self.table)
+
+    def resolve(self, names):
+        """Integer stadium id of each name (UNMATCHED where none matches)."""
+        codes, uniques = pd.factorize(pd.Series(names), use_na_sentinel=True)
+        ids = np.array([self.aliases.get(normalize(name), UNMATCHED) for name in uniques], dtype=np.int64)
+        return np.where(codes >= 0, ids[codes] if len(ids) else UNMATCHED, UNMATCHED)
+
+    def learn(self, df):
+        """Fill blank stadium attributes from the games in ``df`` (by home team)."""
+        ids = self.resolve(home_team(df['Game']))
+        known = ids != UNMATCHED
+        for attribute in ATTRIBUTE_COLUMNS:
+            if attribute not in df.columns:
+                continue
+            values = df[attribute].to_numpy()[known]
+            first = pd.Series(values).groupby(ids[known]).first()
+            blank = self.table[attribute].isna()
+            fill = first.reindex(self.table.index)
+            self.table[attribute] = self.table[attribute].where(~blank, fill)
+        return self
+
+    def unmatched(self, names):
+        """Names with no stadium and how many times each occurs."""
+        names = pd.Series(names)
+        missing = names[self.resolve(names) == UNMATCHED].dropna()
+        return missing.value_counts().rename_axis('name').rename('games')
+
+    def report_unmatched(self, names, what='home teams'):
+        """Log a warning for names with no stadium not reported before; returns all of them."""
+        missing = self.unmatched(names)
+        with _reported_lock:
+            new = [name for name in missing.index if name not in _reported]
+            _reported.update(new)
+        if new:
+            logger.warning("%d %s match no stadium: %s", len(new), what, ', '.join(sorted(new)))
+        return missing
+
+    def save(self, path):
+        """Write the table (with its aliases) as a feather file."""
+        import json
+
+        import pyarrow as pa
+        from pyarrow import feather
+
+        table = pa.Table.from_pandas(self.table.reset_index(), preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_ALIASES_KEY] = json.dumps(self.aliases).encode()
+        feather.write_feather(table.replace_schema_metadata(metadata), path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        import json
+
+        from pyarrow import feather
+
+        table = feather.read_table(path)
+        dimension = cls.__new__(cls)
+        dimension.table = table.to_pandas().set_index('stadium_id')
+        dimension.aliases = json.loads(table.schema.metadata[_ALIASES_KEY])
+        dimension.duplicates = {}
+        return dimension
+
+
+# Dimensions built per Stadiums sheet, keyed by workbook content hash
+_dimensions = {}
+_dimensions_lock = threading.Lock()
+
+
+def for_workbook(backtest_path):
+    """The dimension of a workbook's Stadiums sheet, built once per workbook version."""
+    digest = loaders.snapshot_id(backtest_path)
+    with _dimensions_lock:
+        dimension = _dimensions.get(backtest_path)
+    if dimension is None or dimension[0] != digest:
+        dimension = (digest, StadiumDimension(loaders.read_excel(backtest_path, sheet_name='Stadiums')))
+        with _dimensions_lock:
+            _dimensions[backtest_path] = dimension
+    return dimension[1]
+
+
+def join(df_weather, dimension):
+    """``df_weather`` with ``home_tm``, ``stadium_id`` and its stadium's sheet columns.
+
+    Games whose home team matches no stadium keep blank stadium columns and
+    are reported; missing coordinates are filled from the stadium.
+    """
+    home = home_team(df_weather['Game'])
+    ids = dimension.resolve(home)
+    dimension.report_unmatched(home)
+    known = ids != UNMATCHED
+    df = df_weather.assign(home_tm=home, stadium_id=ids)
+    rows = dimension.table.reindex(np.where(known, ids, -1))
+    for column in SHEET_COLUMNS:
+        df[column] = rows[column].to_numpy()
+    for column in ('lat', 'lon'):
+        if column in df.columns:
+            df[column] = df[column].fillna(pd.Series(rows[column].to_numpy(dtype=float), index=df.index))
+    return df
+
+
+def main(argv=None):
+    from football_weather import pipeline
+
+    parser = argparse.ArgumentParser(prog='python -m football_weather.stadiums', description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, text in [('report', "list home teams with no stadium"), ('build', "write the dimension table")]:
+        command = commands.add_parser(name, help=text)
+        command.add_argument('snapshots', nargs='*', default=[pipeline.CFB_SNAPSHOT])
+        command.add_argument('--backtest', default=pipeline.CFB_BACKTEST, help="workbook with the Stadiums sheet")
+        if name == 'build':
+            command.add_argument('--out', default='stadiums.arrow')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+
+    games = [loaders.read_csv(path) if path.endswith('.csv') else loaders.read_excel(path) for path in args.snapshots]
+    dimension = StadiumDimension(loaders.read_excel(args.backtest, sheet_name='Stadiums'), games)
+    for team, ids in dimension.duplicates.items():
+        stadiums = dimension.table.loc[ids, 'Stadium'].tolist()
+        print(f"{team}: listed at {', '.join(stadiums)}; games go to {stadiums[0]}")
+    if args.command == 'build':
+        dimension.save(args.out)
+        located = dimension.table['lat'].notna().sum()
+        logger.info("%d stadiums (%d located), %d aliases -> %s", len(dimension), located, len(dimension.aliases), args.out)
+        return 0
+    missing = dimension.unmatched(pd.concat([home_team(df['Game']) for df in games], ignore_index=True))
+    print(missing.to_string() if len(missing) else "every home team matches a stadium")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
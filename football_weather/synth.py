@@ -0,0 +1,241 @@
+"""Synthetic NFL/CFB slates and backtest tables in the snapshot schemas.
+
+Used for benchmarking: the generated frames have exactly the columns the
+pages read from ``nfl_weather.csv``, ``cfb_weather.xlsx`` and the
+``Stadiums``/``Backtesting`` sheets of ``cfb_weather_backtest.xlsx``, with
+value ranges similar to real slates.
+"""
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from football_weather.schema import CFB_COLUMNS, NFL_COLUMNS
+
+STADIUM_COLUMNS = ['Team', 'Stadium', 'Record', 'Percentage']
+
+BACKTEST_COLUMNS = [
+    'Sport', 'Wind Above', 'Wind Below', 'Temp Above', 'Temp Below', 'Spread_l', 'Spread_h',
+    'CLV from Open', 'Wins', 'Losses', 'Push', 'Sample', 'Margin', 'ROI', '+ CLV', 'CLV %',
+    'Signal',
+]
+
+COMPASS = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+ORIENTATIONS = ['N-S', 'NW-SE', 'NE-SW', 'E-W']
+WEAKEST_WIND = ['E', 'E/W', 'all', 'x NW', 'N', 'SW', 'E/S', 'NE/SW', 'E/N/S', None]
+KICKOFFS = ['11:00 AM', '12:00 PM', '01:00 PM', '02:00 PM', '03:30 PM', '04:30 PM', '07:00 PM', '08:00 PM']
+
+
+def stadiums(n_teams=130, seed=0, league='CFB'):
+    """One home stadium per team with fixed coordinates and orientation."""
+    rng = np.random.default_rng(seed)
+    prefix = 'Team' if league == 'CFB' else 'nfl team'
+    teams = [f"{prefix} {i:03d}" for i in range(n_teams)]
+    wins, losses = rng.integers(0, 25, n_teams), rng.integers(0, 25, n_teams)
+    return pd.DataFrame({
+        'Team': teams,
+        'Stadium': [f"Stadium {i:03d}" for i in range(n_teams)],
+        'Record': [f"{w}-{l}-{p}" for w, l, p in zip(wins, losses, rng.integers(0, 2, n_teams))],
+        'Percentage': np.round(rng.uniform(-0.5, 0.9, n_teams), 3),
+        # Not in the Stadiums sheet; fixed per stadium and copied onto its games
+        'lat': rng.uniform(25.5, 48.5, n_teams),
+        'lon': rng.uniform(-122.5, -70.5, n_teams),
+        'orient': rng.choice(ORIENTATIONS, n_teams, p=[0.6, 0.15, 0.15, 0.1]),
+        'year_built': rng.integers(1914, 2023, n_teams),
+        'avg_wind': np.round(rng.uniform(4, 15, n_teams), 2),
+        'wind_vol': rng.choice(['High', 'Mid', 'Low'], n_teams),
+        'wind_impact': rng.choice(['High', 'Med', 'Low'], n_teams, p=[0.3, 0.6, 0.1]),
+        'weakest_wind_effect': rng.choice(np.array(WEAKEST_WIND, dtype=object), n_teams),
+    })
+
+
+def _slate(n_games, teams, rng, start):
+    """Columns shared by both leagues, for games at randomly chosen home stadiums."""
+    home = rng.integers(0, len(teams), n_games)
+    away = (home + rng.integers(1, len(teams), n_games)) % len(teams)
+    days = rng.integers(0, 7, n_games)
+    dates = pd.to_datetime(start) + pd.to_timedelta(days, unit='D')
+    wind = np.round(rng.gamma(2.2, 4.0, n_games), 2)
+    rain = np.where(rng.random(n_games) < 0.15, np.round(rng.exponential(0.8, n_games), 2), 0.0)
+    lat, lon = teams['lat'].to_numpy()[home], teams['lon'].to_numpy()[home]
+    # Colder further north, plus noise
+    temp = np.round(105 - 1.4 * lat + rng.normal(0, 9, n_games), 2)
+    spread_open = np.round(rng.normal(0, 9, n_games) * 2) / 2
+    total_open = np.round(rng.normal(50, 7, n_games) * 2) / 2
+    return {
+        'home': home,
+        'away': away,
+        'Date': dates.strftime('%a %m/%d').str.upper(),
+        'Time': rng.choice(KICKOFFS, n_games),
+        'wind_vol': teams['wind_vol'].to_numpy()[home],
+        'orient': teams['orient'].to_numpy()[home],
+        'wind_impact': teams['wind_impact'].to_numpy()[home],
+        'weakest_wind_effect': teams['weakest_wind_effect'].to_numpy()[home],
+        'game_loc': [f"{a:.7f}, {b:.7f}" for a, b in zip(lat, lon)],
+        'travel_alt': rng.normal(50, 400, n_games),
+        'home_temp': np.round(rng.uniform(45, 76, n_games), 2),
+        'away_temp': np.round(rng.uniform(45, 76, n_games), 2),
+        'year_built': teams['year_built'].to_numpy()[home],
+        'wind_dir_1h': rng.choice(COMPASS, n_games),
+        'wind_dir_2h': rng.choice(COMPASS, n_games),
+        'temp_fg': temp,
+        'wind_fg': wind,
+        'wind_dir_fg': rng.choice(COMPASS, n_games),
+        'rain_fg': rain,
+        'gs_fg': np.round(-np.clip(wind - 10, 0, None) * 0.6 - rain * 2, 2),
+        'away_fg': np.round(np.minimum(rng.normal(0, 1.2, n_games), 0), 2),
+        'spread_open': spread_open,
+        'spread_now': spread_open + rng.choice([-1, -0.5, 0, 0, 0.5, 1], n_games),
+        'total_open': total_open,
+        'total_now': total_open + rng.choice([-2, -1, -0.5, 0, 0, 0.5, 1], n_games),
+        'avg_wind': teams['avg_wind'].to_numpy()[home],
+        'Timestamp': (pd.to_datetime(start) - timedelta(days=2)).isoformat(),
+    }
+
+
+def nfl_slate(n_games=16, seed=0, n_teams=32, start='2025-09-07'):
+    """A slate in the ``nfl_weather.csv`` schema."""
+    rng = np.random.default_rng(seed)
+    teams = stadiums(n_teams, seed, league='NFL')
+    base = _slate(n_games, teams, rng, start)
+    names = teams['Team'].to_numpy()
+    df = pd.DataFrame({
+        'Game': [f"{a} vs {h}" for a, h in zip(names[base['away']], names[base['home']])],
+        'stadium': teams['Stadium'].to_numpy()[base['home']],
+        'Spread_now': base['spread_now'],
+        'Odds_now': rng.choice([-115, -110, -108, -105], n_games),
+        'Total_now': base['total_now'],
+        'Under_now': rng.choice([-115, -110, -105], n_games),
+        'Spread_open': base['spread_open'],
+        'Odds_open': -110,
+        'Total_open': base['total_open'],
+        'Under_open': -110,
+        **{name: base[name] for name in NFL_COLUMNS if name in base},
+    })
+    # NFL snapshots use lower case labels
+    df['wind_vol'] = df['wind_vol'].str.lower()
+    df['wind_impact'] = df['wind_impact'].str.lower()
+    df['gs_fg'] = df['gs_fg'] / 100
+    df['away_fg'] = df['away_fg'] / 100
+    return df[NFL_COLUMNS]
+
+
+def cfb_slate(n_games=60, seed=0, teams=None, start='2025-09-06'):
+    """A slate in the ``cfb_weather.xlsx`` schema.
+
+    Pass the ``stadiums()`` frame used for the Stadiums sheet so home teams
+    join against it.
+    """
+    rng = np.random.default_rng(seed)
+    teams = stadiums(seed=seed) if teams is None else teams
+    base = _slate(n_games, teams, rng, start)
+    names = teams['Team'].to_numpy()
+    total_proj = base['total_open'] + rng.normal(0, 3, n_games)
+    df = pd.DataFrame({
+        'Game': [f"{a} @ {h}" for a, h in zip(names[base['away']], names[base['home']])],
+        'wind_avg': base['avg_wind'],
+        'wind_diff': np.round(base['wind_fg'] - base['avg_wind'], 2),
+        'Fd_open': base['total_open'],
+        'Odds_o': -110.0,
+        'FD_now': base['total_now'],
+        'Odds_n': rng.choice([-115, -110, -105], n_games),
+        'Open': base['spread_open'],
+        'Current': base['spread_now'],
+        'Spread': np.nan,
+        'Total_proj': np.nan,
+        'Move_t': (base['total_now'] - base['total_open']) / base['total_open'],
+        'Move_s': base['spread_now'] - base['spread_open'],
+        'My_total': np.round(total_proj, 1),
+        'Edge': np.round(total_proj - base['total_now'], 1),
+        'My_spread': np.nan,
+        'Edge_s': np.nan,
+        **{name: base[name] for name in CFB_COLUMNS if name in base},
+    })
+    return df[CFB_COLUMNS]
+
+
+def results(n_games=1000, seed=0, teams=None, start='2015-09-05'):
+    """Graded CFB games: a ``cfb_slate`` plus the final combined score in ``Final``.
+
+    Timestamps (when the forecast was taken) spread over the preceding week.
+
+    Wind pushes scoring under the line, so the backtest buckets show an edge.
+    """
+    rng = np.random.default_rng(seed + 1)
+    df = cfb_slate(n_games, seed, teams, start)
+    wind_effect = 0.4 * np.clip(df['wind_fg'].to_numpy() - 10, 0, None)
+    df['Final'] = np.maximum(np.round(df['FD_now'].to_numpy() - wind_effect + rng.normal(0, 13, n_games)), 0)
+    # Forecasts were taken on every day of the week leading up to the games
+    taken = pd.to_datetime(start) - pd.to_timedelta(rng.integers(0, 7, n_games), unit='D')
+    df['Timestamp'] = taken.strftime('%Y-%m-%dT%H:%M:%S')
+    return df
+
+
+def _bounds(rng, n, edges, p_open):
+    """Random [low, high] ranges on a grid of edges, with blank (open) ends."""
+    low_idx = rng.integers(0, len(edges) - 1, n)
+    high_idx = np.minimum(low_idx + rng.integers(1, 4, n), len(edges) - 1)
+    low, high = edges[low_idx].astype(float), edges[high_idx].astype(float)
+    low[rng.random(n) < p_open] = np.nan
+    high[rng.random(n) < p_open] = np.nan
+    return low, high
+
+
+def backtest_table(n_buckets=120, seed=0):
+    """A ``Backtesting`` sheet of about ``n_buckets`` rows.
+
+    Like the real sheet, each bucket appears three times: all games, then
+    positive and negative CLV only.
+    """
+    rng = np.random.default_rng(seed)
+    n = max(1, n_buckets // 3)
+    wind_above, wind_below = _bounds(rng, n, np.array([0, 8, 10, 12, 15, 18, 20, 25]), 0.3)
+    temp_above, temp_below = _bounds(rng, n, np.array([0, 32, 45, 50, 60, 70, 75, 100]), 0.2)
+    spread_l, spread_h = _bounds(rng, n, np.array([0, 3, 7, 10, 14, 20]), 0.4)
+
+    clv = np.tile(np.array([None, 'Positive', 'Negative'], dtype=object), n)
+    all_games = pd.isna(clv)
+    wins = rng.integers(20, 250, 3 * n).astype(float)
+    losses = rng.integers(20, 250, 3 * n).astype(float)
+    push = rng.integers(0, 8, 3 * n).astype(float)
+    sample = wins + losses + push
+    df = pd.DataFrame({
+        'Sport': 'NCAAF',
+        'Wind Above': np.repeat(wind_above, 3),
+        'Wind Below': np.repeat(wind_below, 3),
+        'Temp Above': np.repeat(temp_above, 3),
+        'Temp Below': np.repeat(temp_below, 3),
+        'Spread_l': np.repeat(spread_l, 3),
+        'Spread_h': np.repeat(spread_h, 3),
+        'CLV from Open': clv,
+        'Wins': wins,
+        'Losses': losses,
+        'Push': push,
+        'Sample': sample,
+        'Margin': np.round(rng.normal(0, 2, 3 * n), 2),
+        'ROI': np.round((wins * 100 / 110 - losses) / sample, 3),
+        '+ CLV': np.where(all_games, np.round(sample * rng.uniform(0.4, 0.6, 3 * n)), np.nan),
+        'CLV %': np.nan,
+        'Signal': np.arange(1, 3 * n + 1),
+    })
+    df['CLV %'] = df['+ CLV'] / df['Sample']
+    return df[BACKTEST_COLUMNS]
+
+
+def write_snapshots(directory, n_games=60, n_buckets=120, seed=0, n_nfl_games=None):
+    """Write a full synthetic snapshot set (csv + both workbooks) into ``directory``."""
+    os.makedirs(directory, exist_ok=True)
+    teams = stadiums(seed=seed)
+    paths = {
+        'nfl': os.path.join(directory, 'nfl_weather.csv'),
+        'cfb': os.path.join(directory, 'cfb_weather.xlsx'),
+        'backtest': os.path.join(directory, 'cfb_weather_backtest.xlsx'),
+    }
+    nfl_slate(n_nfl_games or n_games, seed).to_csv(paths['nfl'], index=False)
+    cfb_slate(n_games, seed, teams).to_excel(paths['cfb'], index=False, sheet_name='FBS')
+    with pd.ExcelWriter(paths['backtest']) as writer:
+        backtest_table(n_buckets, seed).to_excel(writer, index=False, sheet_name='Backtesting')
+        teams[STADIUM_COLUMNS].to_excel(writer, index=False, sheet_name='Stadiums')
+    return paths
+
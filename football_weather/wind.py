@@ -0,0 +1,74 @@
+"""Wind components relative to the field, from compass labels.
+
+The snapshots carry the wind as a 16-point compass direction (``wind_dir_fg``
+at kickoff, ``wind_dir_1h``/``wind_dir_2h`` an hour and two later) and the
+field as an axis label (``orient``, e.g. "NW-SE"). Both are turned into
+angles and the kickoff wind speed ``wind_fg`` is split into the component
+across the field and the one along it, for every direction column at once:
+
+    wind_cross_fg, wind_along_fg, wind_cross_1h, wind_along_1h, wind_cross_2h, wind_along_2h
+
+The field has no "up" end, so both components are magnitudes (mph, >= 0).
+Only the kickoff speed is in the snapshots, so the later hours reuse it with
+their own direction. Unknown labels give NaN.
+
+No classifier reads these yet, so the slate builders do not add them; call
+``wind_components`` where a rule or view needs them.
+"""
+import numpy as np
+import pandas as pd
+
+from football_weather.classify import numeric_column
+
+COMPASS = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+# Compass point -> bearing in degrees (direction the wind blows from)
+COMPASS_DEGREES = {point: i * 22.5 for i, point in enumerate(COMPASS)}
+# Direction column -> suffix of its component columns
+DIRECTION_COLUMNS = {'wind_dir_fg': 'fg', 'wind_dir_1h': '1h', 'wind_dir_2h': '2h'}
+WIND_COLUMNS = [f"wind_{part}_{suffix}" for suffix in DIRECTION_COLUMNS.values() for part in ('cross', 'along')]
+
+
+def _lookup(labels, convert):
+    """Float array of ``convert(label)`` per label, NaN where missing; one call per distinct label."""
+    codes, uniques = pd.factorize(pd.Series(labels), use_na_sentinel=True)
+    values = np.array([convert(str(label).strip().upper()) for label in uniques] + [np.nan])
+    return values[codes]
+
+
+def compass_degrees(labels):
+    """Bearing in degrees of each compass label ("N", "ENE", ...)."""
+    return _lookup(labels, lambda label: COMPASS_DEGREES.get(label, np.nan))
+
+
+def compass_label(degrees):
+    """Nearest 16-point compass label of each bearing (None where NaN)."""
+    degrees = np.asarray(degrees, dtype=float)
+    points = np.rint(np.nan_to_num(degrees) / 22.5).astype(np.int64) % len(COMPASS)
+    return np.where(np.isnan(degrees), None, np.array(COMPASS, dtype=object)[points])
+
+
+def orient_degrees(orient):
+    """Field axis of each orient label ("N-S" -> 0, "NE-SW" -> 45, ...), in [0, 180)."""
+    return _lookup(orient, lambda label: COMPASS_DEGREES.get(label.split('-')[0], np.nan) % 180)
+
+
+def components(speed, direction, axis):
+    """(cross, along) magnitudes of a wind of ``speed`` from ``direction`` on a field along ``axis`` (degrees)."""
+    angle = np.radians(direction - axis)
+    return np.abs(speed * np.sin(angle)), np.abs(speed * np.cos(angle))
+
+
+def wind_components(df):
+    """WIND_COLUMNS for every game of a snapshot, in one pass over all direction columns."""
+    present = [name for name in DIRECTION_COLUMNS if name in df.columns]
+    speed = numeric_column(df, 'wind_fg')
+    axis = orient_degrees(df['orient']) if 'orient' in df.columns else np.full(len(df), np.nan)
+    # (k, n) bearings, one row per direction column, broadcast against (n,) speed and axis
+    direction = np.stack([compass_degrees(df[name]) for name in present]) if present else np.empty((0, len(df)))
+    cross, along = components(speed, direction, axis)
+    columns = {}
+    for name, suffix in DIRECTION_COLUMNS.items():
+        k = present.index(name) if name in present else None
+        columns[f"wind_cross_{suffix}"] = cross[k] if k is not None else np.full(len(df), np.nan)
+        columns[f"wind_along_{suffix}"] = along[k] if k is not None else np.full(len(df), np.nan)
+    return pd.DataFrame(columns, index=df.index)
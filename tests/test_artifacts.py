@@ -0,0 +1,26 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from football_weather import artifacts
+
+
+def publish_one(root, n):
+    slates = {kind: pd.DataFrame({'Game': [f"game {n}"], 'n': [n]}) for kind in artifacts.KINDS}
+    return artifacts.publish(slates, {'n': n}, root)
+
+
+def test_concurrent_producers_get_distinct_versions(tmp_path):
+    root = str(tmp_path / 'artifacts')
+    with ProcessPoolExecutor(4) as pool:
+        versions = list(pool.map(publish_one, [root] * 16, range(16)))
+
+    assert len(set(versions)) == 16
+    assert artifacts._versions(root) == sorted(versions)[-artifacts.KEEP_VERSIONS:]
+    newest = max(versions)
+    assert artifacts.current_manifest(root)['version'] == newest
+    with open(os.path.join(root, newest, artifacts.MANIFEST)) as f:
+        assert json.load(f)['version'] == newest
+    assert not [name for name in os.listdir(root) if name.endswith('.tmp')]
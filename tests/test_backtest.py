@@ -0,0 +1,97 @@
+"""BacktestMatcher against the original row-wise ``get_backtesting_data``.
+
+The reference below is the page function the matcher replaced, kept as it
+was; it mutates the table it is given, so it gets a copy.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from football_weather import loaders, pipeline, synth
+from football_weather.backtest import RESULT_COLUMNS, BacktestMatcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKTEST = os.path.join(ROOT, pipeline.CFB_BACKTEST)
+
+
+def get_clv(open_value, current_value):
+    return 'Positive' if open_value > current_value else 'Negative'
+
+
+def get_backtesting_data(row, df_bt):
+    temp_fg = row['temp_fg']
+    wind_fg = row['wind_fg']
+    open_val = row['Fd_open']
+    current_val = row['FD_now']
+    spread = abs(row['Open'])
+    clv_status = get_clv(open_val, current_val)
+    df_bt['Wind Below'] = df_bt['Wind Below'].fillna(100)
+    df_bt['Spread_l'] = df_bt['Spread_l'].fillna(0)
+    df_bt['Temp Above'] = df_bt['Temp Above'].fillna(0)
+    match = df_bt[
+        (df_bt['Temp Above'] <= temp_fg) &
+        (df_bt['Temp Below'] >= temp_fg) &
+        (df_bt['Wind Above'] <= wind_fg) &
+        (df_bt['Wind Below'] >= wind_fg) &
+        (df_bt['CLV from Open'] == clv_status)
+    ]
+    match = match[
+        ((match['Spread_h'] >= spread) & (match['Spread_l'] <= spread))
+    ]
+    if not match.empty:
+        return match.iloc[0]['Sample'], match.iloc[0]['Margin'], match.iloc[0]['ROI'], match.iloc[0]['Signal']
+    else:
+        return None, None, None, None
+
+
+def games_on_bounds(df_bt, n, seed=0):
+    """Games whose temp, wind and spread sit on, just inside or just outside the table's bounds, or are NaN."""
+    rng = np.random.default_rng(seed)
+
+    def values(*columns):
+        bounds = pd.unique(pd.to_numeric(df_bt[list(columns)].stack(), errors='coerce').dropna())
+        choices = np.concatenate([bounds, bounds - 0.01, bounds + 0.01, [np.nan]])
+        return rng.choice(choices, n)
+
+    df = synth.cfb_slate(n, seed=seed)
+    df['temp_fg'] = values('Temp Above', 'Temp Below')
+    df['wind_fg'] = values('Wind Above', 'Wind Below')
+    df['Open'] = values('Spread_l', 'Spread_h') * rng.choice([-1, 1], n)
+    # Equal totals are negative CLV; NaN totals too
+    df['Fd_open'] = rng.choice([44.5, 45.0, 45.5, np.nan], n)
+    df['FD_now'] = rng.choice([44.5, 45.0, 45.5, np.nan], n)
+    return df
+
+
+def assert_matches_reference(df_bt, games):
+    expected = pd.DataFrame(
+        [get_backtesting_data(row, df_bt.copy()) for _, row in games.iterrows()],
+        columns=RESULT_COLUMNS, index=games.index,
+    ).astype(float)
+    result = BacktestMatcher(df_bt).match(games).astype(float)
+    pd.testing.assert_frame_equal(result, expected)
+    return expected
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_synthetic_table_matches_row_rule(seed):
+    # Overlapping buckets, open-ended bounds and every bucket once per CLV
+    df_bt = synth.backtest_table(150, seed=seed)
+    expected = assert_matches_reference(df_bt, games_on_bounds(df_bt, 600, seed))
+    # Both matched and unmatched games, and games matching a later bucket than the first overlap
+    assert expected['Signal'].isna().any() and expected['Signal'].notna().any()
+    assert expected['Signal'].nunique() > 10
+
+
+@pytest.mark.skipif(not os.path.exists(BACKTEST), reason="no backtest workbook checked in")
+def test_backtest_workbook_matches_row_rule():
+    df_bt = loaders.read_excel(BACKTEST, sheet_name='Backtesting')
+    assert_matches_reference(df_bt, games_on_bounds(df_bt, 600))
+
+
+def test_empty_table_matches_nothing():
+    df_bt = synth.backtest_table(3).iloc[:0]
+    games = games_on_bounds(synth.backtest_table(3), 10)
+    assert BacktestMatcher(df_bt).match(games).isna().all().all()
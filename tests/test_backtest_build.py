@@ -0,0 +1,34 @@
+import os
+import stat
+
+import pandas as pd
+
+from football_weather import synth
+from football_weather.backtest_build import write_backtesting
+
+
+def test_rewrite_keeps_mode_other_sheets_and_a_backup(tmp_path):
+    path = str(tmp_path / 'cfb_weather_backtest.xlsx')
+    with pd.ExcelWriter(path) as writer:
+        synth.stadiums(10).to_excel(writer, index=False, sheet_name='Stadiums')
+        synth.backtest_table(6).to_excel(writer, index=False, sheet_name='Backtesting')
+    os.chmod(path, 0o644)
+    before = os.path.getsize(path)
+
+    table = synth.backtest_table(30, seed=1)
+    write_backtesting(table, path)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert os.path.getsize(f"{path}.bak") == before
+    assert len(pd.read_excel(path, sheet_name='Backtesting')) == len(table)
+    assert len(pd.read_excel(path, sheet_name='Stadiums')) == 10
+
+
+def test_new_file_gets_the_umask_default(tmp_path):
+    umask = os.umask(0o022)
+    try:
+        path = write_backtesting(synth.backtest_table(6), str(tmp_path / 'backtesting.csv'))
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert not os.path.exists(f"{path}.bak")
@@ -0,0 +1,141 @@
+"""classify_nfl / classify_cfb against the original per-row page functions.
+
+The reference functions below are the row-by-row rules the pages applied
+with ``df.apply(..., axis=1)`` before classify.py, kept verbatim apart from
+taking the weekday as an argument instead of reading the wall clock.
+"""
+import itertools
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from football_weather.classify import classify_cfb, classify_nfl
+
+NAN = float('nan')
+# Values on, just below and just above every threshold the rules use, plus NaN
+WIND = [0, 7.99, 8, 8.01, 14.99, 15, 15.01, 16.29, 16.3, 16.31, 16.81, 17.6, 17.61, 18.6, 18.61, 19.43, 19.44, 25, NAN]
+TEMP = [20, 31.99, 32, 32.01, 44.99, 45, 45.01, 49.99, 50, 50.01, 59.99, 60, 60.01, 64.99, 65, 65.01,
+        74.99, 75, 75.01, 79.99, 80, 80.01, 95, NAN]
+RAIN = [0, 1.99, 2, 2.01, NAN]
+SPREAD = [-20.51, -20.5, -10.51, -10.5, 0, 10.5, 10.51, 20.5, 20.51, NAN]
+TRAVEL_ALT = [0, 799.99, 800, 800.01, NAN]
+TEAM_TEMP = [50, 56.99, 57, 57.01, NAN]
+WIND_IMPACT = ['high', 'low', 'med', 'HIGH', 'other', None, NAN]
+
+LOW_IMPACT_WIND_THRESHOLDS = {0: 11.14, 1: 11.14, 2: 10.10, 3: 10.10, 4: 9.31, 5: 8.79, 6: 11.93}
+# 2025-10-06 is a Monday
+MONDAY = datetime(2025, 10, 6, 12)
+
+
+def reference_nfl(row):
+    if (row['rain_fg'] > 2) or (8 < row['wind_fg'] < 15 and row['temp_fg'] < 60):
+        return 'Low Impact', 'blue', 15
+    elif row['wind_fg'] > 15 and row['temp_fg'] < 60:
+        return 'Mid Impact', 'orange', 25
+    elif row['wind_fg'] > 15 and 32 <= row['temp_fg'] <= 45:
+        return 'High Impact', 'purple', 40
+    else:
+        return 'No Impact', 'green', 7
+
+
+def reference_opacity(row):
+    if row['wind_impact'] == 'high':
+        return 1.0
+    elif row['wind_impact'] == 'low':
+        return 0.15
+    elif row['wind_impact'] == 'med':
+        return 0.5
+    else:
+        return 1.0
+
+
+def reference_signal(row, day_of_week):
+    low_impact_wind_thresh = LOW_IMPACT_WIND_THRESHOLDS.get(day_of_week, 10)
+    mid_impact_wind_thresh = low_impact_wind_thresh + 7.5
+    high_impact_wind_thresh = low_impact_wind_thresh + 7.5
+    very_high_impact_wind_thresh = low_impact_wind_thresh + 7.5
+
+    if row['wind_fg'] > very_high_impact_wind_thresh and row['temp_fg'] < 50 and -10.5 <= row['Open'] <= 10.5:
+        return 'Very High Impact'
+    elif row['wind_fg'] > high_impact_wind_thresh and row['temp_fg'] < 65 and -10.5 <= row['Open'] <= 10.5:
+        return 'High Impact'
+    elif ((row['wind_fg'] > mid_impact_wind_thresh and row['temp_fg'] < 65) or
+          (row['travel_alt'] > 800 and row['temp_fg'] > 75)) and -20.5 <= row['Open'] <= 20.5:
+        return 'Mid Impact'
+    elif ((row['wind_fg'] > low_impact_wind_thresh and row['temp_fg'] < 65) or
+          (row['rain_fg'] > 2) or
+          (row['temp_fg'] > 80 and row['home_temp'] < 57 and row['away_temp'] < 57)) and -20.5 <= row['Open'] <= 20.5:
+        return 'Low Impact'
+    else:
+        return 'No Impact'
+
+
+def reference_color(row):
+    return 'black' if row['signal'] == 'Low Impact' and row['rain_fg'] > 2 else (
+        'red' if row['signal'] == 'Low Impact' and row['temp_fg'] > 80 and row['home_temp'] < 57 and row['away_temp'] < 57 else (
+            'blue' if row['signal'] == 'Low Impact' else (
+                'orange' if row['signal'] == 'Mid Impact' else (
+                    'purple' if row['signal'] == 'High Impact' else (
+                        'darkred' if row['signal'] == 'Very High Impact' else 'green'
+                    )
+                )
+            )
+        )
+    )
+
+
+REFERENCE_SIZES = {'Low Impact': 15, 'Mid Impact': 25, 'High Impact': 40, 'Very High Impact': 50, 'No Impact': 7}
+
+
+@pytest.fixture(scope='module')
+def nfl_games():
+    # Every combination of the boundary values the NFL rules read
+    rows = list(itertools.product(WIND, TEMP, RAIN))
+    df = pd.DataFrame(rows, columns=['wind_fg', 'temp_fg', 'rain_fg'])
+    df['wind_impact'] = [WIND_IMPACT[i % len(WIND_IMPACT)] for i in range(len(df))]
+    return df
+
+
+@pytest.fixture(scope='module')
+def cfb_games():
+    # Boundary values of every column the CFB rules read, combined at random
+    rng = np.random.default_rng(0)
+    n = 40_000
+    columns = {
+        'wind_fg': WIND, 'temp_fg': TEMP, 'rain_fg': RAIN, 'Open': SPREAD,
+        'travel_alt': TRAVEL_ALT, 'home_temp': TEAM_TEMP, 'away_temp': TEAM_TEMP,
+    }
+    return pd.DataFrame({name: rng.choice(values, n) for name, values in columns.items()})
+
+
+def test_nfl_matches_row_rules(nfl_games):
+    result = classify_nfl(nfl_games)
+    expected = pd.DataFrame(
+        nfl_games.apply(reference_nfl, axis=1).tolist(),
+        columns=['impact_level', 'dot_color', 'dot_size'],
+        index=nfl_games.index,
+    )
+    for name in expected.columns:
+        assert result[name].tolist() == expected[name].tolist(), name
+    assert result['dot_opacity'].tolist() == nfl_games.apply(reference_opacity, axis=1).tolist()
+
+
+@pytest.mark.parametrize('weekday', range(7))
+def test_cfb_matches_row_rules(cfb_games, weekday):
+    today = MONDAY + timedelta(days=weekday)
+    result = classify_cfb(cfb_games, today=today)
+
+    expected = cfb_games.assign(signal=cfb_games.apply(reference_signal, axis=1, day_of_week=weekday))
+    assert result['signal'].tolist() == expected['signal'].tolist()
+    assert result['dot_color'].tolist() == expected.apply(reference_color, axis=1).tolist()
+    assert result['dot_size'].tolist() == expected['signal'].map(REFERENCE_SIZES).tolist()
+
+
+def test_cfb_all_nan_is_no_impact():
+    columns = ['wind_fg', 'temp_fg', 'rain_fg', 'Open', 'travel_alt', 'home_temp', 'away_temp']
+    df = pd.DataFrame(NAN, index=range(3), columns=columns)
+    result = classify_cfb(df, today=MONDAY)
+    assert result['signal'].tolist() == ['No Impact'] * 3
+    assert result['dot_color'].tolist() == ['green'] * 3
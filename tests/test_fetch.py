@@ -0,0 +1,48 @@
+import asyncio
+
+import pandas as pd
+
+from football_weather import fetch
+
+
+def test_kickoff_hour_is_read_in_stadium_local_time():
+    server, url = fetch.serve_stub()
+    try:
+        fetcher = fetch.ForecastFetcher(url, backoff=0.01)
+        assert fetcher.params['timezone'] == 'auto'
+        # Los Angeles: the stub's local time is UTC-8, so 1 PM local is 21:00 UTC
+        lat, lon = 34.0141, -118.2879
+        kickoff = pd.Timestamp(fetch.stub_forecast(lat, lon)['hourly']['time'][48 + 13])
+        schedule = pd.DataFrame({
+            'Game': ['A @ B'], 'Date': [kickoff.strftime('%a %m/%d').upper()], 'Time': ['01:00 PM'],
+            'game_loc': [f"{lat}, {lon}"],
+        })
+        df = fetcher.snapshot(schedule, now=kickoff - pd.Timedelta(days=1))
+
+        # The fetcher asks for the forecast cell's centre and reads its 1 PM local hour
+        cell = fetch.forecast_cells([lat], [lon], [kickoff])[2]
+        hourly = fetch.stub_forecast(cell['lat'][0], cell['lon'][0])['hourly']
+        at = hourly['time'].index(fetch.hour_key(kickoff))
+        assert df.loc[0, 'temp_fg'] == hourly['temperature_2m'][at]
+        assert df.loc[0, 'wind_fg'] == hourly['wind_speed_10m'][at]
+    finally:
+        server.shutdown()
+
+
+def test_expired_hours_are_dropped(monkeypatch):
+    server, url = fetch.serve_stub()
+    try:
+        fetcher = fetch.ForecastFetcher(url, ttl=60, backoff=0.01)
+        clock = [1000.0]
+        monkeypatch.setattr(fetch.time, 'monotonic', lambda: clock[0])
+        hours = [fetch.hour_key(pd.Timestamp.now().normalize() + pd.Timedelta(hours=12))]
+        asyncio.run(fetcher.forecast([(40.0, -75.0, hours)]))
+        first = len(fetcher._cache)
+        assert first
+
+        clock[0] += 120
+        asyncio.run(fetcher.forecast([(30.0, -90.0, hours)]))
+        assert len(fetcher._cache) == first
+        assert all(lat == 30.0 for lat, _, _ in fetcher._cache)
+    finally:
+        server.shutdown()
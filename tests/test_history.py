@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from football_weather import loaders, synth
+from football_weather.history import HistoryStore
+
+
+def write_snapshot(df, path, timestamp):
+    df.assign(Timestamp=timestamp).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def slate():
+    # Every rain value exact in float32, so compaction narrows the column
+    df = synth.nfl_slate(20)
+    df['rain_fg'] = 0.25
+    df.loc[0, 'rain_fg'] = 0.5
+    return df
+
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_one_changed_game_stores_one_row(tmp_path, monkeypatch, slate, compact):
+    monkeypatch.setattr(loaders, 'USE_COMPACT', compact)
+    store = HistoryStore(str(tmp_path / 'store'))
+    first = write_snapshot(slate, tmp_path / 'nfl_weather_1.csv', '2025-09-05T09:00:00')
+    assert store.ingest(first) == 20
+
+    # 0.13 is not exact in float32: the compacted rain_fg column becomes float64
+    changed = slate.copy()
+    changed.loc[0, 'rain_fg'] = 0.13
+    second = write_snapshot(changed, tmp_path / 'nfl_weather_2.csv', '2025-09-05T10:00:00')
+    assert store.ingest(second) == 1
+    assert len(store) == 21
+
+    game = slate.loc[0, 'Game']
+    assert store.series(game)['rain_fg'].tolist() == pytest.approx([0.5, 0.13])
+    assert store.latest(game, as_of=pd.Timestamp('2025-09-05T09:30:00'))['rain_fg'] == pytest.approx(0.5)
+
+
+def test_unchanged_snapshot_stores_nothing(tmp_path, slate):
+    store = HistoryStore(str(tmp_path / 'store'))
+    store.ingest(write_snapshot(slate, tmp_path / 'nfl_weather_1.csv', '2025-09-05T09:00:00'))
+    assert store.ingest(write_snapshot(slate, tmp_path / 'nfl_weather_2.csv', '2025-09-05T10:00:00')) == 0
+    assert len(HistoryStore(str(tmp_path / 'store'))) == 20
+
+
+def reference_keep(stored, batch):
+    """Row at a time: keep a row unless it equals its game's newest entry at or before it."""
+    keep = [False] * len(batch)
+    entries = list(stored)
+    for i in sorted(range(len(batch)), key=lambda i: (batch[i][0], batch[i][1])):
+        game, ts, value = batch[i]
+        # Later entries win ties
+        earlier = [v for g, t, v in sorted(entries, key=lambda row: row[1]) if g == game and t <= ts]
+        if not earlier or earlier[-1] != value:
+            keep[i] = True
+            entries.append(batch[i])
+    return keep
+
+
+def test_ingest_matches_row_at_a_time_rule(tmp_path):
+    rng = np.random.default_rng(1)
+    store = HistoryStore(str(tmp_path / 'store'))
+    stored = []
+    base = pd.Timestamp('2025-09-01')
+    for _ in range(40):
+        n = int(rng.integers(1, 30))
+        # Back-filled stamps and repeated games exercise every run of the index
+        batch = list(zip(
+            rng.choice(['A', 'B', 'C', 'D', 'E'], n).tolist(),
+            rng.integers(0, 50, n).tolist(),
+            rng.integers(0, 3, n).tolist(),
+        ))
+        keep = reference_keep(stored, batch)
+        df = pd.DataFrame(batch, columns=['Game', 'hour', 'value'])
+        df['as_of'] = base + pd.to_timedelta(df['hour'], unit='h')
+        assert store.ingest_frame(df.drop(columns='hour')) == sum(keep)
+        stored.extend(row for row, kept in zip(batch, keep) if kept)
+        stored.sort(key=lambda row: (row[0], row[1]))
+
+    assert len(store) == len(stored)
+    for game in 'ABCDE':
+        expected = [(base + pd.Timedelta(hours=t), v) for g, t, v in stored if g == game]
+        rows = store.series(game)
+        assert list(zip(rows['as_of'], rows['value'])) == expected
+    reopened = HistoryStore(str(tmp_path / 'store'))
+    assert len(reopened) == len(stored)
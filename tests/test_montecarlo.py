@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from football_weather import montecarlo
+from football_weather.classify import classify_cfb
+
+
+def test_cfb_probabilities_use_each_rows_as_of():
+    # Same game twice: wind above Saturday's low threshold (8.79), below Sunday's (11.93)
+    game = {'wind_fg': 10.0, 'temp_fg': 50.0, 'rain_fg': 0.0, 'Open': 3.0, 'travel_alt': 0.0,
+            'home_temp': 60.0, 'away_temp': 60.0, 'Game': 'A @ B'}
+    df = pd.DataFrame([game, game])
+    df['as_of'] = pd.to_datetime(['2025-10-11T10:00', '2025-10-12T10:00'])
+    df['kickoff'] = df['as_of'] + pd.Timedelta(hours=3)
+    model = montecarlo.VolatilityModel(0.0, 0.0, {}, 0.0, 0.0, 0.0, 0.0)
+
+    probabilities = montecarlo.cfb_probabilities(df, draws=50, seed=0, model=model)
+    expected = classify_cfb(df, df['as_of'])['signal'].tolist()
+    assert expected == ['Low Impact', 'No Impact']
+    # No spread, so the forecast decides every draw; No Impact has no column
+    np.testing.assert_array_equal(probabilities['Low Impact'], [1.0, 0.0])
+    assert probabilities.drop(columns='Low Impact').eq(0).all().all()
@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+import pytest
+
+from football_weather import clock, pipeline, replay, schema
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CFB_SNAPSHOT = os.path.join(ROOT, pipeline.CFB_SNAPSHOT)
+CFB_BACKTEST = os.path.join(ROOT, pipeline.CFB_BACKTEST)
+
+
+@pytest.mark.skipif(not os.path.exists(CFB_SNAPSHOT), reason="no CFB snapshot checked in")
+def test_cfb_replay_matches_the_page_slate():
+    replayed = replay.replay_cfb([CFB_SNAPSHOT], CFB_BACKTEST)
+    as_of = replayed['as_of'].iloc[0]
+    with clock.as_of(as_of.to_pydatetime()):
+        shown = pipeline.load_cfb_slate(CFB_SNAPSHOT, CFB_BACKTEST)
+
+    replayed = replayed.drop(columns=['snapshot', 'as_of']).sort_values('Game', ignore_index=True)
+    shown = shown.sort_values('Game', ignore_index=True)[replayed.columns]
+    for name in schema.LABEL_COLUMNS:
+        if name in shown.columns:
+            assert isinstance(replayed[name].dtype, pd.CategoricalDtype), name
+    pd.testing.assert_frame_equal(replayed, shown, check_dtype=False, check_categorical=False)
+
+
+def test_kickoff_year_follows_the_as_of_clock():
+    games = pd.DataFrame({'Date': ['SAT 01/03'], 'Time': ['01:00 PM']})
+    with clock.as_of('2026-12-20T10:00'):
+        assert schema.kickoff_times(games)[0] == pd.Timestamp('2027-01-03 13:00')
+    with clock.as_of('2025-12-20T10:00'):
+        assert schema.kickoff_times(games)[0] == pd.Timestamp('2026-01-03 13:00')
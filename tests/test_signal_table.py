@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from football_weather import signal_table
+
+
+def test_signal_options_are_ints_and_filter_the_view():
+    n = 6
+    df = pd.DataFrame({name: [np.nan] * n for name in signal_table.COLUMNS})
+    df['Game'] = [f"game {i}" for i in range(n)]
+    df['ROI'] = [0.1, 0.2, np.nan, 0.3, 0.4, 0.5]
+    df['Signal'] = [3.0, 1.0, 2.0, 3.0, np.nan, 1.0]
+    table = signal_table.SignalTable(df)
+
+    assert table.signals == [1, 3]
+    assert all(type(value) is int for value in table.signals)
+    positions = table.view(signals=[3])
+    assert table.page(positions, 0)['Game'].tolist() == ['game 0', 'game 3']
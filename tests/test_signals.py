@@ -0,0 +1,136 @@
+"""signals.unify / evaluate / matched_games against the original combined-signals page.
+
+``reference_signals`` is the page's five filtered copies, concatenated: one
+row per (game, signal) matched.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from football_weather import signals, synth
+
+
+def reference_unify(nfl_df, cfb_df):
+    nfl_df = nfl_df.copy()
+    cfb_df = cfb_df.copy()
+    nfl_df.rename(columns={
+        'Total_open': 'Fd_open',
+        'Total_now': 'FD_now',
+        'Spread_open': 'Open',
+        'Spread_now': 'Current'
+    }, inplace=True)
+    nfl_df['league'] = 'NFL'
+    cfb_df['league'] = 'CFB'
+    return nfl_df, cfb_df
+
+
+def reference_signals(nfl_df, cfb_df):
+    nfl_df, cfb_df = reference_unify(nfl_df, cfb_df)
+    cfb_signals = cfb_df[
+        (cfb_df['Open'].abs() < 10.5) &
+        (cfb_df['temp_fg'] < 70) &
+        (cfb_df['wind_fg'] > 14)
+    ].copy()
+    nfl_signals = nfl_df[
+        (nfl_df['wind_fg'] > 15) &
+        (nfl_df['temp_fg'] < 60)
+    ].copy()
+    cfb_signals['signal_type'] = 'CFB Wind'
+    nfl_signals['signal_type'] = 'NFL Wind'
+    combined_signals = pd.concat([cfb_signals, nfl_signals], ignore_index=True)
+
+    heat_signals_cfb = cfb_df[
+        (cfb_df['home_temp'] < 57) &
+        (cfb_df['away_temp'] < 57) &
+        (cfb_df['temp_fg'] > 80)
+    ].copy()
+    heat_signals_nfl = nfl_df[
+        (nfl_df['home_temp'] < 57) &
+        (nfl_df['away_temp'] < 57) &
+        (nfl_df['temp_fg'] > 80)
+    ].copy()
+    heat_signals_cfb['signal_type'] = 'CFB Heat'
+    heat_signals_nfl['signal_type'] = 'NFL Heat'
+    combined_signals = pd.concat([combined_signals, heat_signals_cfb, heat_signals_nfl], ignore_index=True)
+
+    alt_heat_cfb = cfb_df[
+        (cfb_df['travel_alt'] > 800) &
+        (cfb_df['Open'].between(-10, 10)) &
+        (cfb_df['temp_fg'] > 75)
+    ].copy()
+    alt_heat_cfb['signal_type'] = 'Alt+Heat'
+    combined_signals = pd.concat([combined_signals, alt_heat_cfb], ignore_index=True)
+    combined_signals['dot_size'] = combined_signals['gs_fg'].abs() * 4 + 7
+
+    def assign_dot_opacity(row):
+        if 'Heat' in row['signal_type']:
+            return 1.0
+        wind_impact = str(row['wind_impact']).lower()
+        if wind_impact == 'high':
+            return 1.0
+        elif wind_impact == 'low':
+            return 0.15
+        elif wind_impact == 'med':
+            return 0.5
+        else:
+            return 1.0
+
+    combined_signals['dot_opacity'] = combined_signals.apply(assign_dot_opacity, axis=1)
+    return combined_signals
+
+
+@pytest.fixture(scope='module')
+def slates():
+    # Values on and around every threshold of the rules, plus NaN
+    rng = np.random.default_rng(0)
+    nfl, cfb = synth.nfl_slate(3000, seed=1), synth.cfb_slate(3000, seed=2)
+    for df, prefix in ((nfl, 'nfl'), (cfb, 'cfb')):
+        n = len(df)
+        df['Game'] = [f"{prefix} {i}" for i in range(n)]
+        df['wind_fg'] = rng.choice([13.99, 14, 14.01, 14.99, 15, 15.01, 20, np.nan], n)
+        df['temp_fg'] = rng.choice([50, 59.99, 60, 60.01, 69.99, 70, 75, 75.01, 80, 80.01, 90, np.nan], n)
+        df['home_temp'] = rng.choice([50, 56.99, 57, 60, np.nan], n)
+        df['away_temp'] = rng.choice([50, 56.99, 57, 60, np.nan], n)
+        df['travel_alt'] = rng.choice([0, 800, 800.01, 2000, np.nan], n)
+        df['wind_impact'] = rng.choice(['high', 'Low', 'MED', 'other', None], n)
+        spread = 'Spread_open' if prefix == 'nfl' else 'Open'
+        df[spread] = rng.choice([-10.51, -10.5, -10.01, -10, 0, 10, 10.01, 10.5, 10.51, np.nan], n)
+    return nfl, cfb
+
+
+def test_unify_matches_page_frames(slates):
+    nfl, cfb = reference_unify(*slates)
+    unified = signals.unify(*slates)
+    expected = pd.concat([cfb, nfl], ignore_index=True)
+    pd.testing.assert_frame_equal(
+        unified[expected.columns], expected, check_dtype=False, check_categorical=False,
+    )
+
+
+def test_matched_games_match_page_signals(slates):
+    expected = reference_signals(*slates)
+    games = signals.matched_games(signals.unify(*slates))
+
+    # Same (game, signal) pairs: one row per game now, with every match in `signals`
+    pairs = {(game, name) for game, names in zip(games['Game'], games['signals']) for name in names.split(', ')}
+    assert pairs == set(zip(expected['Game'], expected['signal_type']))
+    assert games['Game'].is_unique
+
+    per_game = expected.groupby('Game').agg(
+        signal_type=('signal_type', 'first'), dot_size=('dot_size', 'first'), dot_opacity=('dot_opacity', 'max'),
+    )
+    games = games.set_index('Game').loc[per_game.index]
+    # The page concatenated its copies in SIGNALS order, so its first copy of a game is the dot's color
+    assert games['signal_type'].tolist() == per_game['signal_type'].tolist()
+    np.testing.assert_array_equal(games['dot_size'].to_numpy(dtype=float), per_game['dot_size'].to_numpy(dtype=float))
+    # A game drawn by several copies keeps the most opaque
+    np.testing.assert_array_equal(games['dot_opacity'].to_numpy(dtype=float), per_game['dot_opacity'].to_numpy())
+
+
+def test_evaluate_sets_one_bit_per_signal(slates):
+    expected = reference_signals(*slates)
+    unified = signals.unify(*slates)
+    mask = signals.evaluate(unified)
+    for bit, signal in enumerate(signals.SIGNALS):
+        hit = set(unified.loc[(mask >> bit & 1).astype(bool), 'Game'])
+        assert hit == set(expected.loc[expected['signal_type'] == signal.name, 'Game']), signal.name